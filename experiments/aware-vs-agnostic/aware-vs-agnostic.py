@@ -5,20 +5,14 @@ from prettytable import PrettyTable
 from draw_chart import draw_chart
 
 def evaluate(subset: Subset):
-    results = {'relevance': [], 'readability': [], 'convergence': [], 'familiarity': [], 'answer-leakage': []}
-    instances = subset.get_instances()
-    for instance in instances:
-        for hint in instance.hints:
-            relevance = hint.metrics['relevance-llm-meta-llama_Meta-Llama-3.1-8B-Instruct-Turbo'].value
-            readability = hint.metrics['readability-ml-xgboost-trf'].value
-            convergence = hint.metrics['convergence-llm-llama-3-70b'].value
-            familiarity = hint.metrics['familiarity-wikipedia-trf'].value
-            answer_leakage = hint.metrics['answer-leakage-contextual-include_stop_words-trf'].value
-            results['relevance'].append(relevance)
-            results['readability'].append(readability)
-            results['convergence'].append(convergence)
-            results['familiarity'].append(familiarity)
-            results['answer-leakage'].append(answer_leakage)
+    metric_names = ['relevance-llm-meta-llama_Meta-Llama-3.1-8B-Instruct-Turbo',
+                    'readability-ml-xgboost-trf',
+                    'convergence-llm-llama-3-70b',
+                    'familiarity-wikipedia-trf',
+                    'answer-leakage-contextual-include_stop_words-trf']
+    matrix, _, _ = subset.metric_matrix(metric_names)
+    results = {key: matrix[:, idx].tolist() for idx, key in
+               enumerate(['relevance', 'readability', 'convergence', 'familiarity', 'answer-leakage'])}
     for key in results:
         results[key] = round(mean(results[key]), 4)
     return results
@@ -42,16 +42,10 @@ from draw_chart import draw_chart
 
 
 def evaluate(subset: Subset):
-    results = {'convergence': [], 'answer-leakage': []}
-    instances = subset.get_instances()
-    for instance in instances:
-        for hint in instance.hints:
-            convergence = hint.metrics['convergence-llm-llama-3-70b'].value
-            answer_leakage = hint.metrics['answer-leakage-contextual-exclude_stop_words-trf'].value
-            if convergence == 0:
-                continue
-            results['convergence'].append(convergence)
-            results['answer-leakage'].append(answer_leakage)
+    matrix, _, _ = subset.metric_matrix(['convergence-llm-llama-3-70b',
+                                         'answer-leakage-contextual-exclude_stop_words-trf'])
+    matrix = matrix[matrix[:, 0] != 0]
+    results = {'convergence': matrix[:, 0].tolist(), 'answer-leakage': matrix[:, 1].tolist()}
 
     return results
 
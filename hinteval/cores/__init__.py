@@ -1 +1,2 @@
-from hinteval.cores.dataset_core import Entity, Metric, Question, Answer, Hint, Subset, Instance
\ No newline at end of file
+from hinteval.cores.dataset_core import Entity, Metric, Question, Answer, Hint, Subset, Instance, TextPool, FlatHintView
+from hinteval.cores.dataset.columnar import ColumnarSubset
\ No newline at end of file
@@ -0,0 +1,917 @@
+import json
+import fnmatch
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import List, Dict, Union, Any, Optional, Iterable, Tuple, Literal
+from hinteval.cores.dataset_core import Instance, Subset, _hint_indices, _instance_entity_types, _instance_metric_pairs
+
+_JSON_TYPE = pa.dictionary(pa.int32(), pa.string())
+_LEVELS = ('question', 'answers', 'hints')
+
+
+def _dumps(value):
+    if value is None or (isinstance(value, (dict, list)) and len(value) == 0):
+        return None
+    return json.dumps(value)
+
+
+def _loads(value, default):
+    if value is None:
+        return default
+    return json.loads(value)
+
+
+def _value_type(values):
+    values = [value for value in values if value is not None]
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+        return pa.int64()
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+        return pa.float64()
+    return pa.string()
+
+
+def _metric_type(value_type):
+    return pa.struct([('value', value_type), ('name', _JSON_TYPE), ('metadata', _JSON_TYPE)])
+
+
+def _selects(fields, column):
+    return any(column == field or column.startswith(f'{field}.') or fnmatch.fnmatchcase(column, field) for field in
+               fields)
+
+
+def _keeps_level(fields, level):
+    return any(fnmatch.fnmatchcase(level, field.split('.')[0]) for field in fields)
+
+
+def _project_dict(data: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    def metrics(level, item):
+        return {key: metric for key, metric in (item.get('metrics') or {}).items() if
+                _selects(fields, f'{level}.metrics.{key}')}
+
+    def value(level, item, key, default):
+        return item.get(key, default) if _selects(fields, f'{level}.{key}') else default
+
+    question = data['question']
+    return {
+        'question': {
+            'question': value('question', question, 'question', None),
+            'question_type': value('question', question, 'question_type', {}),
+            'entities': value('question', question, 'entities', []),
+            'metrics': metrics('question', question),
+            'metadata': value('question', question, 'metadata', {})
+        },
+        'answers': [{
+            'answer': value('answers', answer, 'answer', None),
+            'entities': value('answers', answer, 'entities', []),
+            'metrics': metrics('answers', answer),
+            'metadata': value('answers', answer, 'metadata', {})
+        } for answer in (data['answers'] if _keeps_level(fields, 'answers') else [])],
+        'hints': [{
+            'hint': value('hints', hint, 'hint', None),
+            'source': value('hints', hint, 'source', None),
+            'entities': value('hints', hint, 'entities', []),
+            'metrics': metrics('hints', hint),
+            'metadata': value('hints', hint, 'metadata', {})
+        } for hint in (data['hints'] if _keeps_level(fields, 'hints') else [])],
+        'metadata': data.get('metadata', {}) if _selects(fields, 'metadata') else {}
+    }
+
+
+def _project_table(table: pa.Table, fields: List[str]) -> pa.Table:
+    # Columns that are not selected are replaced by null columns without reading them. The list columns of a level
+    # that is kept reuse the offsets of its text column, so the number of answers and hints is preserved.
+    columns = dict()
+    for field in _ColumnBuilder().build().schema:
+        if field.name == 'id' or _selects(fields, field.name):
+            columns[field.name] = table.column(field.name)
+        elif not pa.types.is_list(field.type):
+            columns[field.name] = pa.nulls(table.num_rows, field.type)
+        else:
+            level = field.name.split('.')[0]
+            if _keeps_level(fields, level):
+                offsets = table.column('answers.answer' if level == 'answers' else 'hints.hint').combine_chunks().offsets
+            else:
+                offsets = pa.array(np.zeros(table.num_rows + 1, dtype=np.int32))
+            columns[field.name] = pa.ListArray.from_arrays(offsets, pa.nulls(offsets[-1].as_py(),
+                                                                             field.type.value_type))
+    for name in table.column_names:
+        if name not in columns and _selects(fields, name):
+            columns[name] = table.column(name)
+    return pa.table(columns)
+
+
+
+def _id_index_table(table: pa.Table) -> pa.Table:
+    # The ids of the rows in sorted order, with the row of every id, so that an id can be found by binary search.
+    ids = table.column('id')
+    order = pc.sort_indices(ids)
+    return pa.table({'id': pc.take(ids, order), 'row': order.cast(pa.int64())})
+
+class _ColumnBuilder:
+    def __init__(self):
+        self.ids = []
+        self.question = []
+        self.question_type = []
+        self.question_entities = []
+        self.question_metadata = []
+        self.answers = []
+        self.answers_entities = []
+        self.answers_metadata = []
+        self.hints = []
+        self.hints_source = []
+        self.hints_entities = []
+        self.hints_metadata = []
+        self.metadata = []
+        self.metrics: Dict[str, Dict[str, list]] = {level: dict() for level in _LEVELS}
+
+    def _metric_cells(self, level, metric_dicts):
+        row = len(self.ids) - 1
+        keys = metric_dicts.keys() if level == 'question' else [key for metric in metric_dicts for key in metric]
+        for key in keys:
+            if key not in self.metrics[level]:
+                self.metrics[level][key] = [None] * row if level == 'question' else [[None] * len(items) for items in
+                                                                                     self._items(level)[:row]]
+        for key, column in self.metrics[level].items():
+            if level == 'question':
+                metric = metric_dicts.get(key)
+                column.append(None if metric is None else (metric['name'], metric['value'], metric.get('metadata')))
+            else:
+                column.append([None if metric.get(key) is None else (
+                    metric[key]['name'], metric[key]['value'], metric[key].get('metadata')) for metric in metric_dicts])
+
+    def _items(self, level):
+        return self.answers if level == 'answers' else self.hints
+
+    def append(self, q_id: str, data: Dict[str, Any]):
+        self.ids.append(q_id)
+        question = data['question']
+        self.question.append(question['question'])
+        self.question_type.append(_dumps(question.get('question_type')))
+        self.question_entities.append(_dumps(question.get('entities')))
+        self.question_metadata.append(_dumps(question.get('metadata')))
+        self._metric_cells('question', question.get('metrics', {}))
+        answers = data['answers']
+        self.answers.append([answer['answer'] for answer in answers])
+        self.answers_entities.append([_dumps(answer.get('entities')) for answer in answers])
+        self.answers_metadata.append([_dumps(answer.get('metadata')) for answer in answers])
+        self._metric_cells('answers', [answer.get('metrics', {}) for answer in answers])
+        hints = data['hints']
+        self.hints.append([hint['hint'] for hint in hints])
+        self.hints_source.append([hint.get('source') for hint in hints])
+        self.hints_entities.append([_dumps(hint.get('entities')) for hint in hints])
+        self.hints_metadata.append([_dumps(hint.get('metadata')) for hint in hints])
+        self._metric_cells('hints', [hint.get('metrics', {}) for hint in hints])
+        self.metadata.append(_dumps(data.get('metadata')))
+
+    @staticmethod
+    def _metric_array(level, column):
+        if level == 'question':
+            value_type = _value_type([cell[1] for cell in column if cell is not None])
+        else:
+            value_type = _value_type([cell[1] for cells in column for cell in cells if cell is not None])
+
+        def encode(cell):
+            if cell is None:
+                return None
+            name, value, metadata = cell
+            if value_type == pa.string():
+                value = json.dumps(value)
+            return {'value': value, 'name': name, 'metadata': _dumps(metadata)}
+
+        if level == 'question':
+            return pa.array([encode(cell) for cell in column], type=_metric_type(value_type))
+        return pa.array([[encode(cell) for cell in cells] for cells in column],
+                        type=pa.list_(_metric_type(value_type)))
+
+    def build(self) -> pa.Table:
+        json_list = pa.list_(_JSON_TYPE)
+        columns = {
+            'id': pa.array(self.ids, type=pa.string()),
+            'question.question': pa.array(self.question, type=pa.string()),
+            'question.question_type': pa.array(self.question_type, type=_JSON_TYPE),
+            'question.entities': pa.array(self.question_entities, type=pa.string()),
+            'question.metadata': pa.array(self.question_metadata, type=_JSON_TYPE),
+            'answers.answer': pa.array(self.answers, type=pa.list_(pa.string())),
+            'answers.entities': pa.array(self.answers_entities, type=pa.list_(pa.string())),
+            'answers.metadata': pa.array(self.answers_metadata, type=json_list),
+            'hints.hint': pa.array(self.hints, type=pa.list_(pa.string())),
+            'hints.source': pa.array(self.hints_source, type=pa.list_(_JSON_TYPE)),
+            'hints.entities': pa.array(self.hints_entities, type=pa.list_(pa.string())),
+            'hints.metadata': pa.array(self.hints_metadata, type=json_list),
+            'metadata': pa.array(self.metadata, type=_JSON_TYPE),
+        }
+        for level in _LEVELS:
+            for key, column in self.metrics[level].items():
+                columns[f'{level}.metrics.{key}'] = self._metric_array(level, column)
+        return pa.table(columns)
+
+
+class ColumnarSubset(Subset):
+    """
+    A :class:`Subset` that keeps its instances in flat, typed Apache Arrow columns instead of Python objects.
+
+    Questions, answers, hints and metrics are stored column by column, where answers and hints are list columns
+    (a flat value array plus an offset array) and every metric name gets its own typed column. :class:`Instance`
+    objects are only built when they are requested through :meth:`get_instance` (or ``subset[q_id]``), and once built
+    they are kept, so changes made to them (e.g., metrics written by evaluators) are preserved. Instances added with
+    :meth:`add_instance` are kept as objects until :meth:`compact` is called.
+
+    Attributes
+    ----------
+    name : str
+        The name of the subset.
+    metadata : dict[str, Union[str,int, float]]
+        Optional additional metadata about the subset.
+    id_mode : str
+        How the ids of instances added without an id are generated, either 'random' or 'content'.
+
+    Notes
+    -----
+    Entities, question types, metadata and non-numeric metric values are stored as JSON, so they must be
+    JSON-serializable.
+    """
+
+    def __init__(self, name: str = 'entire', metadata: Dict[str, Union[str, int, float]] = None,
+                 id_mode: Literal['random', 'content'] = 'random'):
+        """
+        Initializes a new, empty ColumnarSubset instance.
+
+        Parameters
+        ----------
+        name : str, optional
+            The name of the subset (default is 'entire').
+        metadata : dict[str, Union[str,int, float]], optional
+            Additional metadata about the subset (default is an empty dictionary).
+        id_mode : {'random', 'content'}, default 'random'
+            How the ids of instances added without an id are generated (see :class:`Subset`).
+
+        Raises
+        ------
+        ValueError
+            If the id mode is not valid.
+
+        Examples
+        -------
+        >>> from hinteval.cores import ColumnarSubset, Instance
+        >>>
+        >>> subset = ColumnarSubset(name='training_set')
+        >>> subset.add_instance(Instance.from_strings("What is the capital of France?", ["Paris"], []), "q1")
+        >>> subset.compact()
+        >>> print(subset.question_texts())
+        # ['What is the capital of France?']
+
+        See Also
+        --------
+        from_subset :
+            Creates a ColumnarSubset from a :class:`Subset`.
+
+        from_dict :
+            Creates a ColumnarSubset from a dictionary.
+        """
+
+        super().__init__(name=name, metadata=metadata, id_mode=id_mode)
+        self._table: pa.Table = _ColumnBuilder().build()
+        self._row_index: Optional[Dict[str, Optional[int]]] = dict()
+        self._id_index: Optional[Tuple[pa.Array, np.ndarray]] = None
+        self._dense = True
+
+    @property
+    def _rows(self) -> Dict[str, Optional[int]]:
+        if self._row_index is None:
+            self._row_index = {q_id: row for row, q_id in enumerate(self._table.column('id').to_pylist())}
+        return self._row_index
+
+    def _search_id(self, q_id) -> Optional[int]:
+        ids, rows = self._id_index
+        low, high = 0, len(ids)
+        while low < high:
+            middle = (low + high) // 2
+            if ids[middle].as_py() < q_id:
+                low = middle + 1
+            else:
+                high = middle
+        return int(rows[low]) if low < len(ids) and ids[low].as_py() == q_id else None
+
+    def _has_id(self, q_id) -> bool:
+        # Until the ids are read into `_rows`, a subset opened from a file looks them up in its sorted id index.
+        if self._row_index is None and self._id_index is not None:
+            return self._search_id(q_id) is not None
+        return q_id in self._rows
+
+    def _row_of(self, q_id) -> Optional[int]:
+        if self._row_index is None and self._id_index is not None:
+            return self._search_id(q_id)
+        return self._rows[q_id]
+
+    def _set_table(self, table: pa.Table):
+        # The indexes are brought up to date while the changed instances can still be read.
+        self._sync()
+        for key, index in self._indexes.items():
+            self._refresh_index(key, index)
+        self._table = table.combine_chunks()
+        self._row_index = None
+        self._id_index = None
+        for q_id, instance in self._instances.items():
+            instance._untrack(self, q_id)
+        self._instances = dict()
+        self._exposed = dict()
+        self._dense = True
+
+    @classmethod
+    def _from_table(cls, name, metadata, table: pa.Table, id_mode='random', id_index: pa.Table = None):
+        new_cls = cls(name=name, metadata=metadata, id_mode=id_mode)
+        new_cls._set_table(table)
+        if id_index is not None:
+            new_cls._id_index = (id_index.column('id').combine_chunks(), id_index.column('row').to_numpy())
+        return new_cls
+
+    def _to_table(self) -> pa.Table:
+        if not self._instances and self._dense:
+            return self._table
+        builder = _ColumnBuilder()
+        for q_id in self._rows:
+            builder.append(q_id, self._instance_dict(q_id))
+        return builder.build()
+
+    @classmethod
+    def _from_items(cls, name, metadata, items: Iterable[Tuple[str, Dict[str, Any]]], id_mode='random'):
+        new_cls = cls(name=name, metadata=metadata, id_mode=id_mode)
+        builder = _ColumnBuilder()
+        seen = set()
+        for q_id, instance in items:
+            if q_id in seen:
+                raise ValueError(f'The id "{q_id}" is already.')
+            seen.add(q_id)
+            builder.append(q_id, instance)
+        new_cls._set_table(builder.build())
+        return new_cls
+
+    @classmethod
+    def from_subset(cls, subset: Subset):
+        """
+        Creates a ColumnarSubset holding the same instances as the given subset.
+
+        Parameters
+        ----------
+        subset : Subset
+            The subset to convert.
+
+        Returns
+        -------
+        ColumnarSubset
+            A new ColumnarSubset with the same name, metadata and instances.
+
+        Examples
+        -------
+        >>> from hinteval.cores import Subset, ColumnarSubset, Instance
+        >>>
+        >>> subset = Subset(name='training_set')
+        >>> subset.add_instance(Instance.from_strings("What is the capital of France?", ["Paris"], []), "q1")
+        >>> columnar = ColumnarSubset.from_subset(subset)
+        >>> print(columnar["q1"].answers[0].answer)
+        # Paris
+
+        See Also
+        --------
+        to_subset :
+            Converts the ColumnarSubset back to a regular :class:`Subset`.
+        """
+
+        return cls._from_items(subset.name, subset.metadata,
+                               ((q_id, subset.get_instance(q_id).to_dict()) for q_id in subset.get_instance_ids()),
+                               subset.id_mode)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Creates a ColumnarSubset instance from a dictionary, without building any :class:`Instance` objects.
+
+        Parameters
+        ----------
+        data : dict[str, Any]
+            A dictionary in the format produced by :meth:`Subset.to_dict`.
+
+        Returns
+        -------
+        ColumnarSubset
+            A new ColumnarSubset object initialized from the provided dictionary.
+
+        Raises
+        ------
+        KeyError
+            If required keys are missing in the dictionary.
+
+        See Also
+        --------
+        to_dict :
+            Converts the ColumnarSubset instance into a dictionary.
+        """
+
+        name = data['name']
+        metadata = data['metadata'] if 'metadata' in data else None
+        return cls._from_items(name, metadata, data['instances'].items() if 'instances' in data else [],
+                               data.get('id_mode', 'random'))
+
+    def to_subset(self) -> Subset:
+        """
+        Converts the ColumnarSubset into a regular :class:`Subset` of :class:`Instance` objects.
+
+        Returns
+        -------
+        Subset
+            A new Subset with the same name, metadata and instances.
+
+        See Also
+        --------
+        from_subset :
+            Creates a ColumnarSubset from a :class:`Subset`.
+        """
+
+        subset = Subset(name=self.name, metadata=self.metadata, id_mode=self.id_mode)
+        for q_id in self._rows:
+            subset.add_instance(self.get_instance(q_id), q_id)
+        return subset
+
+    def compact(self):
+        """
+        Writes all instances that are kept as objects back into the columns and releases the objects.
+
+        Instances that were added with :meth:`add_instance` or materialized with :meth:`get_instance` are kept as
+        Python objects so that changes made to them are not lost. Compacting encodes them into the columns again,
+        which frees their memory and makes the column scans fast again.
+
+        Notes
+        -----
+        References to instances obtained before compacting are detached: later changes to them are not reflected
+        in the subset.
+
+        Examples
+        -------
+        >>> from hinteval.cores import ColumnarSubset, Instance
+        >>>
+        >>> subset = ColumnarSubset()
+        >>> subset.add_instance(Instance.from_strings("What is the capital of France?", ["Paris"], []), "q1")
+        >>> subset.compact()
+        """
+
+        if not self._instances and self._dense:
+            return
+        self._set_table(self._to_table())
+
+    def _metric_columns(self, level):
+        prefix = f'{level}.metrics.'
+        return [(column[len(prefix):], column) for column in self._table.column_names if column.startswith(prefix)]
+
+    @staticmethod
+    def _decode_metric(cell, is_json):
+        if cell is None:
+            return None
+        value = json.loads(cell['value']) if is_json else cell['value']
+        return {'name': cell['name'], 'value': value, 'metadata': _loads(cell['metadata'], {})}
+
+    def _row_dict(self, row: int) -> Dict[str, Any]:
+        table = self._table
+
+        def cell(column):
+            return table.column(column)[row].as_py()
+
+        def metrics(level, size=None):
+            values = dict() if size is None else [dict() for _ in range(size)]
+            for key, column in self._metric_columns(level):
+                chunked = table.column(column)
+                is_json = (chunked.type.value_type if level != 'question' else chunked.type).field('value').type == \
+                          pa.string()
+                data = chunked[row].as_py()
+                if size is None:
+                    metric = self._decode_metric(data, is_json)
+                    if metric is not None:
+                        values[key] = metric
+                else:
+                    for idx, item in enumerate(data or []):
+                        metric = self._decode_metric(item, is_json)
+                        if metric is not None:
+                            values[idx][key] = metric
+            return values
+
+        answers = cell('answers.answer')
+        answers_metrics = metrics('answers', len(answers))
+        hints = cell('hints.hint')
+        hints_metrics = metrics('hints', len(hints))
+        answers_entities, answers_metadata = cell('answers.entities'), cell('answers.metadata')
+        hints_source, hints_entities, hints_metadata = cell('hints.source'), cell('hints.entities'), cell(
+            'hints.metadata')
+        return {
+            'question': {
+                'question': cell('question.question'),
+                'question_type': _loads(cell('question.question_type'), {}),
+                'entities': _loads(cell('question.entities'), []),
+                'metrics': metrics('question'),
+                'metadata': _loads(cell('question.metadata'), {})
+            },
+            'answers': [{
+                'answer': answer,
+                'entities': _loads(answers_entities[idx], []),
+                'metrics': answers_metrics[idx],
+                'metadata': _loads(answers_metadata[idx], {})
+            } for idx, answer in enumerate(answers)],
+            'hints': [{
+                'hint': hint,
+                'source': hints_source[idx],
+                'entities': _loads(hints_entities[idx], []),
+                'metrics': hints_metrics[idx],
+                'metadata': _loads(hints_metadata[idx], {})
+            } for idx, hint in enumerate(hints)],
+            'metadata': _loads(cell('metadata'), {})
+        }
+
+    def _instance_dict(self, q_id) -> Dict[str, Any]:
+        if q_id in self._instances:
+            return self._instances[q_id].to_dict()
+        return self._row_dict(self._row_of(q_id))
+
+    def add_instance(self, instance: Instance, q_id: str = None):
+        """
+        Adds an instance to the subset.
+
+        The instance is kept as a Python object until :meth:`compact` is called.
+
+        Parameters
+        ----------
+        instance : Instance
+            The `instance` to be added to the subset.
+        q_id : str, optional
+            The unique identifier for the `instance` (default is None, which generates a new unique ID according to
+            the `id_mode` of the subset).
+
+        Raises
+        ------
+        ValueError
+            If the provided `q_id` already exists in the subset, or if the subset uses content ids and already holds
+            an instance with the same question and answers.
+
+        See Also
+        --------
+        get_instance :
+            Retrieves an instance by its unique identifier.
+
+        remove_instance :
+            Removes an instance from the subset.
+        """
+
+        if q_id is None:
+            q_id = self._new_id(instance, self._rows)
+        else:
+            if q_id in self._rows:
+                raise ValueError(f'The id "{q_id}" is already.')
+        self._intern_texts(instance)
+        self._rows[q_id] = None
+        self._instances[q_id] = instance
+        instance._track(self, q_id)
+        self._instance_changed(q_id, 'instance')
+        self._dense = False
+
+    def remove_instance(self, q_id: str):
+        """
+        Removes an instance from the subset.
+
+        Parameters
+        ----------
+        q_id : str
+            The unique identifier of the instance to be removed.
+
+        Raises
+        ------
+        ValueError
+            If the `q_id` does not exist in the subset.
+
+        See Also
+        --------
+        get_instance :
+            Retrieves an instance by its unique identifier.
+
+        add_instance :
+            Adds an instance to the subset.
+        """
+
+        if q_id not in self._rows:
+            raise ValueError(f'The id "{q_id}" is not in the subset.')
+        del self._rows[q_id]
+        self._untrack_instance(q_id, self._instances.pop(q_id, None))
+        self._dense = False
+
+    def get_instance(self, q_id: str):
+        """
+        Retrieves an instance by its unique identifier, building it from the columns on first access.
+
+        Parameters
+        ----------
+        q_id : str
+            The unique identifier of the instance to retrieve.
+
+        Returns
+        -------
+        Instance
+            The instance associated with the given `q_id`.
+
+        Raises
+        ------
+        ValueError
+            If the `q_id` does not exist in the subset.
+
+        See Also
+        --------
+        add_instance :
+            Adds an instance to the subset.
+
+        get_instances :
+            Retrieves all instances in the subset.
+        """
+
+        if q_id not in self._instances and not self._has_id(q_id):
+            raise ValueError(f'The id "{q_id}" is not in the subset.')
+        if q_id not in self._instances:
+            instance = self._instances[q_id] = Instance.from_dict(self._row_dict(self._row_of(q_id)))
+            self._intern_texts(instance)
+            instance._track(self, q_id)
+        return self._instances[q_id]
+
+    def get_instance_ids(self):
+        """
+        Retrieves all instance identifiers in the subset.
+
+        Returns
+        -------
+        list[str]
+            A list of all instance identifiers in the subset.
+        """
+
+        return list(self._rows.keys())
+
+    def get_instances(self):
+        """
+        Retrieves all instances in the subset, building every instance that has not been materialized yet.
+
+        Returns
+        -------
+        list[Instance]
+            A list of all instances in the subset.
+        """
+
+        return [self.get_instance(q_id) for q_id in self._rows]
+
+    def to_dict(self):
+        """
+        Converts the ColumnarSubset instance into a dictionary, in the same format as :meth:`Subset.to_dict`.
+
+        Returns
+        -------
+        dict[str, Any]
+            A dictionary representation of the subset.
+
+        See Also
+        --------
+        from_dict :
+            Creates a ColumnarSubset instance from a dictionary.
+        """
+
+        ret_dict = {'name': self.name}
+        ret_dict.update({'metadata': self.metadata})
+        ret_dict.update({'id_mode': self.id_mode})
+        ret_dict.update({'instances': {q_id: self._instance_dict(q_id) for q_id in self._rows}})
+        return ret_dict
+
+    def question_texts(self) -> List[str]:
+        """
+        Retrieves the question text of every instance, in the order of :meth:`get_instance_ids`.
+
+        Returns
+        -------
+        list[str]
+            The question texts.
+        """
+
+        column = self._table.column('question.question')
+        if not self._instances and self._dense:
+            return column.to_pylist()
+        return [self._instances[q_id].question.question if q_id in self._instances else column[row].as_py()
+                for q_id, row in self._rows.items()]
+
+    def hint_offsets(self) -> np.ndarray:
+        """
+        Retrieves the offsets of the hints of every instance in the flat hint arrays.
+
+        The hints of the i-th instance (in the order of :meth:`get_instance_ids`) are located between
+        ``offsets[i]`` and ``offsets[i + 1]`` in :meth:`hint_texts` and :meth:`metric_values`.
+
+        Returns
+        -------
+        numpy.ndarray
+            An int64 array with ``len(subset) + 1`` offsets.
+        """
+
+        column = self._table.column('hints.hint').chunk(0) if self._table.num_rows > 0 else None
+        if not self._instances and self._dense:
+            if column is None:
+                return np.zeros(1, dtype=np.int64)
+            return column.offsets.to_numpy().astype(np.int64) - column.offsets[0].as_py()
+        counts = [len(self._instances[q_id]._hints) if q_id in self._instances else len(column[row])
+                  for q_id, row in self._rows.items()]
+        return np.concatenate([[0], np.cumsum(counts, dtype=np.int64)]).astype(np.int64)
+
+    def hint_texts(self) -> List[str]:
+        """
+        Retrieves the text of every hint as one flat list, in the order of :meth:`get_instance_ids`.
+
+        Returns
+        -------
+        list[str]
+            The hint texts.
+
+        See Also
+        --------
+        hint_offsets :
+            Retrieves the offsets of the hints of every instance.
+        """
+
+        column = self._table.column('hints.hint')
+        if not self._instances and self._dense:
+            return column.combine_chunks().flatten().to_pylist()
+        texts = []
+        for q_id, row in self._rows.items():
+            if q_id in self._instances:
+                texts.extend(hint.hint for hint in self._instances[q_id]._hints)
+            else:
+                texts.extend(column[row].as_py())
+        return texts
+
+    def metric_names(self, level: str = 'hints') -> List[str]:
+        """
+        Retrieves the names of the metrics stored in the columns for the given level.
+
+        Parameters
+        ----------
+        level : {'question', 'answers', 'hints'}, default 'hints'
+            The level of the metrics.
+
+        Returns
+        -------
+        list[str]
+            The metric names, i.e., the keys of the `metrics` dictionaries.
+        """
+
+        if level not in _LEVELS:
+            raise ValueError(f'Invalid level: "{level}". Valid levels are: {", ".join(_LEVELS)}.')
+        names = [key for key, _ in self._metric_columns(level)]
+        for instance in self._instances.values():
+            if level == 'question':
+                owners = [instance.question]
+            else:
+                owners = instance._answers if level == 'answers' else instance._hints
+            for owner in owners:
+                names.extend(key for key in owner.metrics if key not in names)
+        return names
+
+    def metric_values(self, name: str, level: str = 'hints') -> np.ndarray:
+        """
+        Retrieves the values of a numeric metric for every question, answer or hint as a flat float array.
+
+        Parameters
+        ----------
+        name : str
+            The name of the metric, i.e., its key in the `metrics` dictionaries, such as "relevance-rouge1".
+        level : {'question', 'answers', 'hints'}, default 'hints'
+            The level of the metric.
+
+        Returns
+        -------
+        numpy.ndarray
+            A float64 array with one value per question, answer or hint, in the order of :meth:`get_instance_ids`.
+            Missing values are NaN.
+
+        Raises
+        ------
+        ValueError
+            If the level is not valid or the metric is not numeric.
+
+        Examples
+        -------
+        >>> from hinteval.cores import ColumnarSubset, Instance, Metric
+        >>>
+        >>> instance = Instance.from_strings("What is the capital of France?", ["Paris"], ["City of Lights."])
+        >>> instance.hints[0].metrics['relevance-rouge1'] = Metric('relevance', 0.25)
+        >>> subset = ColumnarSubset()
+        >>> subset.add_instance(instance, "q1")
+        >>> subset.compact()
+        >>> print(subset.metric_values('relevance-rouge1'))
+        # [0.25]
+
+        See Also
+        --------
+        hint_offsets :
+            Retrieves the offsets of the hints of every instance.
+        """
+
+        if level not in _LEVELS:
+            raise ValueError(f'Invalid level: "{level}". Valid levels are: {", ".join(_LEVELS)}.')
+        column_name = f'{level}.metrics.{name}'
+        column = None
+        if column_name in self._table.column_names and self._table.num_rows > 0:
+            column = self._table.column(column_name).chunk(0)
+            if level != 'question':
+                column = column.flatten()
+            if column.type.field('value').type == pa.string():
+                raise ValueError(f'The metric "{name}" is not numeric.')
+
+        def values_of(instance):
+            if level == 'question':
+                owners = [instance.question]
+            else:
+                owners = instance._answers if level == 'answers' else instance._hints
+            return np.array([owner.metrics[name].value if name in owner.metrics else np.nan for owner in owners],
+                            dtype=np.float64)
+
+        def column_values(start, stop):
+            if column is None:
+                return np.full(stop - start, np.nan, dtype=np.float64)
+            return column.slice(start, stop - start).flatten()[0].to_numpy(zero_copy_only=False).astype(np.float64)
+
+        if level == 'question':
+            offsets = np.arange(self._table.num_rows + 1, dtype=np.int64)
+        else:
+            items = self._table.column(f'{level}.{level[:-1]}')
+            offsets = items.chunk(0).offsets.to_numpy() if self._table.num_rows > 0 else np.zeros(1, dtype=np.int64)
+        if not self._instances and self._dense:
+            return column_values(int(offsets[0]), int(offsets[-1]))
+        segments = [values_of(self._instances[q_id]) if q_id in self._instances else
+                    column_values(int(offsets[row]), int(offsets[row + 1])) for q_id, row in self._rows.items()]
+        return np.concatenate(segments) if segments else np.zeros(0, dtype=np.float64)
+
+    def _iter_instances(self):
+        for q_id in self._rows:
+            if q_id in self._instances:
+                yield q_id, self._instances[q_id]
+            else:
+                yield q_id, Instance.from_dict(self._row_dict(self._rows[q_id]))
+
+    def _metric_pairs(self, metric_name: str, level: str):
+        try:
+            values = self.metric_values(metric_name, level)
+        except ValueError:
+            return [pair for q_id, instance in self._iter_instances() for pair in
+                    _instance_metric_pairs(q_id, instance, metric_name, level)]
+        q_ids = self.get_instance_ids()
+        positions = np.flatnonzero(~np.isnan(values))
+        if level == 'question':
+            return [(values[pos].item(), q_ids[pos]) for pos in positions]
+        if level == 'hints':
+            counts = np.diff(self.hint_offsets())
+        else:
+            counts = np.array([len(instance._answers) for _, instance in self._iter_instances()], dtype=np.int64)
+        instance_index, item_index = _hint_indices(counts)
+        return [(values[pos].item(), (q_ids[instance_index[pos]], int(item_index[pos]))) for pos in positions]
+
+    def _question_type_pairs(self):
+        column = self._table.column('question.question_type')
+        for q_id, row in self._rows.items():
+            if q_id in self._instances:
+                yield q_id, self._instances[q_id]._question._question_type
+            else:
+                question_type = column[row].as_py()
+                yield q_id, json.loads(question_type) if question_type is not None else dict()
+
+    def _entity_type_pairs(self, level):
+        columns = [f'{name}.entities' for name in ('question', 'answers', 'hints') if level in (None, name)]
+        columns = [self._table.column(column) for column in columns]
+        for q_id, row in self._rows.items():
+            if q_id in self._instances:
+                yield q_id, _instance_entity_types(self._instances[q_id], level)
+                continue
+            ent_types = set()
+            for column in columns:
+                cells = column[row].as_py()
+                for cell in (cells if isinstance(cells, list) else [cells]):
+                    if cell is not None:
+                        ent_types.update(entity['ent_type'] for entity in json.loads(cell))
+            yield q_id, ent_types
+
+    def _build_metric_matrix(self, metric_names: List[str]):
+        counts = np.diff(self.hint_offsets())
+        matrix = np.empty((int(counts.sum()), len(metric_names)), dtype=np.float64)
+        for col, name in enumerate(metric_names):
+            matrix[:, col] = self.metric_values(name)
+        instance_index, hint_index = _hint_indices(counts)
+        return matrix, instance_index, hint_index
+
+    def __len__(self):
+        if self._row_index is None:
+            return self._table.num_rows
+        return len(self._row_index)
+
+    def __eq__(self, other):
+        if isinstance(other, Subset):
+            if self.name != other.name or sorted(self.get_instance_ids()) != sorted(other.get_instance_ids()):
+                return False
+            return all(Instance.from_dict(self._instance_dict(q_id)) == other.get_instance(q_id)
+                       for q_id in self._rows)
+        return False
@@ -1,14 +1,77 @@
+import io
 import os
+import gc
 import json
+import hashlib
 import pickle
 import gzip
+import struct
 import random as rnd
+import numpy as np
+import pyarrow as pa
+from concurrent.futures import ProcessPoolExecutor
 from prettytable import PrettyTable
-from typing import Dict, Literal, Union
-from hinteval.cores.dataset_core import Entity, Metric, Question, Answer, Hint, Instance, Subset
+from typing import Dict, List, Literal, Optional, Tuple, Union
+from hinteval.cores.dataset_core import Entity, Metric, Question, Answer, Hint, Instance, Subset, TextPool
+from hinteval.cores.dataset.columnar import ColumnarSubset, _project_dict, _project_table, _id_index_table
 from hinteval.utils.identify_functions import identify_entities, identify_question_type
 from hinteval.utils.functions.download_manager import DatasetDownloader
 
+_ARROW_MAGIC = b'HEVARW01'
+_LOG_MAGIC = b'HEVLOG01'
+_ARROW_ALIGNMENT = 64
+_MANIFEST = 'manifest.json'
+
+
+def _digest(data):
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer)
+    # Without the memo, equal values give equal bytes regardless of which objects are shared.
+    pickler.fast = True
+    pickler.dump(data)
+    return hashlib.blake2b(buffer.getvalue(), digest_size=16).digest()
+
+
+def _imap(function, workers, *iterables):
+    # Yields the results in order as they arrive, so the caller works on the first ones while the rest are computed.
+    if workers <= 1:
+        yield from map(function, *iterables)
+        return
+    with ProcessPoolExecutor(workers) as executor:
+        yield from executor.map(function, *iterables)
+
+
+def _map(function, workers, *iterables):
+    return list(_imap(function, workers, *iterables))
+
+
+def _write_shard(path, payload):
+    with gzip.open(path, 'wb') as f:
+        f.write(payload)
+
+
+def _read_shard(path, columnar):
+    with gzip.open(path, 'rb') as f:
+        instances = pickle.loads(f.read())
+    if not columnar:
+        return instances
+    # The columns are built in the worker, so the main process only has to concatenate the Arrow buffers.
+    table = ColumnarSubset._from_items(None, None, instances.items())._table
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _concat_tables(tables):
+    try:
+        return pa.concat_tables(tables, promote_options='permissive')
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # A metric is stored with different types in different shards, so the rows are encoded again together.
+        parts = [ColumnarSubset._from_table(None, None, table) for table in tables]
+        return ColumnarSubset._from_items(None, None, ((q_id, part._row_dict(row)) for part in parts for
+                                                       q_id, row in part._rows.items()))._table
+
 
 class _CoreEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -82,6 +145,27 @@ class Dataset:
         self.description = description
         self.metadata: Dict[str, Union[str, int, float]] = metadata if metadata is not None else {}
         self._subsets: Dict[str, Subset] = dict()
+        self._text_pool = TextPool()
+        self._commit_state = None
+        self._projected_from = None
+
+    @property
+    def text_pool(self) -> TextPool:
+        """
+        The pool that keeps a single copy of every distinct question and answer text of the dataset.
+
+        Returns
+        -------
+        TextPool
+            The text pool of the dataset.
+
+        See Also
+        --------
+        TextPool :
+            Deduplicates question and answer texts and assigns them stable content keys.
+        """
+
+        return self._text_pool
 
     @classmethod
     def available_datasets(cls, show_info=False, update=False) -> Dict:
@@ -172,6 +256,8 @@ class Dataset:
         if subset.name in self._subsets.keys():
             raise ValueError(f'The subset "{subset.name}" is already.')
         subset._dataset_object = self
+        for instance in subset._instances.values():
+            self._text_pool.intern_instance(instance)
         self._subsets[subset.name] = subset
 
     def remove_subset(self, name: str):
@@ -350,6 +436,198 @@ class Dataset:
 
         return list(self._subsets.values())
 
+    def metric_matrix(self, metric_names: List[str], subsets: List[str] = None) -> Tuple[
+        np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Collects the values of the given metrics for all hints of the dataset into a single matrix.
+
+        The matrices of the subsets are built with :meth:`Subset.metric_matrix` (and cached there) and stacked in the
+        order of the subsets.
+
+        Parameters
+        ----------
+        metric_names : list[str]
+            The names of the metrics, i.e., their keys in the `metrics` dictionaries of the hints.
+        subsets : list[str], optional
+            The names of the subsets to include (default is None, which includes all subsets).
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+            A float64 matrix of shape (n_hints, n_metrics) with NaN for missing values, the position of the instance of
+            every row among the instances of the included subsets (in the order of the subsets and of their
+            :meth:`Subset.get_instance_ids`), and the position of the hint of every row in its instance.
+
+        Raises
+        ------
+        ValueError
+            If a subset does not exist in the dataset or a metric has a non-numeric value.
+
+        Examples
+        --------
+        >>> from hinteval import Dataset
+        >>>
+        >>> dataset = Dataset.download_and_load_dataset('triviahg')
+        >>> matrix, instance_index, hint_index = dataset.metric_matrix(['convergence-llm-llama-3-70b'], ['test'])
+        >>> print(matrix.shape)
+        # (1400, 1)
+
+        See Also
+        --------
+        Subset.metric_matrix :
+            Collects the values of the given metrics for all hints of a subset into a single matrix.
+        """
+
+        names = self.get_subsets_name() if subsets is None else subsets
+        matrices, instance_indexes, hint_indexes = [], [], []
+        num_of_instances = 0
+        for name in names:
+            matrix, instance_index, hint_index = self.get_subset(name).metric_matrix(metric_names)
+            matrices.append(matrix)
+            instance_indexes.append(instance_index + num_of_instances)
+            hint_indexes.append(hint_index)
+            num_of_instances += len(self.get_subset(name))
+        if len(matrices) == 0:
+            return np.zeros((0, len(metric_names))), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(matrices), np.concatenate(instance_indexes), np.concatenate(hint_indexes)
+
+    def where(self, metric: str, lt: float = None, le: float = None, gt: float = None, ge: float = None,
+              level: str = 'hints') -> Dict[str, list]:
+        """
+        Finds, in every subset, the hints (or answers or questions) whose value of a metric lies in the given range.
+
+        Parameters
+        ----------
+        metric : str
+            The name of the metric, i.e., its key in the `metrics` dictionaries, such as "convergence-llm-llama-3-70b".
+        lt : float, optional
+            Keeps values strictly less than `lt`.
+        le : float, optional
+            Keeps values less than or equal to `le`.
+        gt : float, optional
+            Keeps values strictly greater than `gt`.
+        ge : float, optional
+            Keeps values greater than or equal to `ge`.
+        level : {'question', 'answers', 'hints'}, default 'hints'
+            The level of the metric.
+
+        Returns
+        -------
+        dict[str, list]
+            The results of :meth:`Subset.where` for every subset, keyed by the name of the subset.
+
+        Examples
+        --------
+        >>> from hinteval import Dataset
+        >>>
+        >>> dataset = Dataset.download_and_load_dataset('triviahg')
+        >>> results = dataset.where(metric='convergence-llm-llama-3-70b', lt=0.3)
+        >>> print(results['test'][:2])
+        # [('test_1234567', 2), ('test_7654321', 0)]
+
+        See Also
+        --------
+        Subset.where :
+            Finds the hints of a subset whose value of a metric lies in the given range.
+        """
+
+        return {name: subset.where(metric, lt=lt, le=le, gt=gt, ge=ge, level=level) for name, subset in
+                self._subsets.items()}
+
+    def by_question_type(self, major: str, minor: str = None) -> Dict[str, List[str]]:
+        """
+        Finds, in every subset, the instances whose question has the given type.
+
+        Parameters
+        ----------
+        major : str
+            The major (coarse) type of the question, either its code (e.g., "HUM") or the full label.
+        minor : str, optional
+            The minor (fine) type of the question, either its code (e.g., "ind") or the full label (default is None,
+            which matches all minor types).
+
+        Returns
+        -------
+        dict[str, list[str]]
+            The ids of the matching instances for every subset, keyed by the name of the subset.
+
+        Examples
+        --------
+        >>> from hinteval import Dataset
+        >>>
+        >>> dataset = Dataset.download_and_load_dataset('triviahg')
+        >>> print(len(dataset.by_question_type('HUM')['test']))
+        # 512
+
+        See Also
+        --------
+        Subset.by_question_type :
+            Finds the instances of a subset whose question has the given type.
+        """
+
+        return {name: subset.by_question_type(major, minor) for name, subset in self._subsets.items()}
+
+    def by_entity_type(self, ent_type: str, level: str = None) -> Dict[str, List[str]]:
+        """
+        Finds, in every subset, the instances that contain an entity of the given type.
+
+        Parameters
+        ----------
+        ent_type : str
+            The type of the entity, such as "PERSON".
+        level : {'question', 'answers', 'hints'}, optional
+            Only looks for the entities of the question, the answers, or the hints (default is None, which looks
+            everywhere).
+
+        Returns
+        -------
+        dict[str, list[str]]
+            The ids of the matching instances for every subset, keyed by the name of the subset.
+
+        Examples
+        --------
+        >>> from hinteval import Dataset
+        >>>
+        >>> dataset = Dataset.download_and_load_dataset('triviahg')
+        >>> print(len(dataset.by_entity_type('PERSON', level='question')['test']))
+        # 301
+
+        See Also
+        --------
+        Subset.by_entity_type :
+            Finds the instances of a subset that contain an entity of the given type.
+        """
+
+        return {name: subset.by_entity_type(ent_type, level) for name, subset in self._subsets.items()}
+
+    def to_columnar(self):
+        """
+        Converts every subset of the dataset into a :class:`ColumnarSubset`, in place.
+
+        Columnar subsets keep their questions, answers, hints and metrics in compact Arrow columns and only build
+        :class:`Instance` objects when they are accessed, which reduces the memory footprint of large datasets.
+
+        Examples
+        --------
+        >>> from hinteval import Dataset
+        >>>
+        >>> dataset = Dataset.download_and_load_dataset('triviahg')
+        >>> dataset.to_columnar()
+        >>> print(type(dataset['test']).__name__)
+        # ColumnarSubset
+
+        See Also
+        --------
+        load :
+            Loads a Dataset instance from a file.
+        """
+
+        for name, subset in list(self._subsets.items()):
+            if not isinstance(subset, ColumnarSubset):
+                columnar = ColumnarSubset.from_subset(subset)
+                columnar._dataset_object = self
+                self._subsets[name] = columnar
+
     def to_dict(self):
         """
         Converts the Dataset instance into a dictionary.
@@ -437,7 +715,7 @@ class Dataset:
             json.dump(self.to_dict(), f, indent=4)
 
     @classmethod
-    def load_json(cls, path):
+    def load_json(cls, path, columnar=False):
         """
         Loads a Dataset instance from a JSON file.
 
@@ -445,6 +723,9 @@ class Dataset:
         ----------
         path : str
             The file path to load the JSON representation of the Dataset instance.
+        columnar : bool, optional
+            Whether to load the subsets as :class:`ColumnarSubset` objects, which keep the instances in compact
+            columns and only build them on access (default is False).
 
         Returns
         -------
@@ -483,8 +764,182 @@ class Dataset:
         url = data['url']
         metadata = data['metadata']
         new_cls = cls(name=name, url=url, version=version, description=description, metadata=metadata)
+        subset_cls = ColumnarSubset if columnar else Subset
         for subset in data['subsets'].values():
-            new_cls.add_subset(Subset.from_dict(subset))
+            new_cls.add_subset(subset_cls.from_dict(subset))
+        return new_cls
+
+    def store_jsonl(self, path):
+        """
+        Stores the Dataset instance as a JSON Lines file, writing one instance per line.
+
+        The first line is a header record with the dataset attributes, and every subset starts with a record holding
+        its name and metadata, followed by one record per instance. Instances are written one at a time, so the
+        memory used does not grow with the size of the dataset.
+
+        Parameters
+        ----------
+        path : str
+            The file path to store the JSON Lines representation of the Dataset instance.
+
+        Examples
+        --------
+        >>> from hinteval.cores import Subset
+        >>> from hinteval import Dataset
+        >>>
+        >>> dataset = Dataset('Hint_Dataset')
+        >>> training = Subset(name='training_set')
+        >>> validation = Subset(name='validation_set')
+        >>> dataset.add_subset(training)
+        >>> dataset.add_subset(validation)
+        >>> dataset.store_jsonl('./dataset.jsonl')
+
+        See Also
+        --------
+        iter_jsonl :
+            Iterates over the instances of a JSON Lines file.
+
+        load_jsonl :
+            Loads a Dataset instance from a JSON Lines file.
+        """
+
+        with open(path, 'w') as f:
+            header = {'record': 'dataset', 'name': self.name, 'version': self.version,
+                      'description': self.description, 'url': self.url, 'metadata': self.metadata}
+            f.write(json.dumps(header) + '\n')
+            for subset in self._subsets.values():
+                f.write(json.dumps({'record': 'subset', 'name': subset.name, 'metadata': subset.metadata,
+                                    'id_mode': subset.id_mode}) + '\n')
+                for q_id in subset.get_instance_ids():
+                    record = {'record': 'instance', 'subset': subset.name, 'id': q_id,
+                              'instance': subset._instance_dict(q_id)}
+                    f.write(json.dumps(record) + '\n')
+
+    @staticmethod
+    def _read_jsonl(path):
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    @classmethod
+    def iter_jsonl(cls, path):
+        """
+        Iterates over the instances of a JSON Lines file written by :meth:`store_jsonl`, one line at a time.
+
+        Only the instance being yielded is kept in memory, so arbitrarily large files can be processed.
+
+        Parameters
+        ----------
+        path : str
+            The file path of the JSON Lines representation of the Dataset instance.
+
+        Yields
+        ------
+        tuple[Subset, str, Instance]
+            The subset the instance belongs to (holding only its name and metadata), the instance id and the instance.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the specified file path does not exist.
+        KeyError
+            If required keys are missing in a record.
+
+        Examples
+        --------
+        >>> from hinteval import Dataset
+        >>>
+        >>> for subset, q_id, instance in Dataset.iter_jsonl('./dataset.jsonl'):
+        ...     print(subset.name, q_id, instance.question.question)
+        # training_set q1 What is the capital of France?
+
+        See Also
+        --------
+        store_jsonl :
+            Stores the Dataset instance as a JSON Lines file.
+
+        load_jsonl :
+            Loads a Dataset instance from a JSON Lines file.
+        """
+
+        subset = None
+        for record in cls._read_jsonl(path):
+            if record['record'] == 'subset':
+                subset = Subset.from_dict(record)
+            elif record['record'] == 'instance':
+                if subset is None or subset.name != record['subset']:
+                    subset = Subset(name=record['subset'])
+                yield subset, record['id'], Instance.from_dict(record['instance'])
+
+    @classmethod
+    def load_jsonl(cls, path, columnar=False):
+        """
+        Loads a Dataset instance from a JSON Lines file written by :meth:`store_jsonl`.
+
+        Parameters
+        ----------
+        path : str
+            The file path of the JSON Lines representation of the Dataset instance.
+        columnar : bool, optional
+            Whether to load the subsets as :class:`ColumnarSubset` objects, which keep the instances in compact
+            columns and only build them on access (default is False).
+
+        Returns
+        -------
+        Dataset
+            A new Dataset object initialized from the JSON Lines file.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the specified file path does not exist.
+        KeyError
+            If required keys are missing in the JSON Lines file.
+
+        Examples
+        --------
+        >>> from hinteval import Dataset
+        >>>
+        >>> dataset_loaded = Dataset.load_jsonl('./dataset.jsonl')
+        >>> print(dataset_loaded.name)
+        # Hint_Dataset
+
+        See Also
+        --------
+        store_jsonl :
+            Stores the Dataset instance as a JSON Lines file.
+
+        iter_jsonl :
+            Iterates over the instances of a JSON Lines file.
+        """
+
+        new_cls = None
+        subsets = dict()
+        for record in cls._read_jsonl(path):
+            if record['record'] == 'dataset':
+                new_cls = cls(name=record['name'], url=record['url'], version=record['version'],
+                              description=record['description'], metadata=record['metadata'])
+            elif record['record'] == 'subset':
+                subsets[record['name']] = {'name': record['name'], 'metadata': record['metadata'],
+                                           'id_mode': record.get('id_mode', 'random'), 'instances': {}}
+            elif record['record'] == 'instance':
+                if record['subset'] not in subsets:
+                    subsets[record['subset']] = {'name': record['subset'], 'instances': {}}
+                if columnar:
+                    subsets[record['subset']]['instances'][record['id']] = record['instance']
+                else:
+                    subset = subsets[record['subset']]
+                    if not isinstance(subset, Subset):
+                        subset = subsets[record['subset']] = Subset.from_dict(subset)
+                    subset.add_instance(Instance.from_dict(record['instance']), record['id'])
+        if new_cls is None:
+            raise KeyError(f'The file "{path}" has no dataset header record.')
+        for subset in subsets.values():
+            if isinstance(subset, dict):
+                subset = ColumnarSubset.from_dict(subset) if columnar else Subset.from_dict(subset)
+            new_cls.add_subset(subset)
         return new_cls
 
     def store(self, path):
@@ -521,14 +976,27 @@ class Dataset:
             pickle.dump(self.to_dict(), f)
 
     @classmethod
-    def load(cls, path):
+    def load(cls, path, columnar=False, subsets: List[str] = None, fields: List[str] = None):
         """
         Loads a Dataset instance from a file.
 
+        Files written by :meth:`store`, :meth:`commit` and :meth:`store_arrow` are supported. Only the Arrow format
+        written by :meth:`store_arrow` can skip the subsets and fields that are not requested without decoding them;
+        the other formats are decoded completely and projected afterwards.
+
         Parameters
         ----------
         path : str
             The file path to load the Dataset instance.
+        columnar : bool, optional
+            Whether to load the subsets as :class:`ColumnarSubset` objects, which keep the instances in compact
+            columns and only build them on access (default is False).
+        subsets : list[str], optional
+            The names of the subsets to load (default is None, which loads all subsets).
+        fields : list[str], optional
+            The fields of the instances to load, as dotted paths that may contain wildcards, e.g.,
+            ``['question', 'hints.hint', 'hints.metrics.convergence-*']``. A path selects all the fields below it.
+            Fields that are not loaded are left empty (default is None, which loads all fields).
 
         Returns
         -------
@@ -539,6 +1007,8 @@ class Dataset:
         ------
         FileNotFoundError
             If the specified file path does not exist.
+        ValueError
+            If one of the requested subsets is not in the file.
         Exception
             If the specified file is correpted.
 
@@ -549,6 +1019,9 @@ class Dataset:
         >>> dataset_loaded = Dataset.load('./dataset.pickle')
         >>> print(dataset_loaded.name)
         # Hint_Dataset
+        >>> dataset_loaded = Dataset.load('./dataset.arrow', subsets=['test'], fields=['question', 'hints.hint'])
+        >>> print(dataset_loaded.get_subsets_name())
+        # ['test']
 
         See Also
         --------
@@ -557,24 +1030,490 @@ class Dataset:
 
         store :
             Stores the Dataset instance.
+
+        commit :
+            Appends the changes of the Dataset instance to a commit log.
         """
 
-        with gzip.open(path, 'rb') as f:
-            data = pickle.load(f)
+        with open(path, 'rb') as f:
+            magic = f.read(len(_LOG_MAGIC))
+        if magic == _ARROW_MAGIC:
+            new_cls = cls.open(path, subsets=subsets, fields=fields)
+            if not columnar:
+                for name in new_cls.get_subsets_name():
+                    new_cls.add_subset(new_cls._subsets.pop(name).to_subset())
+            return new_cls
+        is_log = magic == _LOG_MAGIC
+        if is_log:
+            data, digests = cls._replay_log(path)
+        else:
+            with gzip.open(path, 'rb') as f:
+                data = pickle.load(f)
         name = data['name']
         version = data['version']
         description = data['description']
         url = data['url']
         metadata = data['metadata']
         new_cls = cls(name=name, url=url, version=version, description=description, metadata=metadata)
-        for subset in data['subsets'].values():
-            new_cls.add_subset(Subset.from_dict(subset))
+        subset_cls = ColumnarSubset if columnar else Subset
+        for subset in cls._select_subsets(data['subsets'], subsets).values():
+            if fields is not None:
+                subset = dict(subset, instances={q_id: _project_dict(instance, fields) for q_id, instance in
+                                                 subset.get('instances', {}).items()})
+            new_cls.add_subset(subset_cls.from_dict(subset))
+        if subsets is not None or fields is not None:
+            new_cls._projected_from = os.path.abspath(path)
+        elif is_log:
+            new_cls._set_commit_state(path, digests)
+        return new_cls
+
+    @staticmethod
+    def _select_subsets(subsets: Dict, names: List[str] = None) -> Dict:
+        if names is None:
+            return subsets
+        for name in names:
+            if name not in subsets:
+                raise ValueError(f'The subset "{name}" is not in the subsets.')
+        return {name: subset for name, subset in subsets.items() if name in names}
+
+    def _attributes(self):
+        return {'name': self.name, 'version': self.version, 'description': self.description, 'url': self.url,
+                'metadata': self.metadata}
+
+    def _set_commit_state(self, path, digests):
+        self._commit_state = {
+            'path': os.path.abspath(path),
+            'dataset': _digest(self._attributes()),
+            'digests': digests,
+            'metadata': {name: _digest((subset.metadata, subset.id_mode)) for name, subset in self._subsets.items()},
+            # The subsets are compared by identity, so a subset that replaced another under the same name is new.
+            'versions': {name: (subset, subset._version) for name, subset in self._subsets.items()},
+            'tables': {name: subset._table for name, subset in self._subsets.items() if
+                       isinstance(subset, ColumnarSubset)}
+        }
+
+    @staticmethod
+    def _read_log(path):
+        with open(path, 'rb') as f:
+            f.read(len(_LOG_MAGIC))
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    break
+                size = struct.unpack('<Q', header)[0]
+                payload = f.read(size)
+                if len(payload) < size:
+                    # The last commit was interrupted while being written.
+                    break
+                yield pickle.loads(gzip.decompress(payload))
+
+    @classmethod
+    def _replay_log(cls, path):
+        data, digests = None, dict()
+        for segment in cls._read_log(path):
+            if segment['snapshot'] or data is None:
+                data, digests = {'subsets': dict()}, dict()
+            data.update(segment['dataset'])
+            for name in segment['removed_subsets']:
+                data['subsets'].pop(name, None)
+                digests.pop(name, None)
+            for name, changes in segment['subsets'].items():
+                subset = data['subsets'].setdefault(name, {'name': name, 'instances': dict()})
+                subset_digests = digests.setdefault(name, dict())
+                subset['metadata'] = changes['metadata']
+                subset['id_mode'] = changes.get('id_mode', 'random')
+                for q_id in changes['removed']:
+                    subset['instances'].pop(q_id, None)
+                    subset_digests.pop(q_id, None)
+                subset['instances'].update(changes['instances'])
+                subset_digests.update(changes['digests'])
+        if data is None:
+            raise ValueError(f'The commit log "{path}" is empty.')
+        return data, digests
+
+    def commit(self, path, compact=False, compare_all=False):
+        """
+        Appends the changes made to the Dataset instance since its last commit to a commit log file.
+
+        The first commit to a file (or a commit with `compact=True`) writes a snapshot of the whole dataset. Later
+        commits append only the instances, subsets and attributes that were added, changed or removed, so saving after
+        each evaluation step costs a fraction of :meth:`store`. Every subset records which of its instances changed:
+        instances that were added, whose question, answers or hints were replaced or changed in place, and whose
+        metrics, metric values, entities or question types were set, as evaluators and :meth:`prepare_dataset` do.
+        Only those instances are serialized and compared with the digest recorded by the previous commit. The commit
+        log is read back by :meth:`load`.
+
+        Changes made in place to texts, entity fields or metadata, e.g., `hint.metadata['source'] = 'wiki'`, are not
+        recorded. Use `compare_all=True` after such changes to compare the digest of every instance.
+
+        Parameters
+        ----------
+        path : str
+            The file path of the commit log.
+        compact : bool, optional
+            Whether to rewrite the commit log as a single snapshot, dropping the history of changes (default is False).
+        compare_all : bool, optional
+            Whether to compare the digest of every instance instead of only the ones marked as changed
+            (default is False).
+
+        Raises
+        ------
+        ValueError
+            If the Dataset instance was loaded from `path` with only some of its subsets or fields.
+
+        Examples
+        --------
+        >>> from hinteval.cores import Subset, Instance
+        >>> from hinteval.evaluation.relevance import Rouge
+        >>> from hinteval import Dataset
+        >>>
+        >>> dataset = Dataset('Hint_Dataset')
+        >>> subset = Subset(name='training_set')
+        >>> subset.add_instance(Instance.from_strings("What is the capital of France?", ["Paris"], ["City of Lights."]))
+        >>> dataset.add_subset(subset)
+        >>> dataset.commit('./dataset.log')
+        >>> Rouge('rouge1').evaluate(subset.get_instances())
+        >>> dataset.commit('./dataset.log')  # appends only the new metrics
+        >>> dataset_loaded = Dataset.load('./dataset.log')
+
+        See Also
+        --------
+        load :
+            Loads a Dataset instance from a file.
+
+        store :
+            Stores the Dataset instance.
+        """
+
+        if self._projected_from == os.path.abspath(path):
+            raise ValueError(f'The dataset was loaded from "{path}" with only some of its subsets or fields, '
+                             f'so committing it to the same file would drop the others.')
+        state = self._commit_state
+        snapshot = compact or state is None or state['path'] != os.path.abspath(path) or not os.path.exists(path)
+        segment = {'dataset': self._attributes(), 'snapshot': snapshot, 'subsets': dict(), 'removed_subsets': []}
+        digests = dict()
+        if not snapshot:
+            segment['removed_subsets'] = [name for name in state['digests'] if name not in self._subsets]
+        for name, subset in self._subsets.items():
+            subset._sync()
+            known = not snapshot and name in state['digests']
+            old_digests = state['digests'][name] if known else dict()
+            old_subset, old_version = state['versions'].get(name, (None, 0)) if known else (None, 0)
+            tracked = old_subset is subset and not compare_all
+            changed = subset._changed_since(old_version) if tracked else set()
+            unchanged_table = isinstance(subset, ColumnarSubset) and known and state['tables'].get(name) is subset._table
+            digests[name] = dict()
+            instances = dict()
+            for q_id in subset.get_instance_ids():
+                if unchanged_table and q_id in old_digests and q_id not in subset._instances:
+                    digests[name][q_id] = old_digests[q_id]
+                    continue
+                if tracked and q_id in subset._instances and q_id in old_digests and q_id not in changed:
+                    digests[name][q_id] = old_digests[q_id]
+                    continue
+                instance = subset._instance_dict(q_id)
+                digests[name][q_id] = _digest(instance)
+                if old_digests.get(q_id) != digests[name][q_id]:
+                    instances[q_id] = instance
+            removed = [q_id for q_id in old_digests if q_id not in digests[name]]
+            if not known or instances or removed or state['metadata'][name] != _digest((subset.metadata, subset.id_mode)):
+                segment['subsets'][name] = {'metadata': subset.metadata, 'id_mode': subset.id_mode,
+                                            'instances': instances, 'removed': removed,
+                                            'digests': {q_id: digests[name][q_id] for q_id in instances}}
+        if snapshot or segment['subsets'] or segment['removed_subsets'] or state['dataset'] != _digest(
+                self._attributes()):
+            payload = gzip.compress(pickle.dumps(segment))
+            if snapshot:
+                temp_path = f'{path}.tmp'
+                with open(temp_path, 'wb') as f:
+                    f.write(_LOG_MAGIC)
+                    f.write(struct.pack('<Q', len(payload)))
+                    f.write(payload)
+                os.replace(temp_path, path)
+            else:
+                with open(path, 'ab') as f:
+                    f.write(struct.pack('<Q', len(payload)))
+                    f.write(payload)
+        self._set_commit_state(path, digests)
+
+    def store_arrow(self, path):
+        """
+        Stores the Dataset instance in a binary format that can be memory-mapped by :meth:`open`.
+
+        Every subset is written as an Apache Arrow IPC block with the layout of :class:`ColumnarSubset` and a block
+        with its instance ids in sorted order, followed by a footer holding the dataset attributes and the offsets of
+        the blocks of every subset in the file.
+
+        Parameters
+        ----------
+        path : str
+            The file path to store the Dataset instance.
+
+        Examples
+        --------
+        >>> from hinteval.cores import Subset
+        >>> from hinteval import Dataset
+        >>>
+        >>> dataset = Dataset('Hint_Dataset')
+        >>> training = Subset(name='training_set')
+        >>> dataset.add_subset(training)
+        >>> dataset.store_arrow('./dataset.arrow')
+
+        See Also
+        --------
+        open :
+            Opens a file written by `store_arrow` without reading it into memory.
+
+        store :
+            Stores the Dataset instance.
+        """
+
+        subsets = dict()
+        with open(path, 'wb') as f:
+            f.write(_ARROW_MAGIC)
+            for name, subset in self._subsets.items():
+                if not isinstance(subset, ColumnarSubset):
+                    subset = ColumnarSubset.from_subset(subset)
+                table = subset._to_table()
+                subsets[name] = {'metadata': subset.metadata, 'id_mode': subset.id_mode}
+                for key, table in (('', table), ('index_', _id_index_table(table))):
+                    sink = pa.BufferOutputStream()
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+                    block = sink.getvalue()
+                    f.write(b'\x00' * (-f.tell() % _ARROW_ALIGNMENT))
+                    subsets[name].update({f'{key}offset': f.tell(), f'{key}length': block.size})
+                    f.write(block)
+            footer = {'name': self.name, 'version': self.version, 'description': self.description, 'url': self.url,
+                      'metadata': self.metadata, 'subsets': subsets}
+            footer = json.dumps(footer).encode('utf-8')
+            f.write(footer)
+            f.write(struct.pack('<Q', len(footer)))
+            f.write(_ARROW_MAGIC)
+
+    @classmethod
+    def open(cls, path, subsets: List[str] = None, fields: List[str] = None):
+        """
+        Opens a file written by :meth:`store_arrow` by memory-mapping it.
+
+        Only the footer of the file is read. Every subset is a :class:`ColumnarSubset` whose columns point directly
+        into the mapped file, so ``subset[q_id]`` decodes only the bytes of the requested instance, and processes
+        opening the same file share its pages through the operating system cache. Subsets and columns that are not
+        requested are never read.
+
+        Parameters
+        ----------
+        path : str
+            The file path of the Dataset instance.
+        subsets : list[str], optional
+            The names of the subsets to open (default is None, which opens all subsets).
+        fields : list[str], optional
+            The fields of the instances to open, as dotted paths that may contain wildcards (see :meth:`load`).
+            Fields that are not opened are left empty (default is None, which opens all fields).
+
+        Returns
+        -------
+        Dataset
+            A new Dataset object backed by the mapped file.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the specified file path does not exist.
+        ValueError
+            If the specified file was not written by `store_arrow`, or if one of the requested subsets is not in it.
+
+        Examples
+        --------
+        >>> from hinteval import Dataset
+        >>>
+        >>> dataset = Dataset.open('./dataset.arrow')
+        >>> print(dataset.name)
+        # Hint_Dataset
+
+        See Also
+        --------
+        store_arrow :
+            Stores the Dataset instance in a binary format that can be memory-mapped.
+
+        load :
+            Loads a Dataset instance from a file.
+        """
+
+        source = pa.memory_map(path, 'r')
+
+        def read(length, offset):
+            source.seek(offset)
+            return source.read_buffer(length)
+
+        size = source.size()
+        tail_size = len(_ARROW_MAGIC) + 8
+        if size < len(_ARROW_MAGIC) + tail_size or read(len(_ARROW_MAGIC), 0).to_pybytes() != _ARROW_MAGIC:
+            raise ValueError(f'The file "{path}" is not a HintEval Arrow dataset.')
+        tail = read(tail_size, size - tail_size).to_pybytes()
+        if tail[8:] != _ARROW_MAGIC:
+            raise ValueError(f'The file "{path}" is not a HintEval Arrow dataset.')
+        footer_size = struct.unpack('<Q', tail[:8])[0]
+        footer = json.loads(read(footer_size, size - tail_size - footer_size).to_pybytes())
+        new_cls = cls(name=footer['name'], url=footer['url'], version=footer['version'],
+                      description=footer['description'], metadata=footer['metadata'])
+        for name, subset in cls._select_subsets(footer['subsets'], subsets).items():
+            table = pa.ipc.open_file(read(subset['length'], subset['offset'])).read_all()
+            if fields is not None:
+                table = _project_table(table, fields)
+            # Files written before the id index was added find the ids by reading the whole id column.
+            id_index = pa.ipc.open_file(read(subset['index_length'], subset['index_offset'])).read_all() if \
+                'index_offset' in subset else None
+            new_cls.add_subset(ColumnarSubset._from_table(name, subset['metadata'], table,
+                                                          subset.get('id_mode', 'random'), id_index))
+        return new_cls
+
+    def store_sharded(self, path, num_shards: int = None, workers: int = None):
+        """
+        Stores the Dataset instance as a directory of compressed shards that can be loaded in parallel.
+
+        The instances of every subset are split into `num_shards` shard files, and a manifest holding the dataset
+        attributes and the shards of every subset is written next to them. The shards are compressed and written by
+        a pool of processes.
+
+        Parameters
+        ----------
+        path : str
+            The directory to store the Dataset instance in. It is created if it does not exist.
+        num_shards : int, optional
+            The number of shards per subset (default is None, which uses one shard per worker).
+        workers : int, optional
+            The number of processes used to write the shards (default is None, which uses the number of CPUs).
+
+        Examples
+        --------
+        >>> from hinteval.cores import Subset
+        >>> from hinteval import Dataset
+        >>>
+        >>> dataset = Dataset('Hint_Dataset')
+        >>> training = Subset(name='training_set')
+        >>> dataset.add_subset(training)
+        >>> dataset.store_sharded('./dataset_shards', num_shards=8)
+
+        See Also
+        --------
+        load_sharded :
+            Loads a Dataset instance from a directory written by `store_sharded`.
+
+        store :
+            Stores the Dataset instance.
+        """
+
+        workers = workers if workers is not None else os.cpu_count() or 1
+        num_shards = num_shards if num_shards is not None else workers
+        if num_shards < 1:
+            raise ValueError(f'Invalid number of shards: {num_shards}. It must be at least 1.')
+        os.makedirs(path, exist_ok=True)
+        manifest = {'name': self.name, 'version': self.version, 'description': self.description, 'url': self.url,
+                    'metadata': self.metadata, 'subsets': dict()}
+        paths, payloads = [], []
+        for s_idx, (name, subset) in enumerate(self._subsets.items()):
+            q_ids = subset.get_instance_ids()
+            shard_size = max(1, -(-len(q_ids) // num_shards))
+            shards = []
+            for start in range(0, max(len(q_ids), 1), shard_size):
+                shard = f'subset-{s_idx:04d}-shard-{len(shards):05d}.pickle.gz'
+                shards.append(shard)
+                paths.append(os.path.join(path, shard))
+                payloads.append(pickle.dumps({q_id: subset._instance_dict(q_id) for q_id in
+                                              q_ids[start:start + shard_size]}))
+            manifest['subsets'][name] = {'metadata': subset.metadata, 'id_mode': subset.id_mode,
+                                         'num_instances': len(q_ids), 'shards': shards}
+        _map(_write_shard, workers, paths, payloads)
+        # The manifest is written last, so a directory is never left pointing at shards that were not written.
+        temp_path = os.path.join(path, f'{_MANIFEST}.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, os.path.join(path, _MANIFEST))
+
+    @classmethod
+    def load_sharded(cls, path, workers: int = None, columnar=False):
+        """
+        Loads a Dataset instance from a directory written by :meth:`store_sharded`.
+
+        The shards are decompressed and decoded into dictionaries by a pool of processes and merged into one subset
+        per subset of the manifest. With `columnar=True`, the workers also build the columns of every shard, so
+        almost all of the work is spread over the processes. Without it, the :class:`Instance` objects are built by
+        the main process, shard by shard as the workers finish them, while the workers decode the remaining shards.
+
+        Parameters
+        ----------
+        path : str
+            The directory that holds the manifest and the shards.
+        workers : int, optional
+            The number of processes used to read the shards (default is None, which uses the number of CPUs).
+        columnar : bool, optional
+            Whether to load the subsets as :class:`ColumnarSubset` objects, which keep the instances in compact
+            columns and only build them on access (default is False).
+
+        Returns
+        -------
+        Dataset
+            A new Dataset object initialized from the shards.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the manifest or one of the shards does not exist.
+
+        Examples
+        --------
+        >>> from hinteval import Dataset
+        >>>
+        >>> dataset_loaded = Dataset.load_sharded('./dataset_shards', workers=8)
+        >>> print(dataset_loaded.name)
+        # Hint_Dataset
+
+        See Also
+        --------
+        store_sharded :
+            Stores the Dataset instance as a directory of compressed shards.
+
+        load :
+            Loads a Dataset instance from a file.
+        """
+
+        with open(os.path.join(path, _MANIFEST)) as f:
+            manifest = json.load(f)
+        workers = workers if workers is not None else os.cpu_count() or 1
+        new_cls = cls(name=manifest['name'], url=manifest['url'], version=manifest['version'],
+                      description=manifest['description'], metadata=manifest['metadata'])
+        shards = [(name, os.path.join(path, shard)) for name, subset in manifest['subsets'].items() for shard in
+                  subset['shards']]
+        parts = _imap(_read_shard, workers, [shard for _, shard in shards], [columnar] * len(shards))
+        if columnar:
+            tables = {name: [] for name in manifest['subsets']}
+            for (name, _), part in zip(shards, parts):
+                tables[name].append(pa.ipc.open_stream(part).read_all())
+            for name, subset in manifest['subsets'].items():
+                new_cls.add_subset(ColumnarSubset._from_table(name, subset['metadata'], _concat_tables(tables[name]),
+                                                              subset.get('id_mode', 'random')))
+            return new_cls
+        subsets = {name: Subset(name=name, metadata=subset['metadata'], id_mode=subset.get('id_mode', 'random')) for
+                   name, subset in manifest['subsets'].items()}
+        # As in Subset.from_dict, none of the objects built here can be garbage yet.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for (name, _), instances in zip(shards, parts):
+                for q_id, instance in instances.items():
+                    subsets[name].add_instance(Instance.from_dict(instance), q_id)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        for subset in subsets.values():
+            new_cls.add_subset(subset)
         return new_cls
 
     def prepare_dataset(self, fill_question_types=True, fill_entities=False, batch_size: int = 256,
                         spacy_pipeline: Literal[
                             'en_core_web_sm', 'en_core_web_lg', 'en_core_web_md', 'en_core_web_trf'] = 'en_core_web_sm',
-                        qc_model_force_download=False, enable_tqdm=False):
+                        qc_model_force_download=False, enable_tqdm=False, max_tokens_per_batch: Optional[int] = None):
         """
         Prepares the dataset by detecting question types for questions and entities for questions, hints, and answers.
 
@@ -592,6 +1531,9 @@ class Dataset:
             Whether to force download the question classification model (default is False).
         enable_tqdm : bool, optional
             Whether to enable tqdm progress bar (default is False).
+        max_tokens_per_batch : int, optional
+            The maximum number of tokens in a padded batch of the question classifier. If given, questions of similar
+            length are packed into batches up to this budget instead of `batch_size` questions (default is None).
 
         Examples
         --------
@@ -649,7 +1591,7 @@ class Dataset:
             for instance in instances:
                 questions.append(instance.question)
             identify_question_type(questions, batch_size=batch_size, force_download=qc_model_force_download,
-                                   enable_tqdm=enable_tqdm)
+                                   enable_tqdm=enable_tqdm, max_tokens_per_batch=max_tokens_per_batch)
 
     def __getitem__(self, s_name):
         return self.get_subset(s_name)
@@ -672,16 +1614,27 @@ class Dataset:
         return json.dumps(self.to_dict(), cls=_CoreEncoder, indent=4)
 
     @classmethod
-    def download_and_load_dataset(cls, name, force_download=False):
+    def download_and_load_dataset(cls, name, force_download=False, columnar=False, subsets: List[str] = None,
+                                  fields: List[str] = None):
         """
         Loads a dataset from a local cache or downloads it if not available locally.
 
+        When `subsets` or `fields` are given, the downloaded dataset is also cached in the Arrow format of
+        :meth:`store_arrow` the first time, so that later loads skip the subsets and fields that are not requested.
+
         Parameters
         ----------
         name : str
             The name of the dataset to load.
         force_download : bool, optional
             Whether to force download the dataset even if it already exists locally (default is False).
+        columnar : bool, optional
+            Whether to load the subsets as :class:`ColumnarSubset` objects, which keep the instances in compact
+            columns and only build them on access (default is False).
+        subsets : list[str], optional
+            The names of the subsets to load (default is None, which loads all subsets).
+        fields : list[str], optional
+            The fields of the instances to load (see :meth:`load`) (default is None, which loads all fields).
 
         Returns
         -------
@@ -720,4 +1673,10 @@ class Dataset:
         _path = os.path.join(os.environ['HINTEVAL_CACHE_DIR'], 'datasets', f'{name}.pickle')
         if not os.path.exists(_path) or force_download:
             DatasetDownloader.download(name, force_download)
-        return cls.load(_path)
+        if subsets is None and fields is None:
+            return cls.load(_path, columnar=columnar)
+        _arrow_path = os.path.join(os.environ['HINTEVAL_CACHE_DIR'], 'datasets', f'{name}.arrow')
+        if not os.path.exists(_arrow_path) or os.path.getmtime(_arrow_path) < os.path.getmtime(_path):
+            cls.load(_path, columnar=True).store_arrow(f'{_arrow_path}.tmp')
+            os.replace(f'{_arrow_path}.tmp', _arrow_path)
+        return cls.load(_arrow_path, columnar=columnar, subsets=subsets, fields=fields)
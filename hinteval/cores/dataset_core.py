@@ -1,6 +1,11 @@
+import gc
+import sys
 import json
+import bisect
+import hashlib
 import random as rnd
-from typing import List, Dict, Union, Any
+import numpy as np
+from typing import List, Dict, Union, Any, Tuple, Literal
 
 class NotComparableException(Exception):
     def __init__(self, operator, name_1, name_2):
@@ -20,7 +25,322 @@ class _CoreEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
-class Metric:
+def _owners(item):
+    owner = item._owner
+    if owner is None:
+        return ()
+    return owner if type(owner) is tuple else (owner,)
+
+
+def _adopt(item, owner):
+    # Records, metric dictionaries and metrics can be shared, so an item keeps every owner that adopted it.
+    owners = _owners(item)
+    if all(known is not owner for known in owners):
+        item._owner = owner if not owners else (*owners, owner)
+
+
+def _record_changed(record, aspect, name=None):
+    for instance in _owners(record):
+        instance._changed(aspect, name, record._level)
+
+
+def _record_exposed(record, aspect, container):
+    for instance in _owners(record):
+        instance._expose(aspect, container)
+
+
+def _snapshot(aspect, container):
+    return tuple(container.items()) if aspect == 'question_type' else tuple(container)
+
+
+def _same_snapshot(aspect, snapshot, items):
+    if aspect == 'question_type':
+        return snapshot == items
+    return len(snapshot) == len(items) and all(old is new for old, new in zip(snapshot, items))
+
+
+def _hint_indices(counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    instance_index = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+    hint_index = np.arange(offsets[-1], dtype=np.int64) - np.repeat(offsets[:-1], counts)
+    return instance_index, hint_index
+
+
+class _MetricIndex:
+    def __init__(self, pairs):
+        pairs.sort(key=lambda pair: pair[0])
+        self.values = [value for value, _ in pairs]
+        self.entries = [entry for _, entry in pairs]
+        # The pairs of every instance, so they can be replaced when it changes, and the ids of the changed instances.
+        self.by_id = dict()
+        for value, entry in pairs:
+            self.by_id.setdefault(entry[0] if type(entry) is tuple else entry, []).append((value, entry))
+        self.stale = set()
+
+    def add(self, value, entry):
+        pos = bisect.bisect_right(self.values, value)
+        self.values.insert(pos, value)
+        self.entries.insert(pos, entry)
+
+    def remove(self, value, entry):
+        pos = bisect.bisect_left(self.values, value)
+        while pos < len(self.values) and self.values[pos] == value:
+            if self.entries[pos] == entry:
+                del self.values[pos]
+                del self.entries[pos]
+                return
+            pos += 1
+
+    def update(self, q_id, pairs):
+        for value, entry in self.by_id.pop(q_id, ()):
+            self.remove(value, entry)
+        for value, entry in pairs:
+            self.add(value, entry)
+        if pairs:
+            self.by_id[q_id] = pairs
+
+    def range(self, lt=None, le=None, gt=None, ge=None):
+        low, high = 0, len(self.values)
+        if gt is not None:
+            low = max(low, bisect.bisect_right(self.values, gt))
+        if ge is not None:
+            low = max(low, bisect.bisect_left(self.values, ge))
+        if lt is not None:
+            high = min(high, bisect.bisect_left(self.values, lt))
+        if le is not None:
+            high = min(high, bisect.bisect_right(self.values, le))
+        return self.entries[low:high]
+
+
+class _TypeIndex:
+    # Maps every question or entity type to the ids of the instances that have it, with a value per instance.
+    def __init__(self, items):
+        self.postings = dict()
+        self.by_id = dict()
+        self.stale = set()
+        for q_id, pairs in items:
+            self.update(q_id, pairs)
+
+    def update(self, q_id, pairs):
+        for key, _ in self.by_id.pop(q_id, ()):
+            postings = self.postings[key]
+            postings.pop(q_id, None)
+            if not postings:
+                del self.postings[key]
+        for key, value in pairs:
+            self.postings.setdefault(key, dict())[q_id] = value
+        if pairs:
+            self.by_id[q_id] = pairs
+
+    def get(self, key):
+        return self.postings.get(key, dict())
+
+
+def _affects_index(key, aspect, name, level):
+    if aspect == 'instance':
+        return True
+    if key[0] == 'metric':
+        return aspect == key[1] or (aspect == 'metrics' and level in (None, key[1]) and name in (None, key[2]))
+    if key[0] == 'question_type':
+        return aspect in ('question', 'question_type')
+    if aspect == 'entities':
+        return key[1] is None or level in (None, key[1])
+    return aspect in ('question', 'answers', 'hints') and key[1] in (None, aspect)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value == value
+
+
+def _question_type_code(label):
+    return label.split(':')[0] if isinstance(label, str) else label
+
+
+def _question_type_pairs(question_type):
+    if 'major' not in question_type:
+        return []
+    return [(_question_type_code(question_type['major']), _question_type_code(question_type.get('minor')))]
+
+
+def _instance_metric_pairs(q_id, instance, metric_name, level):
+    if level == 'question':
+        metric = instance._question._metrics.get(metric_name) if instance._question._metrics else None
+        return [(metric.value, q_id)] if metric is not None and _is_number(metric.value) else []
+    pairs = []
+    for idx, item in enumerate(instance._answers if level == 'answers' else instance._hints):
+        metric = item._metrics.get(metric_name) if item._metrics else None
+        if metric is not None and _is_number(metric.value):
+            pairs.append((metric.value, (q_id, idx)))
+    return pairs
+
+
+def _instance_entity_types(instance, level):
+    if level == 'question':
+        items = [instance._question]
+    elif level == 'answers':
+        items = instance._answers
+    elif level == 'hints':
+        items = instance._hints
+    else:
+        items = [instance._question, *instance._answers, *instance._hints]
+    return {entity.ent_type for item in items for entity in item._entities_list()}
+
+
+def _content_hash(*texts) -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    for text in texts:
+        digest.update(str(text).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def _intern(key):
+    return sys.intern(key) if type(key) is str else key
+
+
+class _MetricDict(dict):
+    __slots__ = ('_owner',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._owner = None
+        self.update(*args, **kwargs)
+
+    def __reduce__(self):
+        # The owner is not pickled; the record that unpickles the metrics adopts them again.
+        return _MetricDict._from_items, (list(self.items()),)
+
+    def _changed(self, name=None):
+        for record in _owners(self):
+            _record_changed(record, 'metrics', name)
+
+    def __setitem__(self, key, value):
+        key = _intern(key)
+        super().__setitem__(key, value)
+        if isinstance(value, Metric):
+            for record in _owners(self):
+                _adopt(value, record)
+        self._changed(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._changed(args[0])
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed(item[0])
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def copy(self):
+        return _MetricDict(self)
+
+    @classmethod
+    def _from_items(cls, items):
+        metrics = cls()
+        dict.update(metrics, ((_intern(key), value) for key, value in items))
+        return metrics
+
+
+class _Record:
+    __slots__ = ('_metadata',)
+
+    @property
+    def metadata(self) -> Dict[str, Union[str, int, float]]:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, metadata: Dict[str, Union[str, int, float]]):
+        self._metadata = metadata
+
+    def _metadata_dict(self):
+        return self._metadata if self._metadata is not None else {}
+
+    def __getstate__(self):
+        # The owners are not pickled, so pickling a record does not pickle the whole instance it belongs to.
+        return {name: getattr(self, name) for cls in type(self).__mro__ for name in getattr(cls, '__slots__', ())
+                if name != '_owner'}
+
+    def __setstate__(self, state):
+        if hasattr(type(self), '_owner'):
+            self._owner = None
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+class _TextRecord(_Record):
+    __slots__ = ('_entities', '_metrics', '_owner')
+
+    @property
+    def entities(self) -> List['Entity']:
+        if self._entities is None:
+            self._entities = []
+        if self._owner is not None:
+            _record_exposed(self, 'entities', self._entities)
+        return self._entities
+
+    @entities.setter
+    def entities(self, entities: List['Entity']):
+        self._entities = entities
+        _record_changed(self, 'entities')
+
+    @property
+    def metrics(self) -> Dict[str, 'Metric']:
+        if self._metrics is None:
+            self._set_metrics(_MetricDict())
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics: Dict[str, 'Metric']):
+        self._set_metrics(metrics)
+        _record_changed(self, 'metrics')
+
+    def _init_record(self, entities, metrics, metadata):
+        self._entities = entities
+        self._owner = None
+        self._set_metrics(metrics)
+        self._metadata = metadata
+
+    def _set_metrics(self, metrics):
+        # The metrics point back to the record, so writing them, or their values, marks its instances as changed.
+        self._metrics = metrics if metrics is None or isinstance(metrics, _MetricDict) else _MetricDict(metrics)
+        if self._metrics is not None:
+            _adopt(self._metrics, self)
+            for metric in self._metrics.values():
+                if isinstance(metric, Metric):
+                    _adopt(metric, self)
+
+    def _entities_list(self):
+        return self._entities if self._entities is not None else []
+
+    def _metric_items(self):
+        return self._metrics.items() if self._metrics is not None else ()
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._set_metrics(self._metrics)
+
+
+class Metric(_Record):
     """
     A class used to represent a Metric, which includes a name, a value, and optional metadata.
 
@@ -34,6 +354,8 @@ class Metric:
         The metadata associated with the metric.
     """
 
+    __slots__ = ('name', '_value', '_owner')
+
     def __init__(self, name: str, value: Union[str,int, float], metadata: Dict[str, Union[str,int, float]] = None):
         """
         Initializes a new instance of the Metric class.
@@ -62,9 +384,21 @@ class Metric:
 
         """
 
-        self.name = name
-        self.value = value
-        self.metadata: Dict[str, Union[str,int, float]] = metadata if metadata is not None else {}
+        self.name = _intern(name)
+        self._value = value
+        self._metadata = metadata
+        self._owner = None
+
+    @property
+    def value(self) -> Union[str, int, float]:
+        return self._value
+
+    @value.setter
+    def value(self, value: Union[str, int, float]):
+        self._value = value
+        # The metric may be kept under another key than its name, so all metrics of its records count as changed.
+        for record in _owners(self):
+            _record_changed(record, 'metrics')
 
     def to_dict(self):
         """
@@ -92,7 +426,7 @@ class Metric:
         return {
             "name": self.name,
             "value": self.value,
-            "metadata": self.metadata
+            "metadata": self._metadata_dict()
         }
 
     @classmethod
@@ -130,7 +464,7 @@ class Metric:
            If the 'name', 'value', or 'metadata' keys are missing in the dictionary.
         """
 
-        return cls(name=data["name"], value=data["value"], metadata=data["metadata"] if 'metadata' in data else None)
+        return cls(name=data["name"], value=data["value"], metadata=data["metadata"] if data.get('metadata') else None)
 
     def __eq__(self, other):
         if isinstance(other, Metric) and self.name == other.name:
@@ -144,7 +478,7 @@ class Metric:
         return json.dumps(self.to_dict(), cls=_CoreEncoder, indent=4)
 
 
-class Entity:
+class Entity(_Record):
     """
     A class to represent an entity with its type and position in the text, along with optional metadata.
 
@@ -161,6 +495,8 @@ class Entity:
     metadata : dict[str, Union[str,int, float]]
         Optional additional metadata about the entity.
     """
+    __slots__ = ('entity', 'ent_type', 'start_index', 'end_index')
+
     def __init__(self, entity: str, ent_type: str, start_index: int, end_index: int, metadata: Dict[str, Union[str,int, float]] = None):
         """
         Initializes an Entity instance.
@@ -197,7 +533,7 @@ class Entity:
         self.ent_type = ent_type
         self.start_index = start_index
         self.end_index = end_index
-        self.metadata: Dict[str, Union[str,int, float]] = metadata if metadata is not None else {}
+        self._metadata = metadata
 
     def to_dict(self):
         """
@@ -228,7 +564,7 @@ class Entity:
             "ent_type": self.ent_type,
             "start_index": self.start_index,
             "end_index": self.end_index,
-            "metadata": self.metadata
+            "metadata": self._metadata_dict()
         }
 
     @classmethod
@@ -268,7 +604,7 @@ class Entity:
         """
 
         return cls(entity=data["entity"], ent_type=data["ent_type"], start_index=data["start_index"],
-                   end_index=data["end_index"], metadata=data["metadata"] if 'metadata' in data else None)
+                   end_index=data["end_index"], metadata=data["metadata"] if data.get('metadata') else None)
 
     def __eq__(self, other):
         if isinstance(other, Entity):
@@ -282,7 +618,7 @@ class Entity:
         return json.dumps(self.to_dict(), cls=_CoreEncoder, indent=4)
 
 
-class Question:
+class Question(_TextRecord):
     """
     A class to represent a structured question with associated types, entities, metrics, and optional metadata.
 
@@ -300,6 +636,9 @@ class Question:
         Optional additional metadata about the question.
     """
 
+    __slots__ = ('question', '_question_type')
+    _level = 'question'
+
     def __init__(self, question: str, question_type: Dict[str, str] = None, entities: List[Entity] = None,
                  metrics: Dict[str, Metric] = None, metadata: Dict[str, Union[str,int, float]] = None):
         """
@@ -339,10 +678,19 @@ class Question:
         """
 
         self.question = question
-        self.question_type: Dict[str, str] = question_type if question_type is not None else {}
-        self.entities: List[Entity] = entities if entities is not None else []
-        self.metrics: Dict[str, Metric] = metrics if metrics is not None else {}
-        self.metadata: Dict[str, Union[str,int, float]] = metadata if metadata is not None else {}
+        self._question_type: Dict[str, str] = question_type if question_type is not None else {}
+        self._init_record(entities, metrics, metadata)
+
+    @property
+    def question_type(self) -> Dict[str, str]:
+        if self._owner is not None:
+            _record_exposed(self, 'question_type', self._question_type)
+        return self._question_type
+
+    @question_type.setter
+    def question_type(self, question_type: Dict[str, str]):
+        self._question_type = question_type
+        _record_changed(self, 'question_type')
 
     def to_dict(self):
         """
@@ -383,10 +731,10 @@ class Question:
         """
 
         ret_dict = {'question': self.question}
-        ret_dict.update({'question_type': self.question_type})
-        ret_dict.update({'entities': [entity.to_dict() for entity in self.entities]})
-        ret_dict.update({'metrics': {key: val.to_dict() for key, val in self.metrics.items()}})
-        ret_dict.update({'metadata': self.metadata})
+        ret_dict.update({'question_type': self._question_type})
+        ret_dict.update({'entities': [entity.to_dict() for entity in self._entities_list()]})
+        ret_dict.update({'metrics': {key: val.to_dict() for key, val in self._metric_items()}})
+        ret_dict.update({'metadata': self._metadata_dict()})
         return ret_dict
 
     @classmethod
@@ -433,20 +781,20 @@ class Question:
 
         question = data['question']
         question_type = data['question_type'] if 'question_type' in data else None
-        metadata = data['metadata'] if 'metadata' in data else None
-        entities = []
-        if 'entities' in data:
+        metadata = data['metadata'] if data.get('metadata') else None
+        entities = None
+        if data.get('entities'):
+            entities = []
             for entity in data['entities']:
                 entities.append(Entity.from_dict(entity))
-        metrics = dict()
-        if 'metrics' in data:
-            for key, value in data['metrics'].items():
-                metrics[key] = Metric.from_dict(value)
+        metrics = None
+        if data.get('metrics'):
+            metrics = _MetricDict._from_items((key, Metric.from_dict(value)) for key, value in data['metrics'].items())
         return cls(question=question, question_type=question_type, entities=entities, metrics=metrics,
                    metadata=metadata)
 
     def __eq__(self, other):
-        return self.question == other.question and self.question_type == other.question_type and self.entities == other.entities and self.metadata == other.metadata
+        return self.question == other.question and self._question_type == other._question_type and self._entities_list() == other._entities_list() and self._metadata_dict() == other._metadata_dict()
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -455,7 +803,7 @@ class Question:
         return json.dumps(self.to_dict(), cls=_CoreEncoder, indent=4)
 
 
-class Answer:
+class Answer(_TextRecord):
     """
     A class to represent an answer with associated entities, metrics, and optional metadata.
 
@@ -471,6 +819,9 @@ class Answer:
         Optional additional metadata about the answer.
     """
 
+    __slots__ = ('answer',)
+    _level = 'answers'
+
     def __init__(self, answer: str, entities: List[Entity] = None, metrics: Dict[str, Metric] = None,
                  metadata: Dict[str, Union[str,int, float]] = None):
         """
@@ -507,9 +858,7 @@ class Answer:
         """
 
         self.answer = answer
-        self.entities: List[Entity] = entities if entities is not None else []
-        self.metrics: Dict[str, Metric] = metrics if metrics is not None else {}
-        self.metadata: Dict[str, Union[str,int, float]] = metadata if metadata is not None else {}
+        self._init_record(entities, metrics, metadata)
 
     def to_dict(self):
         """
@@ -548,9 +897,9 @@ class Answer:
         """
 
         ret_dict = {'answer': self.answer}
-        ret_dict.update({'entities': [entity.to_dict() for entity in self.entities]})
-        ret_dict.update({'metrics': {key: val.to_dict() for key, val in self.metrics.items()}})
-        ret_dict.update({'metadata': self.metadata})
+        ret_dict.update({'entities': [entity.to_dict() for entity in self._entities_list()]})
+        ret_dict.update({'metrics': {key: val.to_dict() for key, val in self._metric_items()}})
+        ret_dict.update({'metadata': self._metadata_dict()})
         return ret_dict
 
     @classmethod
@@ -595,19 +944,19 @@ class Answer:
         """
 
         answer = data['answer']
-        metadata = data['metadata'] if 'metadata' in data else None
-        entities = []
-        if 'entities' in data:
+        metadata = data['metadata'] if data.get('metadata') else None
+        entities = None
+        if data.get('entities'):
+            entities = []
             for entity in data['entities']:
                 entities.append(Entity.from_dict(entity))
-        metrics = dict()
-        if 'metrics' in data:
-            for key, value in data['metrics'].items():
-                metrics[key] = Metric.from_dict(value)
+        metrics = None
+        if data.get('metrics'):
+            metrics = _MetricDict._from_items((key, Metric.from_dict(value)) for key, value in data['metrics'].items())
         return cls(answer=answer, entities=entities, metrics=metrics, metadata=metadata)
 
     def __eq__(self, other):
-        return self.answer == other.answer and self.entities == other.entities and self.metadata == other.metadata
+        return self.answer == other.answer and self._entities_list() == other._entities_list() and self._metadata_dict() == other._metadata_dict()
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -616,7 +965,7 @@ class Answer:
         return json.dumps(self.to_dict(), cls=_CoreEncoder, indent=4)
 
 
-class Hint:
+class Hint(_TextRecord):
     """
     A class to represent a hint associated with questions and answers, including sources, entities, metrics, and optional metadata.
 
@@ -634,6 +983,9 @@ class Hint:
         Optional additional metadata about the hint.
     """
 
+    __slots__ = ('hint', 'source')
+    _level = 'hints'
+
     def __init__(self, hint, source: str = None, entities: List[Entity] = None, metrics: Dict[str, Metric] = None,
                  metadata: Dict[str, Union[str,int, float]] = None):
         """
@@ -676,9 +1028,7 @@ class Hint:
 
         self.hint = hint
         self.source: str = source
-        self.entities: List[Entity] = entities if entities is not None else []
-        self.metrics: Dict[str, Metric] = metrics if metrics is not None else {}
-        self.metadata: Dict[str, Union[str,int, float]] = metadata if metadata is not None else {}
+        self._init_record(entities, metrics, metadata)
 
     def to_dict(self):
         """
@@ -721,9 +1071,9 @@ class Hint:
 
         ret_dict = {'hint': self.hint}
         ret_dict.update({'source': self.source})
-        ret_dict.update({'entities': [entity.to_dict() for entity in self.entities]})
-        ret_dict.update({'metrics': {key: val.to_dict() for key, val in self.metrics.items()}})
-        ret_dict.update({'metadata': self.metadata})
+        ret_dict.update({'entities': [entity.to_dict() for entity in self._entities_list()]})
+        ret_dict.update({'metrics': {key: val.to_dict() for key, val in self._metric_items()}})
+        ret_dict.update({'metadata': self._metadata_dict()})
         return ret_dict
 
     @classmethod
@@ -772,19 +1122,19 @@ class Hint:
 
         hint = data['hint']
         source = data['source'] if 'source' in data else None
-        metadata = data['metadata'] if 'metadata' in data else None
-        entities = []
-        if 'entities' in data:
+        metadata = data['metadata'] if data.get('metadata') else None
+        entities = None
+        if data.get('entities'):
+            entities = []
             for entity in data['entities']:
                 entities.append(Entity.from_dict(entity))
-        metrics = dict()
-        if 'metrics' in data:
-            for key, value in data['metrics'].items():
-                metrics[key] = Metric.from_dict(value)
+        metrics = None
+        if data.get('metrics'):
+            metrics = _MetricDict._from_items((key, Metric.from_dict(value)) for key, value in data['metrics'].items())
         return cls(hint=hint, source=source, entities=entities, metrics=metrics, metadata=metadata)
 
     def __eq__(self, other):
-        return self.hint == other.hint and self.entities == other.entities and self.source == other.source and self.metrics == other.metrics and self.metadata == other.metadata
+        return self.hint == other.hint and self._entities_list() == other._entities_list() and self.source == other.source and dict(self._metric_items()) == dict(other._metric_items()) and self._metadata_dict() == other._metadata_dict()
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -845,10 +1195,80 @@ class Instance:
 
         """
 
-        self.question: Question = question
-        self.answers: List[Answer] = answers
-        self.hints: List[Hint] = hints
+        self._trackers = ()
+        self._question: Question = question
+        self._answers: List[Answer] = answers
+        self._hints: List[Hint] = hints
         self.metadata: Dict[str, Union[str,int, float]] = metadata if metadata is not None else {}
+        self._adopt_records()
+
+    @property
+    def question(self) -> Question:
+        return self._question
+
+    @question.setter
+    def question(self, question: Question):
+        self._question = question
+        self._adopt_records()
+        self._changed('question')
+
+    @property
+    def answers(self) -> List[Answer]:
+        if self._trackers:
+            self._expose('answers', self._answers)
+        return self._answers
+
+    @answers.setter
+    def answers(self, answers: List[Answer]):
+        self._answers = answers
+        self._adopt_records()
+        self._changed('answers')
+
+    @property
+    def hints(self) -> List[Hint]:
+        if self._trackers:
+            self._expose('hints', self._hints)
+        return self._hints
+
+    @hints.setter
+    def hints(self, hints: List[Hint]):
+        self._hints = hints
+        self._adopt_records()
+        self._changed('hints')
+
+    def _adopt_records(self):
+        # The records point back to the instance, so changes to their metrics, entities or question type reach the
+        # subsets that track it.
+        _adopt(self._question, self)
+        for record in self._answers:
+            _adopt(record, self)
+        for record in self._hints:
+            _adopt(record, self)
+
+    def _track(self, subset, q_id):
+        self._trackers = (*self._trackers, (subset, q_id))
+
+    def _untrack(self, subset, q_id):
+        self._trackers = tuple(tracker for tracker in self._trackers if tracker[0] is not subset or tracker[1] != q_id)
+
+    def _changed(self, aspect, name=None, level=None):
+        for subset, q_id in self._trackers:
+            subset._instance_changed(q_id, aspect, name, level)
+
+    def _expose(self, aspect, container):
+        for subset, q_id in self._trackers:
+            subset._expose(q_id, aspect, container)
+
+    def __getstate__(self):
+        # The subsets tracking the instance are not pickled with it.
+        state = dict(self.__dict__)
+        state.pop('_trackers', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._trackers = ()
+        self._adopt_records()
 
     @classmethod
     def from_strings(cls, question: str, answers: List[str], hints: List[str]):
@@ -1033,9 +1453,9 @@ class Instance:
 
         """
 
-        ret_dict = {'question': self.question.to_dict()}
-        ret_dict.update({'answers': [answer.to_dict() for answer in self.answers]})
-        ret_dict.update({'hints': [hint.to_dict() for hint in self.hints]})
+        ret_dict = {'question': self._question.to_dict()}
+        ret_dict.update({'answers': [answer.to_dict() for answer in self._answers]})
+        ret_dict.update({'hints': [hint.to_dict() for hint in self._hints]})
         ret_dict.update({'metadata': self.metadata})
         return ret_dict
 
@@ -1093,7 +1513,7 @@ class Instance:
         return cls(question=question, answers=answers, hints=hints, metadata=metadata)
 
     def __eq__(self, other):
-        return self.question == other.question and self.answers == other.answers and self.hints == other.hints and self.metadata == other.metadata
+        return self._question == other._question and self._answers == other._answers and self._hints == other._hints and self.metadata == other.metadata
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -1102,6 +1522,270 @@ class Instance:
         return json.dumps(self.to_dict(), cls=_CoreEncoder, indent=4)
 
 
+class TextPool:
+    """
+    A pool that keeps a single copy of every distinct question and answer text of a dataset.
+
+    Every :class:`Dataset` owns a pool, and the questions and answers of the instances added to its subsets are
+    replaced by the pooled copy, so a question shared by many subsets (e.g., the generator subsets of WikiHint) is
+    stored once. The pool also assigns every text a stable content key that does not depend on the subset or the run.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new, empty TextPool instance.
+
+        Examples
+        -------
+        >>> from hinteval.cores import TextPool
+        >>>
+        >>> pool = TextPool()
+        >>> text = pool.intern('What is the capital of France?')
+        >>> print(len(pool))
+        # 1
+        """
+
+        self._texts: Dict[str, str] = dict()
+        self._keys: Dict[str, str] = dict()
+
+    def intern(self, text: str) -> str:
+        """
+        Returns the pooled copy of a text, adding it to the pool if it is not there yet.
+
+        Parameters
+        ----------
+        text : str
+            The text to look up.
+
+        Returns
+        -------
+        str
+            A string equal to `text` that is shared by all equal texts of the pool.
+        """
+
+        if not isinstance(text, str):
+            return text
+        return self._texts.setdefault(text, text)
+
+    def intern_instance(self, instance: Instance):
+        """
+        Replaces the question and answer texts of an instance with their pooled copies.
+
+        Parameters
+        ----------
+        instance : Instance
+            The instance whose texts are pooled.
+        """
+
+        instance._question.question = self.intern(instance._question.question)
+        for answer in instance._answers:
+            answer.answer = self.intern(answer.answer)
+
+    def key(self, text: str) -> str:
+        """
+        Retrieves the content key of a text, i.e., a hash of the text that is stable across subsets and runs.
+
+        The keys are computed once per distinct text, so they can be used cheaply to recognize inputs, such as
+        questions, that were already processed.
+
+        Parameters
+        ----------
+        text : str
+            The text to hash.
+
+        Returns
+        -------
+        str
+            The content key of the text.
+
+        Examples
+        -------
+        >>> from hinteval.cores import TextPool
+        >>>
+        >>> pool = TextPool()
+        >>> print(pool.key('What is the capital of France?') == pool.key('What is the capital of France?'))
+        # True
+        """
+
+        text = self.intern(text)
+        key = self._keys.get(text)
+        if key is None:
+            key = self._keys[text] = _content_hash(text)
+        return key
+
+    def __contains__(self, text):
+        return text in self._texts
+
+    def __len__(self):
+        return len(self._texts)
+
+
+class FlatHintView:
+    """
+    A flat view of the hints of a list of instances, laid out in compressed sparse row (CSR) form.
+
+    The hints of all instances are kept in one contiguous list, instance by instance, and `offsets` marks where the
+    hints of every instance start, so the hints of the i-th instance are ``hints[offsets[i]:offsets[i + 1]]``. Every
+    hint refers to its question and answer by an index into the lists of distinct questions and answers, so each of
+    them is stored, and can be processed, once. Instance-level evaluators build the view once, score the flat hints,
+    and split the scores back per instance with :meth:`scatter`; pass the same view to several evaluators to share it.
+
+    The view is a snapshot: it does not follow hints that are added to or removed from the instances afterwards.
+
+    Attributes
+    ----------
+    instances : List[Instance]
+        The instances of the view.
+    hints : List[Hint]
+        The hints of all instances, instance by instance.
+    offsets : np.ndarray
+        The position of the first hint of every instance, followed by the number of hints.
+    instance_index : np.ndarray
+        The index of the instance of every hint.
+    questions : List[Question]
+        The distinct questions of the instances, by text.
+    question_index : np.ndarray
+        The index in `questions` of the question of every hint.
+    answers : List[Answer]
+        The distinct first answers of the instances, by text.
+    answer_index : np.ndarray
+        The index in `answers` of the first answer of the instance of every hint, or -1 if it has no answer.
+    """
+
+    def __init__(self, instances: List[Instance]):
+        """
+        Builds the flat view of the hints of the given instances.
+
+        Parameters
+        ----------
+        instances : List[Instance]
+            The instances to flatten.
+
+        Examples
+        --------
+        >>> from hinteval.cores import Instance, Question, Hint, Answer, FlatHintView
+        >>>
+        >>> instance_1 = Instance(question=Question('What is the capital of Austria?'), answers=[Answer('Vienna')],
+        ...                       hints=[Hint('This city, once home to Mozart and Beethoven.'),
+        ...                              Hint('This city is the best city for life in 2024.')])
+        >>> instance_2 = Instance(question=Question('Who was the president of USA in 2009?'),
+        ...                       answers=[Answer('Barack Obama')],
+        ...                       hints=[Hint('He was the first African-American president in U.S. history.')])
+        >>> view = FlatHintView([instance_1, instance_2])
+        >>> print(view.offsets.tolist(), view.question_index.tolist())
+        # [0, 2, 3] [0, 0, 1]
+        """
+
+        self.instances = list(instances)
+        counts = np.fromiter((len(instance._hints) for instance in self.instances), dtype=np.int64,
+                             count=len(self.instances))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self.instance_index, _ = _hint_indices(counts)
+        self.hints = [hint for instance in self.instances for hint in instance._hints]
+
+        self.questions = []
+        question_positions = dict()
+        instance_questions = np.empty(len(self.instances), dtype=np.int64)
+        self.answers = []
+        answer_positions = dict()
+        instance_answers = np.full(len(self.instances), -1, dtype=np.int64)
+        for idx, instance in enumerate(self.instances):
+            question = instance.question
+            position = question_positions.get(question.question)
+            if position is None:
+                position = question_positions[question.question] = len(self.questions)
+                self.questions.append(question)
+            instance_questions[idx] = position
+            if len(instance._answers) > 0:
+                answer = instance._answers[0]
+                position = answer_positions.get(answer.answer)
+                if position is None:
+                    position = answer_positions[answer.answer] = len(self.answers)
+                    self.answers.append(answer)
+                instance_answers[idx] = position
+        self.question_index = instance_questions[self.instance_index]
+        self.answer_index = instance_answers[self.instance_index]
+        self._pairs = dict()
+
+    def question_hint_pairs(self) -> List[Tuple[str, str]]:
+        """
+        Retrieves the text of the question and the text of every hint.
+
+        Returns
+        -------
+        List[Tuple[str, str]]
+            The (question, hint) text pairs, in the order of `hints`. The list is built once and shared.
+        """
+
+        if 'question' not in self._pairs:
+            question_texts = [question.question for question in self.questions]
+            self._pairs['question'] = [(question_texts[q_idx], hint.hint) for q_idx, hint in
+                                       zip(self.question_index.tolist(), self.hints)]
+        return self._pairs['question']
+
+    def answer_hint_pairs(self) -> List[Tuple[str, str]]:
+        """
+        Retrieves the text of the first answer and the text of every hint.
+
+        Returns
+        -------
+        List[Tuple[str, str]]
+            The (answer, hint) text pairs, in the order of `hints`. The list is built once and shared.
+
+        Raises
+        ------
+        ValueError
+            If an instance with hints has no answer.
+        """
+
+        if 'answer' not in self._pairs:
+            if len(self.hints) > 0 and self.answer_index.min() < 0:
+                raise ValueError('All instances with hints must include an answer at least.')
+            answer_texts = [answer.answer for answer in self.answers]
+            self._pairs['answer'] = [(answer_texts[a_idx], hint.hint) for a_idx, hint in
+                                     zip(self.answer_index.tolist(), self.hints)]
+        return self._pairs['answer']
+
+    def scatter(self, results: list) -> List[list]:
+        """
+        Splits the results of the flat hints back into a list per instance.
+
+        Parameters
+        ----------
+        results : list
+            One result per hint, in the order of `hints`.
+
+        Returns
+        -------
+        List[list]
+            The results of the hints of every instance, in the order of `instances`.
+
+        Raises
+        ------
+        ValueError
+            If the number of results does not match the number of hints.
+
+        Examples
+        --------
+        >>> print(view.scatter([0.1, 0.2, 0.3]))
+        # [[0.1, 0.2], [0.3]]
+        """
+
+        if len(results) != len(self.hints):
+            raise ValueError(f'Invalid number of results: "{len(results)}". The view has {len(self.hints)} hints.')
+        offsets = self.offsets.tolist()
+        return [list(results[start:end]) for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def __iter__(self):
+        return iter(self.instances)
+
+    def __len__(self):
+        return len(self.instances)
+
+    def __getitem__(self, item):
+        return self.instances[item]
+
+
 class Subset:
     """
     A class to represent a subset of instances, typically used for managing and organizing a collection of instances with associated metadata.
@@ -1112,9 +1796,12 @@ class Subset:
         The name of the subset.
     metadata : dict[str, Union[str,int, float]]
         Optional additional metadata about the subset.
+    id_mode : str
+        How the ids of instances added without an id are generated, either 'random' or 'content'.
     """
 
-    def __init__(self, name: str = 'entire', metadata: Dict[str, Union[str,int, float]] = None):
+    def __init__(self, name: str = 'entire', metadata: Dict[str, Union[str,int, float]] = None,
+                 id_mode: Literal['random', 'content'] = 'random'):
         """
         Initializes a new Subset instance.
 
@@ -1124,6 +1811,15 @@ class Subset:
             The name of the subset (default is 'entire').
         metadata : dict[str, Union[str,int, float]], optional
             Additional metadata about the subset (default is an empty dictionary).
+        id_mode : {'random', 'content'}, default 'random'
+            How the ids of instances added without an id are generated. 'random' draws a random id prefixed by the
+            name of the subset. 'content' derives the id from a hash of the question and the answers, so the same
+            question gets the same id in every run and every subset, and adding it twice to a subset is rejected.
+
+        Raises
+        ------
+        ValueError
+            If the id mode is not valid.
 
         Examples
         -------
@@ -1140,13 +1836,132 @@ class Subset:
 
         """
 
+        if id_mode not in ['random', 'content']:
+            raise ValueError(f'Invalid id mode: "{id_mode}". Valid id modes are: random, content.')
         self.name = name
         self._instances: Dict[str, Instance] = dict()
         self.metadata: Dict[str, Union[str,int, float]] = metadata if metadata is not None else {}
+        self.id_mode = id_mode
+        self._init_tracking()
+
+    def _init_tracking(self):
+        # Every change to an instance of the subset bumps its version, and the instance id is moved to the end of
+        # `_changes` with that version, so the instances changed since any version are found from the end.
+        self._version = 0
+        self._changes = dict()
+        self._exposed = dict()
+        # Only changes to the hints or their metrics invalidate the cached metric matrices.
+        self._matrix_revision = 0
+        self._metric_matrices = (0, dict())
+        self._indexes = dict()
+
+    def _instance_changed(self, q_id, aspect, name=None, level=None):
+        # The aspect is the part of the instance that changed; the metrics and entities of a record also come with
+        # the name of the metric, when known, and the level of the record.
+        self._version += 1
+        self._changes.pop(q_id, None)
+        self._changes[q_id] = self._version
+        if aspect in ('hints', 'instance') or (aspect == 'metrics' and level == 'hints'):
+            self._matrix_revision += 1
+        for key, index in self._indexes.items():
+            if _affects_index(key, aspect, name, level):
+                index.stale.add(q_id)
+
+    def _untrack_instance(self, q_id, instance):
+        if instance is not None:
+            instance._untrack(self, q_id)
+        self._exposed.pop(q_id, None)
+        self._changes.pop(q_id, None)
+        self._version += 1
+        self._matrix_revision += 1
+        for index in self._indexes.values():
+            index.stale.add(q_id)
+
+    def _changed_since(self, version):
+        changed = set()
+        for q_id, q_version in reversed(self._changes.items()):
+            if q_version <= version:
+                break
+            changed.add(q_id)
+        return changed
+
+    def _expose(self, q_id, aspect, container):
+        # The answers, hints, entities and question types handed out by a tracked instance can be changed in place,
+        # so a snapshot of them is compared by `_sync` before the changes are needed.
+        containers = self._exposed.get(q_id)
+        if containers is None:
+            containers = self._exposed[q_id] = dict()
+        if id(container) not in containers:
+            containers[id(container)] = (aspect, container, _snapshot(aspect, container))
+
+    def _sync(self):
+        exposed, self._exposed = self._exposed, dict()
+        for q_id, containers in exposed.items():
+            kept = dict()
+            for key, (aspect, container, snapshot) in containers.items():
+                items = _snapshot(aspect, container)
+                if not _same_snapshot(aspect, snapshot, items):
+                    self._container_changed(q_id, aspect, container, snapshot)
+                # Besides its owner, the container is referenced here, by the entry and by getrefcount; one that is
+                # referenced elsewhere can still be changed without being handed out again, so it is kept.
+                if sys.getrefcount(container) > 4:
+                    kept[key] = (aspect, container, items)
+            if kept and q_id in self._instances:
+                self._exposed[q_id] = kept
+
+    def _container_changed(self, q_id, aspect, container, snapshot):
+        if aspect not in ('answers', 'hints'):
+            self._instance_changed(q_id, aspect)
+            return
+        # A list of answers or hints can be shared by several instances, which are all changed.
+        instances = {id(instance): instance for record in (*snapshot, *container) for instance in _owners(record)}
+        instance = self._instances.get(q_id)
+        if instance is not None:
+            instances[id(instance)] = instance
+        for instance in instances.values():
+            if getattr(instance, f'_{aspect}') is container:
+                instance._adopt_records()
+                instance._changed(aspect)
+
+    def __getstate__(self):
+        # The tracking state is rebuilt when the subset is unpickled.
+        state = dict(self.__dict__)
+        for name in ('_version', '_changes', '_exposed', '_matrix_revision', '_metric_matrices', '_indexes'):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_tracking()
+        for q_id, instance in self._instances.items():
+            instance._track(self, q_id)
 
     def _generate_id(self, name):
         return f'{name}_{rnd.randint(1000000, 9999999)}'
 
+    @staticmethod
+    def _content_id(instance: Instance):
+        return f'q_{_content_hash(instance.question.question, *sorted(answer.answer for answer in instance.answers))}'
+
+    def _new_id(self, instance: Instance, ids):
+        if self.id_mode == 'content':
+            q_id = self._content_id(instance)
+            if q_id in ids:
+                raise ValueError(f'The instance is already in the subset with the id "{q_id}".')
+            return q_id
+        q_id = self._generate_id(self.name)
+        while q_id in ids:
+            q_id = self._generate_id(self.name)
+        return q_id
+
+    def _intern_texts(self, instance: Instance):
+        dataset = getattr(self, '_dataset_object', None)
+        if dataset is not None:
+            dataset.text_pool.intern_instance(instance)
+
+    def _instance_dict(self, q_id):
+        return self._instances[q_id].to_dict()
+
     def add_instance(self, instance: Instance, q_id: str = None):
         """
         Adds an instance to the subset.
@@ -1156,12 +1971,14 @@ class Subset:
         instance : Instance
             The `instance` to be added to the subset.
         q_id : str, optional
-            The unique identifier for the `instance` (default is None, which generates a new random unique ID).
+            The unique identifier for the `instance` (default is None, which generates a new unique ID according to
+            the `id_mode` of the subset).
 
         Raises
         ------
         ValueError
-            If the provided `q_id` already exists in the subset.
+            If the provided `q_id` already exists in the subset, or if the subset uses content ids and already holds
+            an instance with the same question and answers.
 
         Examples
         -------
@@ -1184,13 +2001,14 @@ class Subset:
         """
 
         if q_id is None:
-            q_id = self._generate_id(self.name)
-            while q_id in self._instances.keys():
-                q_id = self._generate_id(self.name)
+            q_id = self._new_id(instance, self._instances)
         else:
             if q_id in self._instances.keys():
                 raise ValueError(f'The id "{q_id}" is already.')
+        self._intern_texts(instance)
         self._instances[q_id] = instance
+        instance._track(self, q_id)
+        self._instance_changed(q_id, 'instance')
 
     def remove_instance(self, q_id: str):
         """
@@ -1231,7 +2049,7 @@ class Subset:
 
         if q_id not in self._instances.keys():
             raise ValueError(f'The id "{q_id}" is not in the subset.')
-        del self._instances[q_id]
+        self._untrack_instance(q_id, self._instances.pop(q_id))
 
     def get_instance(self, q_id: str):
         """
@@ -1398,6 +2216,7 @@ class Subset:
 
         ret_dict = {'name': self.name}
         ret_dict.update({'metadata': self.metadata})
+        ret_dict.update({'id_mode': self.id_mode})
         ret_dict.update({'instances': {key: val.to_dict() for key, val in self._instances.items()}})
         return ret_dict
 
@@ -1459,12 +2278,302 @@ class Subset:
 
         name = data['name']
         metadata = data['metadata'] if 'metadata' in data else None
-        new_cls = cls(name=name, metadata=metadata)
+        new_cls = cls(name=name, metadata=metadata, id_mode=data.get('id_mode', 'random'))
         if 'instances' in data:
-            for q_id, instance in data['instances'].items():
-                new_cls.add_instance(Instance.from_dict(instance), q_id)
+            # Building millions of small objects triggers the cyclic garbage collector over and over,
+            # while none of them can be garbage yet.
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                for q_id, instance in data['instances'].items():
+                    new_cls.add_instance(Instance.from_dict(instance), q_id)
+            finally:
+                if gc_enabled:
+                    gc.enable()
         return new_cls
 
+    def _metric_pairs(self, metric_name: str, level: str):
+        pairs = []
+        for q_id, instance in self._instances.items():
+            pairs.extend(_instance_metric_pairs(q_id, instance, metric_name, level))
+        return pairs
+
+    def _question_type_pairs(self):
+        for q_id, instance in self._instances.items():
+            yield q_id, instance._question._question_type
+
+    def _entity_type_pairs(self, level):
+        for q_id, instance in self._instances.items():
+            yield q_id, _instance_entity_types(instance, level)
+
+    def _index_pairs(self, key, q_id):
+        instance = self._instances.get(q_id)
+        if instance is None:
+            return []
+        if key[0] == 'metric':
+            return _instance_metric_pairs(q_id, instance, key[2], key[1])
+        if key[0] == 'question_type':
+            return _question_type_pairs(instance._question._question_type)
+        return [(ent_type, None) for ent_type in _instance_entity_types(instance, key[1])]
+
+    def _build_index(self, key):
+        if key[0] == 'metric':
+            return _MetricIndex(self._metric_pairs(key[2], key[1]))
+        if key[0] == 'question_type':
+            return _TypeIndex((q_id, _question_type_pairs(question_type))
+                              for q_id, question_type in self._question_type_pairs())
+        return _TypeIndex((q_id, [(ent_type, None) for ent_type in ent_types])
+                          for q_id, ent_types in self._entity_type_pairs(key[1]))
+
+    def _refresh_index(self, key, index):
+        for q_id in index.stale:
+            index.update(q_id, self._index_pairs(key, q_id))
+        index.stale = set()
+
+    def _index(self, key):
+        # The instances that changed since the last query are updated in the index; it is built again if most of them
+        # changed.
+        self._sync()
+        index = self._indexes.get(key)
+        if index is None or len(index.stale) > len(self) // 4:
+            index = self._indexes[key] = self._build_index(key)
+        elif index.stale:
+            self._refresh_index(key, index)
+        return index
+
+    def reindex(self):
+        """
+        Drops the indexes used by :meth:`where`, :meth:`by_question_type` and :meth:`by_entity_type`.
+
+        The indexes are built lazily on the first query. Afterwards, the entries of the instances that were added,
+        removed or changed, including metrics, question types and entities set in place (e.g., by
+        :meth:`Dataset.prepare_dataset`), are updated on the next query, so calling this method only frees the memory
+        of the indexes.
+
+        Examples
+        -------
+        >>> from hinteval.cores import Subset
+        >>>
+        >>> subset = Subset(name='training_set')
+        >>> subset.reindex()
+        """
+
+        self._indexes = dict()
+
+    def where(self, metric: str, lt: float = None, le: float = None, gt: float = None, ge: float = None,
+              level: str = 'hints'):
+        """
+        Finds the hints (or answers or questions) whose value of a metric lies in the given range.
+
+        The query is answered from a sorted index of the metric values, which is built on first use and updated
+        with the values of the instances that changed since the previous query. Non-numeric values are ignored.
+
+        Parameters
+        ----------
+        metric : str
+            The name of the metric, i.e., its key in the `metrics` dictionaries, such as "convergence-llm-llama-3-70b".
+        lt : float, optional
+            Keeps values strictly less than `lt`.
+        le : float, optional
+            Keeps values less than or equal to `le`.
+        gt : float, optional
+            Keeps values strictly greater than `gt`.
+        ge : float, optional
+            Keeps values greater than or equal to `ge`.
+        level : {'question', 'answers', 'hints'}, default 'hints'
+            The level of the metric.
+
+        Returns
+        -------
+        list
+            For hints and answers, a list of (instance id, position of the hint or answer in the instance) tuples;
+            for questions, a list of instance ids. The results are sorted by the value of the metric.
+
+        Raises
+        ------
+        ValueError
+            If the level is not valid or no bound is given.
+
+        Examples
+        -------
+        >>> from hinteval.cores import Subset, Instance, Metric
+        >>>
+        >>> instance = Instance.from_strings("What is the capital of France?", ["Paris"], ["City of Lights.", "In Europe."])
+        >>> instance.hints[0].metrics['convergence-llm-llama-3-70b'] = Metric('convergence', 0.2)
+        >>> instance.hints[1].metrics['convergence-llm-llama-3-70b'] = Metric('convergence', 0.9)
+        >>> subset = Subset(name='training_set')
+        >>> subset.add_instance(instance, "q1")
+        >>> print(subset.where(metric='convergence-llm-llama-3-70b', lt=0.3))
+        # [('q1', 0)]
+
+        See Also
+        --------
+        by_question_type :
+            Finds the instances whose question has the given type.
+
+        by_entity_type :
+            Finds the instances that contain an entity of the given type.
+        """
+
+        if level not in ['question', 'answers', 'hints']:
+            raise ValueError(f'Invalid level: "{level}". Valid levels are: question, answers, hints.')
+        if lt is None and le is None and gt is None and ge is None:
+            raise ValueError('At least one of lt, le, gt, or ge must be specified.')
+        return self._index(('metric', level, metric)).range(lt=lt, le=le, gt=gt, ge=ge)
+
+    def by_question_type(self, major: str, minor: str = None) -> List[str]:
+        """
+        Finds the instances whose question has the given type.
+
+        Parameters
+        ----------
+        major : str
+            The major (coarse) type of the question, either its code (e.g., "HUM") or the full label
+            (e.g., "HUM:human").
+        minor : str, optional
+            The minor (fine) type of the question, either its code (e.g., "ind") or the full label
+            (e.g., "ind:Individual") (default is None, which matches all minor types).
+
+        Returns
+        -------
+        list[str]
+            The ids of the matching instances.
+
+        Examples
+        -------
+        >>> from hinteval.cores import Subset, Instance
+        >>>
+        >>> instance = Instance.from_strings("Who painted the Mona Lisa?", ["Leonardo da Vinci"], [])
+        >>> instance.question.question_type = {'major': 'HUM:human', 'minor': 'ind:Individual'}
+        >>> subset = Subset(name='training_set')
+        >>> subset.add_instance(instance, "q1")
+        >>> print(subset.by_question_type('HUM'))
+        # ['q1']
+
+        See Also
+        --------
+        reindex :
+            Drops the indexes to free their memory.
+        """
+
+        q_ids = self._index(('question_type',)).get(_question_type_code(major))
+        minor = _question_type_code(minor)
+        return [q_id for q_id, q_minor in q_ids.items() if minor is None or q_minor == minor]
+
+    def by_entity_type(self, ent_type: str, level: str = None) -> List[str]:
+        """
+        Finds the instances that contain an entity of the given type.
+
+        Parameters
+        ----------
+        ent_type : str
+            The type of the entity, such as "PERSON".
+        level : {'question', 'answers', 'hints'}, optional
+            Only looks for the entities of the question, the answers, or the hints (default is None, which looks
+            everywhere).
+
+        Returns
+        -------
+        list[str]
+            The ids of the matching instances.
+
+        Raises
+        ------
+        ValueError
+            If the level is not valid.
+
+        Examples
+        -------
+        >>> from hinteval.cores import Subset, Instance, Entity
+        >>>
+        >>> instance = Instance.from_strings("Who painted the Mona Lisa?", ["Leonardo da Vinci"], [])
+        >>> instance.answers[0].entities.append(Entity('Leonardo da Vinci', 'PERSON', 0, 17))
+        >>> subset = Subset(name='training_set')
+        >>> subset.add_instance(instance, "q1")
+        >>> print(subset.by_entity_type('PERSON'))
+        # ['q1']
+
+        See Also
+        --------
+        reindex :
+            Drops the indexes to free their memory.
+        """
+
+        if level not in [None, 'question', 'answers', 'hints']:
+            raise ValueError(f'Invalid level: "{level}". Valid levels are: question, answers, hints.')
+        return list(self._index(('entity_type', level)).get(ent_type).keys())
+
+    def _build_metric_matrix(self, metric_names: List[str]):
+        instances = self.get_instances()
+        counts = np.fromiter((len(instance._hints) for instance in instances), dtype=np.int64, count=len(instances))
+        matrix = np.full((int(counts.sum()), len(metric_names)), np.nan, dtype=np.float64)
+        row = 0
+        for instance in instances:
+            for hint in instance._hints:
+                metrics = hint._metrics
+                if metrics:
+                    for col, name in enumerate(metric_names):
+                        metric = metrics.get(name)
+                        if metric is not None:
+                            try:
+                                matrix[row, col] = metric.value
+                            except (TypeError, ValueError):
+                                raise ValueError(f'The metric "{name}" is not numeric.')
+                row += 1
+        instance_index, hint_index = _hint_indices(counts)
+        return matrix, instance_index, hint_index
+
+    def metric_matrix(self, metric_names: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Collects the values of the given metrics for all hints of the subset into a single matrix.
+
+        The matrix is built in one pass over the hints and cached; the cache is invalidated whenever a metric of the
+        subset is written, an instance is added to or removed from it, or the hints of one of its instances are
+        replaced or changed in place, e.g., with `instance.hints.append(hint)`.
+
+        Parameters
+        ----------
+        metric_names : list[str]
+            The names of the metrics, i.e., their keys in the `metrics` dictionaries of the hints.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+            A read-only float64 matrix of shape (n_hints, n_metrics) with NaN for missing values, the position of the
+            instance of every row in :meth:`get_instance_ids`, and the position of the hint of every row in its
+            instance.
+
+        Raises
+        ------
+        ValueError
+            If a metric has a non-numeric value.
+
+        Examples
+        -------
+        >>> from hinteval.cores import Subset, Instance, Metric
+        >>>
+        >>> instance = Instance.from_strings("What is the capital of France?", ["Paris"], ["City of Lights.", "In Europe."])
+        >>> instance.hints[0].metrics['relevance-rouge1'] = Metric('relevance', 0.25)
+        >>> subset = Subset(name='training_set')
+        >>> subset.add_instance(instance, "q1")
+        >>> matrix, instance_index, hint_index = subset.metric_matrix(['relevance-rouge1'])
+        >>> print(matrix[:, 0], instance_index, hint_index)
+        # [0.25  nan] [0 0] [0 1]
+        """
+
+        self._sync()
+        key = tuple(metric_names)
+        revision, matrices = self._metric_matrices
+        if revision != self._matrix_revision:
+            matrices = dict()
+            self._metric_matrices = (self._matrix_revision, matrices)
+        if key not in matrices:
+            result = self._build_metric_matrix(list(key))
+            for array in result:
+                array.flags.writeable = False
+            matrices[key] = result
+        return matrices[key]
+
     def __getitem__(self, q_id):
         return self.get_instance(q_id)
 
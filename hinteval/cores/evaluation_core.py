@@ -1,17 +1,108 @@
 import gc
 import os
+import asyncio
+import math
+import itertools
 import torch
-import pickle
+import threading
+import warnings
+import contextvars
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from abc import ABC, abstractmethod
-from typing import Union, List
-from hinteval.cores.dataset_core import Question, Answer, Hint, Instance
+from contextlib import nullcontext, contextmanager
+from tqdm import tqdm
+from typing import Union, List, Callable, Iterable, Iterator, Optional
+from hinteval.utils.functions.checkpoint_log import CheckpointLog
+from hinteval.utils.functions.model_registry import ModelRegistry, _release_on_failure
+from hinteval.utils.functions.score_cache import ScoreCache, _cache_size
+from hinteval.utils.functions.token_cache import TokenCache, _RunTokenCache
+from hinteval.cores.dataset_core import Question, Answer, Hint, Instance, FlatHintView, _content_hash
+
+_SCORE_CACHES = dict()
+_TOKEN_CACHES = dict()
+_RUN_TOKEN_CACHE = contextvars.ContextVar('hinteval_run_token_cache', default=None)
+
+
+def _get_score_cache():
+    max_size = _cache_size('HINTEVAL_SCORE_CACHE_SIZE')
+    if max_size == 0:
+        return None
+    path = os.path.join(os.environ['HINTEVAL_CACHE_DIR'], 'scores', 'scores.sqlite')
+    if path not in _SCORE_CACHES:
+        _SCORE_CACHES[path] = ScoreCache(path, max_size)
+    score_cache = _SCORE_CACHES[path]
+    score_cache.max_size = max_size
+    return score_cache
+
+
+def _get_token_cache():
+    max_size = _cache_size('HINTEVAL_TOKEN_CACHE_SIZE')
+    if max_size == 0:
+        return _RUN_TOKEN_CACHE.get()
+    path = os.path.join(os.environ['HINTEVAL_CACHE_DIR'], 'tokens', 'tokens.sqlite')
+    if path not in _TOKEN_CACHES:
+        _TOKEN_CACHES[path] = TokenCache(path, max_size)
+    token_cache = _TOKEN_CACHES[path]
+    token_cache.max_size = max_size
+    return token_cache
+
+
+@contextmanager
+def _run_token_cache():
+    # Evaluators that run within the scope share the inputs they tokenize, even without the on-disk cache.
+    if _RUN_TOKEN_CACHE.get() is not None:
+        yield
+        return
+    reset = _RUN_TOKEN_CACHE.set(_RunTokenCache())
+    try:
+        yield
+    finally:
+        _RUN_TOKEN_CACHE.reset(reset)
+
+
+_WORKER_RUN_BATCHES = None
+
+
+def _init_worker(run_batches):
+    global _WORKER_RUN_BATCHES
+    _WORKER_RUN_BATCHES = run_batches
+
+
+def _run_shard(shard):
+    return [output for batch_outputs in _WORKER_RUN_BATCHES(shard) for output in batch_outputs]
+
+
+class _ValidatedInputs(list):
+    # Inputs that :class:`EvaluationPipeline` has already validated for the evaluators it passes them to.
+    hint_view = None
 
 
 class _Evaluation(ABC):
-    def __init__(self, checkpoint, checkpoint_step, enable_tqdm):
+    # Evaluators that score on the CPU without a neural model set this, so their inputs can be scored in forked
+    # worker processes. It is checked by __init__, so a property may only read attributes set before it is called.
+    _process_safe = False
+    # The attributes that identify the configuration in the keys of the outputs, e.g., the model name or the method.
+    # Options that do not change the outputs, such as the batch size or the backend, are not among them.
+    _key_params = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if '__init__' in cls.__dict__:
+            cls.__init__ = _release_on_failure(cls.__init__)
+
+    def __init__(self, checkpoint, checkpoint_step, enable_tqdm, num_workers=1):
+        if num_workers < 1:
+            raise ValueError(f'Invalid number of workers: "{num_workers}". It must be a positive integer.')
+        if num_workers > 1 and not self._process_safe:
+            raise ValueError(f'Invalid number of workers: "{num_workers}". It must be 1 for evaluators that run a '
+                             f'neural model, such as {type(self).__name__} with this configuration.')
         self.enable_tqdm = enable_tqdm
         self.checkpoint_step = checkpoint_step
         self.checkpoint_path = None
+        self._checkpoint_log = None
+        self._registry_keys = []
+        self.num_workers = num_workers
         if checkpoint:
             if os.environ['HINTEVAL_CHECKPOINT_DIR'] == '':
                 raise ValueError(
@@ -23,6 +114,17 @@ class _Evaluation(ABC):
                 )
             self.checkpoint_path = os.path.abspath(os.environ['HINTEVAL_CHECKPOINT_DIR'])
 
+    def _acquire(self, key, loader):
+        # Models are shared through the registry and released by release_memory.
+        model = ModelRegistry.acquire(key, loader)
+        self._registry_keys.append(key)
+        return model
+
+    def _get_checkpoint_log(self, path):
+        if self._checkpoint_log is None or self._checkpoint_log.path != path:
+            self._checkpoint_log = CheckpointLog(path)
+        return self._checkpoint_log
+
     def _reload_checkpoint(self):
         _CHECKPOINT_DIR = os.environ['HINTEVAL_CHECKPOINT_DIR']
         if os.path.isfile(_CHECKPOINT_DIR):
@@ -35,21 +137,22 @@ class _Evaluation(ABC):
         if not os.path.exists(new_path):
             return dict()
         try:
-            with open(new_path, 'rb') as file:
-                data = pickle.load(file)
-                return data
+            return self._get_checkpoint_log(new_path).read()
         except Exception as e:
             metric_name = self.__class__.__bases__[0].__name__
             raise Exception(
                 f"An error occurred while loading the checkpoint file for {metric_name} metric: {e}")
 
-    def _store_checkpoint(self, output):
+    def _store_checkpoint(self, output, key=None):
+        # With a key, the output holds only the new items of that dictionary of the checkpoint content.
         _CHECKPOINT_DIR = os.environ['HINTEVAL_CHECKPOINT_DIR']
         os.makedirs(_CHECKPOINT_DIR, exist_ok=True)
         try:
             new_path = os.path.join(_CHECKPOINT_DIR, self._file_name)
-            with open(new_path, 'wb') as file:
-                pickle.dump(output, file)
+            if key is None:
+                self._get_checkpoint_log(new_path).append(output)
+            else:
+                self._get_checkpoint_log(new_path).update(key, output)
         except Exception as e:
             metric_name = self.__class__.__bases__[0].__name__
             raise Exception(
@@ -70,11 +173,218 @@ class _Evaluation(ABC):
                 return None
         return None
 
+    @staticmethod
+    def _sentence_text(sentence: Union[Question, Hint, Answer]) -> str:
+        if isinstance(sentence, Question):
+            return sentence.question
+        if isinstance(sentence, Hint):
+            return sentence.hint
+        return sentence.answer
+
+    @staticmethod
+    def _hint_view(instances) -> FlatHintView:
+        # A view passed by the caller, or built once by EvaluationPipeline, is shared by the evaluators that get it.
+        if isinstance(instances, FlatHintView):
+            return instances
+        view = getattr(instances, 'hint_view', None)
+        return FlatHintView(instances) if view is None else view
+
+    def _params_key(self):
+        # Unset options are left out, so an option added later keeps the keys of the outputs computed without it.
+        params = [f'{name}={getattr(self, name)!r}' for name in sorted(self._key_params) if
+                  getattr(self, name) is not None]
+        return _content_hash(type(self).__module__, type(self).__qualname__, *params)
+
+    def _can_fork(self):
+        # A forked worker inherits the locks held by the other threads of the process and any CUDA context, so the
+        # workers are only forked from the main thread, before CUDA is initialized.
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            reason = 'processes cannot be forked on this platform'
+        elif threading.current_thread() is not threading.main_thread():
+            reason = 'it is not called from the main thread'
+        elif torch.cuda.is_initialized():
+            reason = 'CUDA is initialized in this process'
+        else:
+            return True
+        warnings.warn(f'{type(self).__name__} scores its inputs in the calling thread instead of {self.num_workers} '
+                      f'workers, because {reason}.', RuntimeWarning, stacklevel=4)
+        return False
+
+    def _run_in_workers(self, run_batches, items, shard_size):
+        # Workers are forked, so they inherit the evaluator and the scoring function without pickling them; each
+        # worker scores whole shards and the shards are returned in order.
+        shards = [items[i:i + shard_size] for i in range(0, len(items), shard_size)]
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(self.num_workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(run_batches,)) as executor:
+            yield from executor.map(_run_shard, shards)
+
+    def _load_checkpoint_outputs(self):
+        checkpoint_content = self._load_content_checkpoint()
+        return dict() if checkpoint_content is None else checkpoint_content.get('outputs', dict())
+
+    def _collect_pending(self, inputs, resume=None):
+        params = self._params_key()
+        keys = [_content_hash(params, *item) for item in inputs]
+        if resume is not None:
+            # evaluate_iter loads the checkpoint once instead of reloading it for every chunk. The outputs of each
+            # chunk are taken out of it, so it only shrinks, and the new outputs are only kept for their chunk.
+            outputs = {key: resume.pop(key) for key in set(keys) if key in resume}
+        else:
+            outputs = self._load_checkpoint_outputs()
+        pending = dict()
+        for key, item in zip(keys, inputs):
+            if key not in outputs:
+                pending.setdefault(key, item)
+        score_cache = _get_score_cache()
+        if len(pending) > 0 and score_cache is not None:
+            cached_outputs = score_cache.get_many(pending.keys())
+            outputs.update(cached_outputs)
+            pending = {key: item for key, item in pending.items() if key not in cached_outputs}
+        return keys, outputs, pending, score_cache
+
+    def _run_pending(self, inputs: List[tuple], run_batches: Callable, batch_size: int, desc: str,
+                     resume: Optional[dict] = None) -> list:
+        keys, outputs, pending, score_cache = self._collect_pending(inputs, resume)
+        if len(pending) > 0:
+            pending_keys = list(pending.keys())
+            pending_items = list(pending.values())
+            if self.num_workers > 1 and len(pending_items) > 1 and self._can_fork():
+                # A few shards per worker balance the load while keeping a checkpoint step per shard.
+                shard_size = max(batch_size, math.ceil(len(pending_items) / (self.num_workers * 4)))
+                batches = self._run_in_workers(run_batches, pending_items, shard_size)
+                num_of_batches = math.ceil(len(pending_items) / shard_size)
+            else:
+                batches = run_batches(pending_items)
+                num_of_batches = math.ceil(len(pending_items) / batch_size)
+            if self.enable_tqdm:
+                batches = tqdm(batches, total=num_of_batches, desc=desc)
+            done, unsaved = 0, dict()
+            for step, batch_outputs in enumerate(batches, 1):
+                new_outputs = dict(zip(pending_keys[done:done + len(batch_outputs)], batch_outputs))
+                outputs.update(new_outputs)
+                unsaved.update(new_outputs)
+                if score_cache is not None:
+                    score_cache.put_many(new_outputs)
+                done += len(batch_outputs)
+                if (step % self.checkpoint_step == 0 or done == len(pending_keys)) and self.checkpoint_path is not None:
+                    # Only the outputs since the previous step are appended to the checkpoint.
+                    self._store_checkpoint(unsaved, key='outputs')
+                    unsaved = dict()
+        return [outputs[key] for key in keys]
+
+    @staticmethod
+    async def _run_blocking(limiter, function, *args):
+        # Local models block the event loop, so they run in a thread and hold the limiter for the whole batch.
+        async with nullcontext() if limiter is None else limiter:
+            return await asyncio.to_thread(function, *args)
+
+    async def _arun_pending(self, inputs: List[tuple], run_batch: Callable, batch_size: int, desc: str,
+                            limiter: Optional[asyncio.Semaphore] = None) -> list:
+        keys, outputs, pending, score_cache = self._collect_pending(inputs)
+        if len(pending) > 0:
+            pending_keys = list(pending.keys())
+            pending_items = list(pending.values())
+            starts = range(0, len(pending_items), batch_size)
+
+            async def run(start):
+                return start, await run_batch(pending_items[start:start + batch_size], limiter)
+
+            tasks = []
+            if limiter is None:
+                # Without a shared limiter, batches are evaluated one after another, as in evaluate.
+                async def completed():
+                    for start in starts:
+                        yield await run(start)
+            else:
+                # The limiter bounds the requests, so all batches are started at once and overlap.
+                tasks = [asyncio.ensure_future(run(start)) for start in starts]
+
+                async def completed():
+                    for task in asyncio.as_completed(tasks):
+                        yield await task
+            progress = tqdm(total=len(starts), desc=desc) if self.enable_tqdm else None
+            try:
+                step, done, unsaved = 0, 0, dict()
+                async for start, batch_outputs in completed():
+                    step += 1
+                    new_outputs = dict(zip(pending_keys[start:start + len(batch_outputs)], batch_outputs))
+                    outputs.update(new_outputs)
+                    unsaved.update(new_outputs)
+                    if score_cache is not None:
+                        score_cache.put_many(new_outputs)
+                    done += len(batch_outputs)
+                    if progress is not None:
+                        progress.update(1)
+                    if (step % self.checkpoint_step == 0 or done == len(pending_keys)) and self.checkpoint_path is not None:
+                        self._store_checkpoint(unsaved, key='outputs')
+                        unsaved = dict()
+            finally:
+                if progress is not None:
+                    progress.close()
+                # A failed batch stops the evaluation, so the batches still running are not left behind.
+                for task in tasks:
+                    task.cancel()
+        return [outputs[key] for key in keys]
+
+    def evaluate_iter(self, inputs: Iterable, batch_size: int = 256, **kwargs) -> Iterator[tuple]:
+        """
+        Evaluates the given inputs chunk by chunk and yields their scores as soon as each chunk is evaluated.
+
+        Inputs are read lazily, so any iterable works, including a generator that streams a dataset, and only one
+        chunk is kept in memory at a time. Every chunk is evaluated with :meth:`evaluate`, so its metrics are stored
+        within its inputs and its scores are checkpointed and cached before they are yielded. With checkpointing, only
+        the outputs of a previous run that are not resumed yet are kept in memory, and every chunk appends only its new
+        outputs to the checkpoint.
+
+        Parameters
+        ----------
+        inputs : Iterable
+            The inputs accepted by :meth:`evaluate`, i.e., instances, or questions, hints, and answers.
+        batch_size : int, default 256
+            The number of inputs evaluated at once.
+        **kwargs
+            Additional keyword arguments, passed to :meth:`evaluate`.
+
+        Yields
+        ------
+        tuple
+            Every input together with its scores, in the order of the inputs.
+
+        Raises
+        ------
+        ValueError
+            If the batch size is not positive, or the inputs of a chunk are not valid.
+
+        Examples
+        --------
+        >>> from hinteval import Dataset
+        >>> from hinteval.evaluation.relevance import Rouge
+        >>>
+        >>> rouge = Rouge(model='rouge1')
+        >>> instances = (instance for subset, q_id, instance in Dataset.iter_jsonl('./dataset.jsonl'))
+        >>> for instance, scores in rouge.evaluate_iter(instances, batch_size=100):
+        ...     print(instance.question.question, scores)
+        # What is the capital of France? [0.0, 0.25]
+        """
+
+        if batch_size < 1:
+            raise ValueError(f'Invalid batch size: "{batch_size}". It must be a positive integer.')
+        iterator = iter(inputs)
+        # The checkpointed outputs belong to this iteration only, so other calls of the evaluator do not take them.
+        resume = self._load_checkpoint_outputs() if self.checkpoint_path is not None else None
+        while True:
+            chunk = list(itertools.islice(iterator, batch_size))
+            if len(chunk) == 0:
+                break
+            yield from zip(chunk, self.evaluate(chunk, _resume=resume, **kwargs))
+
     def release_memory(self):
         """
         Releases the memory used by the class instance.
 
-        This method deletes the instance of the class and triggers garbage collection to free up memory.
+        This method deletes the instance of the class and triggers garbage collection to free up memory. Models that
+        are shared with other instances are only unloaded once the last of them releases its memory.
 
         Examples
         --------
@@ -83,6 +393,8 @@ class _Evaluation(ABC):
         >>> wikipedia = Wikipedia(spacy_pipeline='en_core_web_sm')
         >>> wikipedia.release_memory()
         """
+        for key in getattr(self, '_registry_keys', []):
+            ModelRegistry.release(key)
         for attr in list(self.__dict__.keys()):  # Use list() to avoid runtime changes
             delattr(self, attr)
         gc.collect()
@@ -96,6 +408,8 @@ class Relevance(_Evaluation):
         pass
 
     def _validate_input(self, inputs):
+        if isinstance(inputs, _ValidatedInputs):
+            return
         valid_class = Instance
         if not all(isinstance(text, valid_class) for text in inputs):
             raise ValueError(f"All items for evaluating relevance must be instances of the Instance class.")
@@ -115,6 +429,8 @@ class Readability(_Evaluation):
         pass
 
     def _validate_input(self, inputs):
+        if isinstance(inputs, _ValidatedInputs):
+            return
         valid_classes = (Question, Hint)
         if not all(isinstance(text, valid_classes) for text in inputs):
             raise ValueError(
@@ -127,6 +443,8 @@ class Convergence(_Evaluation):
         pass
 
     def _validate_input(self, inputs):
+        if isinstance(inputs, _ValidatedInputs):
+            return
         valid_class = Instance
         if not all(isinstance(text, valid_class) for text in inputs):
             raise ValueError("All items for evaluating convergence must be instances of the Instance class.")
@@ -153,6 +471,8 @@ class Familiarity(_Evaluation):
         pass
 
     def _validate_input(self, inputs):
+        if isinstance(inputs, _ValidatedInputs):
+            return
         valid_classes = (Question, Hint, Answer)
         if not all(isinstance(text, valid_classes) for text in inputs):
             raise ValueError(
@@ -165,6 +485,8 @@ class AnswerLeakage(_Evaluation):
         pass
 
     def _validate_input(self, inputs):
+        if isinstance(inputs, _ValidatedInputs):
+            return
         valid_class = Instance
         if not all(isinstance(text, valid_class) for text in inputs):
             raise ValueError("All items for evaluating answer leakage must be instances of the Instance class.")
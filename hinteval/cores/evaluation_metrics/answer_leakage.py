@@ -2,12 +2,11 @@ import spacy
 import re
 import torch
 import string
-import itertools
 from hinteval.utils.functions.download_manager import SpacyDownloader
+from hinteval.utils.functions.spacy_docs import SpacyDocCache
 from sentence_transformers import SentenceTransformer
 from tok import word_tokenize
 from typing import List, Literal
-from tqdm import tqdm
 from hinteval.cores.evaluation_core import AnswerLeakage
 from hinteval.cores.dataset_core import Metric, Instance
 from datasets.utils.logging import disable_progress_bar
@@ -32,6 +31,8 @@ class Lexical(AnswerLeakage):
         Step interval for checkpointing.
     enable_tqdm : bool
         Whether the tqdm progress bar is enabled.
+    num_workers : int
+        Number of worker processes that score the inputs.
 
     References
     ----------
@@ -43,10 +44,17 @@ class Lexical(AnswerLeakage):
 
     """
 
+    _key_params = ('_method', '_spacy_pipeline')
+
+    @property
+    def _process_safe(self):
+        # The transformer pipeline runs a neural model, so it is not forked into worker processes.
+        return self._spacy_pipeline != 'en_core_web_trf'
+
     def __init__(self, method: Literal['include_stop_words', 'exclude_stop_words'] = 'include_stop_words',
                  spacy_pipeline: Literal[
                      'en_core_web_sm', 'en_core_web_lg', 'en_core_web_md', 'en_core_web_trf'] = 'en_core_web_sm',
-                 batch_size: int = 256, checkpoint: bool = False, checkpoint_step: int = 1, enable_tqdm: bool = False):
+                 batch_size: int = 256, checkpoint: bool = False, checkpoint_step: int = 1, enable_tqdm: bool = False, num_workers: int = 1):
         """
         Initializes the Lexical class with the specified method and spaCy pipeline. `[37]`_.
 
@@ -66,11 +74,17 @@ class Lexical(AnswerLeakage):
             Step interval for checkpointing. Note that each step corresponds to one batch.
         enable_tqdm : bool, default False
             Whether to enable tqdm progress bar.
+        num_workers : int, default 1
+            Number of worker processes that score the inputs in parallel. The inputs are split into shards that are
+            checkpointed one by one. It must be 1 with the `en_core_web_trf` pipeline, which runs a neural model.
+            The workers are only forked from the main thread of a process without CUDA; otherwise, the inputs are
+            scored in the calling thread and a warning is issued.
 
         Raises
         ------
         ValueError
-            If the provided method name is not valid.
+            If the provided method name is not valid, the number of workers is not positive, or there are several
+            workers with the `en_core_web_trf` pipeline.
 
         Examples
         --------
@@ -95,13 +109,13 @@ class Lexical(AnswerLeakage):
                 '- include_stop_words: Includes common stop words (e.g., "the", "and", "in") in the analysis. This method is useful when you want to preserve these words for certain text processing tasks.\n'
                 '- exclude_stop_words: Removes common stop words from the analysis. This method is useful for focusing on the more meaningful content of the text by eliminating less significant words.'
             )
-        super().__init__(checkpoint, checkpoint_step, enable_tqdm)
+        self._spacy_pipeline = spacy_pipeline
+        super().__init__(checkpoint, checkpoint_step, enable_tqdm, num_workers)
         self._file_name = f'answer_leakage_lexical_{method}.pickle'
         self.batch_size = batch_size
         self._method = method
-        self._spacy_pipeline = spacy_pipeline
         SpacyDownloader.download(spacy_pipeline)
-        self._spacy_model = spacy.load(self._spacy_pipeline)
+        self._spacy_model = self._acquire(('spacy', spacy_pipeline), lambda: spacy.load(spacy_pipeline))
         self._stop_words = self._spacy_model.Defaults.stop_words
 
     def evaluate(self, instances: List[Instance], **kwargs) -> List[List[float]]:
@@ -167,63 +181,44 @@ class Lexical(AnswerLeakage):
         """
 
         self._validate_input(instances)
-
-        answers = []
-        hints = []
-        for instance in instances:
-            answers.extend([instance.answers[0]] * len(instance.hints))
-            hints.extend(instance.hints)
-        answer_hint = list(zip(answers, hints))
-        answer_hint_batches = [answer_hint[i:i + self.batch_size] for i in range(0, len(answer_hint), self.batch_size)]
-
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        answer_hint_stream = tqdm(answer_hint_batches, total=len(answer_hint_batches),
-                                  desc=f'Evaluating answer leakage metric based on the lexical comparison{" without " if self._method == "exclude_stop_words" else " "}considering stop words') if self.enable_tqdm else answer_hint_batches
-
-        for answers_hints in answer_hint_stream:
-            _answers, _hints = zip(*answers_hints)
-            _idx = next(item_counter)
-            final_step = len(results) // self.batch_size
-            if _idx <= final_step:
-                continue
-
-            hints_docs = self._spacy_model.pipe([hint.hint.lower() for hint in _hints], batch_size=self.batch_size)
-            answers_docs = self._spacy_model.pipe([answer.answer.lower() for answer in _answers],
-                                                  batch_size=self.batch_size)
-
-            for answer, hint in zip(answers_docs, hints_docs):
-                hint_lemma = [token.lemma_ for token in hint]
-                answer_lemma = [token.lemma_ for token in answer]
-                if self._method == 'exclude_stop_words':
-                    filtered_answer = [w for w in answer_lemma if
-                                       not w in self._stop_words and w not in string.punctuation and w != '\'s']
-                else:
-                    filtered_answer = [w for w in answer_lemma if w not in string.punctuation and w != '\'s']
-                is_answer_leakage = False
-                for a_lemma in filtered_answer:
-                    if a_lemma in hint_lemma and not is_answer_leakage:
-                        is_answer_leakage = True
-                results.append(int(is_answer_leakage))
-
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    answer_hint_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
+        view = self._hint_view(instances)
+
+        def score_batches(pending):
+            for i in range(0, len(pending), self.batch_size):
+                _answers, _hints = zip(*pending[i:i + self.batch_size])
+                hints_docs = SpacyDocCache.parse(self._spacy_pipeline, [hint.lower() for hint in _hints],
+                                                 batch_size=self.batch_size)
+                answers_docs = SpacyDocCache.parse(self._spacy_pipeline, [answer.lower() for answer in _answers],
+                                                   batch_size=self.batch_size)
+
+                batch_results = []
+                for answer, hint in zip(answers_docs, hints_docs):
+                    hint_lemma = [token.lemma_ for token in hint]
+                    answer_lemma = [token.lemma_ for token in answer]
+                    if self._method == 'exclude_stop_words':
+                        filtered_answer = [w for w in answer_lemma if
+                                           not w in self._stop_words and w not in string.punctuation and w != '\'s']
+                    else:
+                        filtered_answer = [w for w in answer_lemma if w not in string.punctuation and w != '\'s']
+                    is_answer_leakage = False
+                    for a_lemma in filtered_answer:
+                        if a_lemma in hint_lemma and not is_answer_leakage:
+                            is_answer_leakage = True
+                    batch_results.append(int(is_answer_leakage))
+                yield batch_results
+
+        results = self._run_pending(view.answer_hint_pairs(), score_batches, self.batch_size,
+                                    f'Evaluating answer leakage metric based on the lexical comparison{" without " if self._method == "exclude_stop_words" else " "}considering stop words',
+                                    resume=kwargs.get('_resume'))
 
         results = [round(res, 3) for res in results]
-        for idx, h in enumerate(hints):
+        for idx, h in enumerate(view.hints):
             spacy_pipeline = re.search(r'web_(\w+)$', self._spacy_pipeline).group(1)
             metadata = {'spacy_pipeline': self._spacy_pipeline}
             h.metrics[f'answer-leakage-lexical-{self._method}-{spacy_pipeline}'] = Metric('answer-leakage',
                                                                                           results[idx],
                                                                                           metadata=metadata)
-        final_results = []
-        for instance in instances:
-            num_of_hint = len(instance.hints)
-            final_results.append([results.pop(0) for _ in range(num_of_hint)])
-        return final_results
+        return view.scatter(results)
 
 
 class ContextualEmbeddings(AnswerLeakage):
@@ -245,6 +240,8 @@ class ContextualEmbeddings(AnswerLeakage):
 
     """
 
+    _key_params = ('_model_name', '_method', '_spacy_pipeline')
+
     def __init__(self, sbert_model: str = 'all-mpnet-base-v2',
                  method: Literal['include_stop_words', 'exclude_stop_words'] = 'include_stop_words',
                  spacy_pipeline: Literal[
@@ -303,9 +300,9 @@ class ContextualEmbeddings(AnswerLeakage):
         self._method = method
         self._spacy_pipeline = spacy_pipeline
         SpacyDownloader.download(spacy_pipeline)
-        self._spacy_model = spacy.load(self._spacy_pipeline)
+        self._spacy_model = self._acquire(('spacy', spacy_pipeline), lambda: spacy.load(spacy_pipeline))
         self._stop_words = self._spacy_model.Defaults.stop_words
-        self._model = SentenceTransformer(self._model_name)
+        self._model = self._acquire(('sentence-transformer', sbert_model), lambda: SentenceTransformer(sbert_model))
 
     def _similarity(self, hint_words, answer):
         hints_embeddings = self._model.encode(hint_words)
@@ -373,49 +370,29 @@ class ContextualEmbeddings(AnswerLeakage):
         """
 
         self._validate_input(instances)
-        answers = []
-        hints = []
-        for instance in instances:
-            answers.extend([instance.answers[0]] * len(instance.hints))
-            hints.extend(instance.hints)
-        answer_hint = list(zip(answers, hints))
-
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        answer_hint_stream = tqdm(answer_hint, total=len(answer_hint),
-                                  desc=f'Evaluating answer leakage metric using {self._model_name}{" without " if self._method == "exclude_stop_words" else " "}considering stop words') if self.enable_tqdm else answer_hint
-
-        for answer, hint in answer_hint_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self._batch_size
-            if _idx <= final_step:
-                continue
-            hint_lemma = word_tokenize(hint.hint)
-            answer_lemma = word_tokenize(answer.answer)
-            if self._method == 'exclude_stop_words':
-                filtered_answer = [w for w in answer_lemma if
-                                   not w in self._stop_words and w not in string.punctuation and w != '\'s']
-            else:
-                filtered_answer = [w for w in answer_lemma if w not in string.punctuation and w != '\'s']
-            answer = " ".join(filtered_answer)
-            answer_leakage = self._similarity(hint_lemma, answer)
-            results.append(answer_leakage)
-
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    answer_hint_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
+        view = self._hint_view(instances)
+
+        def score_batches(pending):
+            for answer, hint in pending:
+                hint_lemma = word_tokenize(hint)
+                answer_lemma = word_tokenize(answer)
+                if self._method == 'exclude_stop_words':
+                    filtered_answer = [w for w in answer_lemma if
+                                       not w in self._stop_words and w not in string.punctuation and w != '\'s']
+                else:
+                    filtered_answer = [w for w in answer_lemma if w not in string.punctuation and w != '\'s']
+                answer = " ".join(filtered_answer)
+                yield [self._similarity(hint_lemma, answer)]
+
+        results = self._run_pending(view.answer_hint_pairs(), score_batches, self._batch_size,
+                                    f'Evaluating answer leakage metric using {self._model_name}{" without " if self._method == "exclude_stop_words" else " "}considering stop words',
+                                    resume=kwargs.get('_resume'))
 
         results = [round(res, 3) for res in results]
-        for idx, h in enumerate(hints):
+        for idx, h in enumerate(view.hints):
             spacy_pipeline = re.search(r'web_(\w+)$', self._spacy_pipeline).group(1)
             metadata = {'spacy_pipeline': self._spacy_pipeline, 'model': self._model_name}
             h.metrics[f'answer-leakage-contextual-{self._method}-{spacy_pipeline}'] = Metric('answer-leakage',
                                                                                              results[idx],
                                                                                              metadata=metadata)
-        final_results = []
-        for instance in instances:
-            num_of_hint = len(instance.hints)
-            final_results.append([results.pop(0) for _ in range(num_of_hint)])
-        return final_results
+        return view.scatter(results)
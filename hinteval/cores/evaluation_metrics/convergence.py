@@ -1,8 +1,6 @@
 import torch
 import os
-import itertools
 import asyncio
-import transformers
 import json
 import numpy as np
 from hinteval.cores.evaluation_core import Convergence
@@ -13,17 +11,17 @@ from hinteval.utils.convergence.api_based.hint_scorer import HintScorer as Hint_
 from hinteval.utils.convergence.local.can_ans_generator import CanAnsGenerator as Can_Ans_Generator_Local
 from hinteval.utils.convergence.local.hint_scorer import HintScorer as Hint_Scorer_Local
 from hinteval.utils.convergence.metrics import Metrics
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, AutoConfig
-from typing import List, Literal
+from hinteval.utils.functions.inference_backend import _SequenceClassifierMixin
+from hinteval.utils.functions.text_generation import load_text_generation_pipeline
+from transformers import AutoTokenizer
+from typing import List, Literal, Optional
 from torch.utils.data import DataLoader
-from datasets import Dataset
-from tqdm import tqdm
 from datasets.utils.logging import disable_progress_bar
 
 disable_progress_bar()
 
 
-class Specificity(Convergence):
+class Specificity(_SequenceClassifierMixin, Convergence):
     """
     Class for evaluating specificity of :class:`Hint` using neural network models such as BERT and RoBERTa `[27]`_.
 
@@ -37,6 +35,12 @@ class Specificity(Convergence):
         Step interval for checkpointing.
     enable_tqdm : bool
         Whether the tqdm progress bar is enabled.
+    max_tokens_per_batch : int
+        Maximum number of tokens in a padded batch, or None if batches hold `batch_size` inputs.
+    backend : str
+        Inference backend of the classifier.
+    quantize : str
+        Quantization of the linear layers of the classifier, or None if its fp32 weights are used.
 
     References
     ----------
@@ -49,8 +53,13 @@ class Specificity(Convergence):
 
     """
 
+    _key_params = ('_model_name', 'quantize')
+
     def __init__(self, model_name: Literal['bert-base', 'roberta-large'] = 'bert-base', batch_size: int = 256,
-                 checkpoint: bool = False, checkpoint_step: int = 1, force_download=False, enable_tqdm=False):
+                 checkpoint: bool = False, checkpoint_step: int = 1, force_download=False, enable_tqdm=False,
+                 max_tokens_per_batch: Optional[int] = None,
+                 backend: Literal['pytorch', 'torchscript', 'onnx'] = 'pytorch',
+                 quantize: Optional[Literal['int8']] = None):
         """
         Initializes the Specificity class with the specified neural network model `[28]`_.
 
@@ -70,11 +79,29 @@ class Specificity(Convergence):
             Whether to force download of models.
         enable_tqdm : bool, default False
             Whether to enable tqdm progress bar.
+        max_tokens_per_batch : int, optional
+            Maximum number of tokens in a padded batch, i.e., its number of inputs times the length of its longest
+            input. If given, inputs of similar length are packed into batches up to this budget instead of
+            `batch_size` inputs, so one setting fits both short hints and long inputs; `batch_size` then only sets how
+            often scores are checkpointed. Batches that run out of memory are split and retried in any case.
+        backend : {'pytorch', 'torchscript', 'onnx'}, default 'pytorch'
+            The inference backend. 'torchscript' and 'onnx' export the downloaded checkpoint once into a graph that
+            is stored next to it and run the graph on the CPU with TorchScript or ONNX Runtime, which is usually faster
+            than PyTorch on machines without a GPU. The scores match those of 'pytorch' up to floating-point error.
+            'onnx' requires the `onnxruntime` package.
+        quantize : {'int8'}, optional
+            If 'int8', the weights of the linear layers are quantized dynamically to int8 when the model is loaded,
+            which makes the model several times smaller and usually about twice as fast on the CPU, at a small cost in
+            accuracy. The quantized weights are stored next to the checkpoint, and the model runs on the CPU. Use
+            :meth:`quantization_report` to compare the quantized model with the fp32 one on your data. With the 'onnx'
+            backend, quantization requires the `onnx` package.
 
         Raises
         ------
         ValueError
-            If the provided model name is not valid.
+            If the provided model name, backend, or quantization is not valid.
+        ImportError
+            If the 'onnx' backend is used and ONNX Runtime is not installed.
         Exception
             If downloading of models fails.
 
@@ -98,15 +125,22 @@ class Specificity(Convergence):
         super().__init__(checkpoint, checkpoint_step, enable_tqdm)
         self._file_name = f'specificity_{model_name}.pickle'
         self._model_name = model_name
-        self._device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self._set_backend(backend, quantize)
         self.batch_size = batch_size
+        if max_tokens_per_batch is not None and max_tokens_per_batch < 1:
+            raise ValueError(
+                f'Invalid maximum number of tokens per batch: "{max_tokens_per_batch}". It must be a positive integer.')
+        self.max_tokens_per_batch = max_tokens_per_batch
+        if model_name == 'bert-base':
+            self._columns = ['input_ids', 'token_type_ids', 'attention_mask']
+        else:
+            self._columns = ['input_ids', 'attention_mask']
         ConvergenceSpecificityDownloader.download(model_name, force_download)
         model_dir = os.path.join(os.environ['HINTEVAL_CACHE_DIR'], 'convergence-specificity', self._model_name)
-        self._config = AutoConfig.from_pretrained(model_dir, num_labels=2)
-        self._model = AutoModelForSequenceClassification.from_pretrained(model_dir, config=self._config)
+        self._load_classifier(model_dir, 2)
         _tokenizer_type = 'bert-base-uncased' if model_name == 'bert-base' else 'roberta-large'
-        self._tokenizer = AutoTokenizer.from_pretrained(_tokenizer_type, do_lower_case=True)
-        self._model.to(self._device)
+        self._tokenizer = self._acquire(('tokenizer', _tokenizer_type),
+                                        lambda: AutoTokenizer.from_pretrained(_tokenizer_type, do_lower_case=True))
         self._result_dict = {0: 'general', 1: 'specific'}
 
     @staticmethod
@@ -115,10 +149,6 @@ class Specificity(Convergence):
         logits_sum = np.sum(exp_logits, axis=1)
         return exp_logits / logits_sum[:, np.newaxis]
 
-    def _tokenize_function(self, examples):
-        return self._tokenizer(examples['question'], examples['hint'], max_length=128, padding='max_length',
-                               truncation=True)
-
     def evaluate(self, instances: List[Instance], **kwargs) -> List[List[float]]:
         """
         Evaluates the specificity of the :class:`Hint` of the given instances using the specified neural network model `[29]`_.
@@ -182,64 +212,33 @@ class Specificity(Convergence):
         """
 
         self._validate_input(instances)
-        questions = []
-        hints = []
-        for instance in instances:
-            questions.extend([instance.question] * len(instance.hints))
-            hints.extend(instance.hints)
-
-        data = {
-            'question': [question.question for question in questions],
-            'hint': [hint.hint for hint in hints]
-        }
-
-        _dataset = Dataset.from_dict(data)
-        tokenized_dataset = _dataset.map(self._tokenize_function, batched=True)
-        if self._model_name == 'bert-base':
-            columns = ['input_ids', 'token_type_ids', 'attention_mask']
-        else:
-            columns = ['input_ids', 'attention_mask']
-
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        tokenized_dataset.set_format(type='torch', columns=columns)
-        data_loader = torch.utils.data.DataLoader(tokenized_dataset, batch_size=self.batch_size)
-        data_loader_stream = tqdm(data_loader, total=len(data_loader),
-                                  desc=f'Evaluating specificity metric using {self._model_name}') if self.enable_tqdm else data_loader
-        for batch in data_loader_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self.batch_size
-            if _idx <= final_step:
-                continue
+        view = self._hint_view(instances)
 
-            self._model.eval()
+        def predict(batch):
             batch = {k: v.to(self._device) for k, v in batch.items()}
             with torch.no_grad():
                 outputs = self._model(**batch)
                 logits = outputs.logits
                 preds = logits.detach().cpu().numpy()
                 probabilities = self._softmax(preds)
-                score_array = np.argmax(probabilities, axis=1).tolist()
-                results.extend(score_array)
+                return np.argmax(probabilities, axis=1).tolist()
 
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    data_loader_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
+        def score_batches(pending):
+            self._model.eval()
+            yield from self._padded_batches(pending, predict)
 
-        for idx, h in enumerate(hints):
+        results = self._run_pending(view.question_hint_pairs(), score_batches, self.batch_size,
+                                    f'Evaluating specificity metric using {self._model_name}',
+                                    resume=kwargs.get('_resume'))
+
+        for idx, h in enumerate(view.hints):
             h.metrics[f'convergence-specificity-{self._model_name}'] = Metric('convergence', results[idx])
             h.metrics[f'convergence-specificity-{self._model_name}'].metadata[f'description'] = self._result_dict[
                 results[idx]]
-        final_results = []
-        for instance in instances:
-            num_of_hint = len(instance.hints)
-            final_results.append([results.pop(0) for _ in range(num_of_hint)])
-        return final_results
+        return view.scatter(results)
 
 
-class NeuralNetworkBased(Convergence):
+class NeuralNetworkBased(_SequenceClassifierMixin, Convergence):
     """
     Class for evaluating convergence between question and hints using neural network models such as BERT and RoBERTa.
 
@@ -251,6 +250,12 @@ class NeuralNetworkBased(Convergence):
         Step interval for checkpointing.
     enable_tqdm : bool
         Whether the tqdm progress bar is enabled.
+    max_tokens_per_batch : int
+        Maximum number of tokens in a padded batch, or None if batches hold `batch_size` inputs.
+    backend : str
+        Inference backend of the classifier.
+    quantize : str
+        Quantization of the linear layers of the classifier, or None if its fp32 weights are used.
 
     See Also
     --------
@@ -259,8 +264,13 @@ class NeuralNetworkBased(Convergence):
 
     """
 
+    _key_params = ('_model_name', 'quantize')
+
     def __init__(self, model_name: Literal['bert-base', 'roberta-large'] = 'bert-base', batch_size: int = 256,
-                 checkpoint: bool = False, checkpoint_step: int = 1, force_download=False, enable_tqdm=False):
+                 checkpoint: bool = False, checkpoint_step: int = 1, force_download=False, enable_tqdm=False,
+                 max_tokens_per_batch: Optional[int] = None,
+                 backend: Literal['pytorch', 'torchscript', 'onnx'] = 'pytorch',
+                 quantize: Optional[Literal['int8']] = None):
         """
         Initializes the NeuralNetworkBased class with the specified neural network model.
 
@@ -278,11 +288,29 @@ class NeuralNetworkBased(Convergence):
             Whether to force download of models.
         enable_tqdm : bool, default False
             Whether to enable tqdm progress bar.
+        max_tokens_per_batch : int, optional
+            Maximum number of tokens in a padded batch, i.e., its number of inputs times the length of its longest
+            input. If given, inputs of similar length are packed into batches up to this budget instead of
+            `batch_size` inputs, so one setting fits both short hints and long inputs; `batch_size` then only sets how
+            often scores are checkpointed. Batches that run out of memory are split and retried in any case.
+        backend : {'pytorch', 'torchscript', 'onnx'}, default 'pytorch'
+            The inference backend. 'torchscript' and 'onnx' export the downloaded checkpoint once into a graph that
+            is stored next to it and run the graph on the CPU with TorchScript or ONNX Runtime, which is usually faster
+            than PyTorch on machines without a GPU. The scores match those of 'pytorch' up to floating-point error.
+            'onnx' requires the `onnxruntime` package.
+        quantize : {'int8'}, optional
+            If 'int8', the weights of the linear layers are quantized dynamically to int8 when the model is loaded,
+            which makes the model several times smaller and usually about twice as fast on the CPU, at a small cost in
+            accuracy. The quantized weights are stored next to the checkpoint, and the model runs on the CPU. Use
+            :meth:`quantization_report` to compare the quantized model with the fp32 one on your data. With the 'onnx'
+            backend, quantization requires the `onnx` package.
 
         Raises
         ------
         ValueError
-            If the provided model name is not valid.
+            If the provided model name, backend, or quantization is not valid.
+        ImportError
+            If the 'onnx' backend is used and ONNX Runtime is not installed.
         Exception
             If downloading of models fails.
 
@@ -302,15 +330,22 @@ class NeuralNetworkBased(Convergence):
         super().__init__(checkpoint, checkpoint_step, enable_tqdm)
         self._file_name = f'convergence_{model_name}.pickle'
         self._model_name = model_name
-        self._device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self._set_backend(backend, quantize)
         self.batch_size = batch_size
+        if max_tokens_per_batch is not None and max_tokens_per_batch < 1:
+            raise ValueError(
+                f'Invalid maximum number of tokens per batch: "{max_tokens_per_batch}". It must be a positive integer.')
+        self.max_tokens_per_batch = max_tokens_per_batch
+        if model_name == 'bert-base':
+            self._columns = ['input_ids', 'token_type_ids', 'attention_mask']
+        else:
+            self._columns = ['input_ids', 'attention_mask']
         ConvergenceNNDownloader.download(model_name, force_download)
         model_dir = os.path.join(os.environ['HINTEVAL_CACHE_DIR'], 'convergence-nn', self._model_name)
-        self._config = AutoConfig.from_pretrained(model_dir, num_labels=11)
-        self._model = AutoModelForSequenceClassification.from_pretrained(model_dir, config=self._config)
+        self._load_classifier(model_dir, 11)
         _tokenizer_type = 'bert-base-uncased' if model_name == 'bert-base' else 'roberta-large'
-        self._tokenizer = AutoTokenizer.from_pretrained(_tokenizer_type, do_lower_case=True)
-        self._model.to(self._device)
+        self._tokenizer = self._acquire(('tokenizer', _tokenizer_type),
+                                        lambda: AutoTokenizer.from_pretrained(_tokenizer_type, do_lower_case=True))
 
     @staticmethod
     def _softmax(logits):
@@ -318,10 +353,6 @@ class NeuralNetworkBased(Convergence):
         logits_sum = np.sum(exp_logits, axis=1)
         return exp_logits / logits_sum[:, np.newaxis]
 
-    def _tokenize_function(self, examples):
-        return self._tokenizer(examples['question'], examples['hint'], max_length=128, padding='max_length',
-                               truncation=True)
-
     def evaluate(self, instances: List[Instance], **kwargs) -> List[List[float]]:
         """
         Evaluates the convergence between question and hints of the given instances using the specified neural network model.
@@ -375,39 +406,9 @@ class NeuralNetworkBased(Convergence):
         """
 
         self._validate_input(instances)
-        questions = []
-        hints = []
-        for instance in instances:
-            questions.extend([instance.question] * len(instance.hints))
-            hints.extend(instance.hints)
-        data = {
-            'question': [question.question for question in questions],
-            'hint': [hint.hint for hint in hints]
-        }
-
-        _dataset = Dataset.from_dict(data)
-        tokenized_dataset = _dataset.map(self._tokenize_function, batched=True)
-        if self._model_name == 'bert-base':
-            columns = ['input_ids', 'token_type_ids', 'attention_mask']
-        else:
-            columns = ['input_ids', 'attention_mask']
-
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
+        view = self._hint_view(instances)
 
-        tokenized_dataset.set_format(type='torch', columns=columns)
-        data_loader = torch.utils.data.DataLoader(tokenized_dataset, batch_size=self.batch_size)
-        data_loader_stream = tqdm(data_loader, total=len(data_loader),
-                                  desc=f'Evaluating convergence metric using {self._model_name}') if self.enable_tqdm else data_loader
-
-        for batch in data_loader_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self.batch_size
-            if _idx <= final_step:
-                continue
-
-            self._model.eval()
+        def predict(batch):
             batch = {k: v.to(self._device) for k, v in batch.items()}
             with torch.no_grad():
                 outputs = self._model(**batch)
@@ -415,20 +416,19 @@ class NeuralNetworkBased(Convergence):
                 preds = logits.detach().cpu().numpy()
                 probabilities = self._softmax(preds)
                 score_array = np.argmax(probabilities, axis=1).tolist()
-                score_array = [round(scr / 10, 1) for scr in score_array]
-                results.extend(score_array)
+                return [round(scr / 10, 1) for scr in score_array]
+
+        def score_batches(pending):
+            self._model.eval()
+            yield from self._padded_batches(pending, predict)
 
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    data_loader_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
+        results = self._run_pending(view.question_hint_pairs(), score_batches, self.batch_size,
+                                    f'Evaluating convergence metric using {self._model_name}',
+                                    resume=kwargs.get('_resume'))
 
-        for idx, h in enumerate(hints):
+        for idx, h in enumerate(view.hints):
             h.metrics[f'convergence-nn-{self._model_name}'] = Metric('convergence', results[idx])
-        final_results = []
-        for instance in instances:
-            num_of_hint = len(instance.hints)
-            final_results.append([results.pop(0) for _ in range(num_of_hint)])
-        return final_results
+        return view.scatter(results)
 
 
 class LlmBased(Convergence):
@@ -457,6 +457,8 @@ class LlmBased(Convergence):
 
     """
 
+    _key_params = ('_model_name', '_model_type', '_base_url')
+
     def __init__(self, model_name: Literal['llama-3-8b', 'llama-3-70b'] = 'llama-3-8b', together_ai_api_key: str = None,
                  checkpoint: bool = False, checkpoint_step: int = 1, enable_tqdm=False):
         """
@@ -522,12 +524,8 @@ class LlmBased(Convergence):
         self._metrics = Metrics()
         if self._api_key is None:
             self._model_type = 'meta-llama/Meta-Llama-3-8B-Instruct' if model_name == 'llama-3-8b' else 'meta-llama/Meta-Llama-3-70B-Instruct'
-            self._pipeline = transformers.pipeline(
-                "text-generation",
-                model=self._model_type,
-                device_map="auto"
-            )
-            self._pipeline.tokenizer.pad_token_id = self._pipeline.model.config.eos_token_id
+            self._pipeline = self._acquire(('text-generation', self._model_type),
+                                           lambda: load_text_generation_pipeline(self._model_type))
             self._candidate_generator = Can_Ans_Generator_Local(11, self._pipeline)
             self._hint_evaluator = Hint_Scorer_Local(self._pipeline)
         else:
@@ -605,6 +603,100 @@ class LlmBased(Convergence):
         """
 
         self._validate_input(instances)
+        pairs = self._collect_pairs(instances)
+
+        def score_batches(pending):
+            for question, hints, answer, candidates in pending:
+                if candidates is None:
+                    candidates = self._candidate_generator.generate_candidate_answers(question, answer)
+                if self._api_key is None:
+                    scores = self._hint_evaluator.rate(hints, candidates)
+                else:
+                    scores = asyncio.run(self._hint_evaluator.rate(hints, candidates))
+                convergences = self._metrics.compute_metrics(scores)
+                yield [(convergences, scores, candidates)]
+
+        outputs = self._run_pending(pairs, score_batches, self._batch_size,
+                                    f'Evaluating convergence metric using {self._model_name}',
+                                    resume=kwargs.get('_resume'))
+        return self._store_metrics(instances, outputs)
+
+    async def aevaluate(self, instances: List[Instance], limiter: Optional[asyncio.Semaphore] = None,
+                        **kwargs) -> List[List[float]]:
+        """
+        Evaluates the convergence between question and hints of the given instances on the running event loop,
+        without blocking it.
+
+        Parameters
+        ----------
+        instances : List[Instance]
+            List of instances to evaluate.
+        limiter : asyncio.Semaphore, optional
+            A semaphore shared by the evaluators and models that run on the same event loop. Every API request, or
+            every instance of a local model, holds it while it runs, so it bounds the concurrency of all of them
+            together. If given, all instances are started at once; if None, the instances are evaluated one after
+            another.
+        **kwargs
+            Additional keyword arguments.
+
+        Returns
+        -------
+        List[List[float]]
+            List of convergence scores for each instance.
+
+        Notes
+        -----
+        This function stores the scores, the candidate answers, and the scores for each hint exactly as
+        :meth:`evaluate` does, and uses the same checkpoints and cached scores. Candidate answers are generated by a
+        multi-turn conversation, which runs in a separate thread, as do local models.
+
+        Examples
+        --------
+        >>> import asyncio
+        >>> from hinteval.cores import Instance, Question, Hint, Answer
+        >>> from hinteval.evaluation.convergence import LlmBased
+        >>>
+        >>> llm = LlmBased(model_name='llama-3-8b', together_ai_api_key='your_api_key')
+        >>> instance = Instance(
+        ...     question=Question('What is the capital of Austria?'),
+        ...     answers=[Answer('Vienna')],
+        ...     hints=[Hint('This city, once home to Mozart and Beethoven, is the capital of Austria.')])
+        >>> results = asyncio.run(llm.aevaluate([instance], limiter=asyncio.Semaphore(8)))
+        >>> print(results)
+        # [[0.91]]
+
+        See Also
+        --------
+        :meth:`evaluate` : Evaluates the convergence between question and hints of the given instances.
+        """
+
+        self._validate_input(instances)
+        pairs = self._collect_pairs(instances)
+
+        def score_locally(question, hints, answer, candidates):
+            if candidates is None:
+                candidates = self._candidate_generator.generate_candidate_answers(question, answer)
+            scores = self._hint_evaluator.rate(hints, candidates)
+            return self._metrics.compute_metrics(scores), scores, candidates
+
+        async def score_batch(pending, limiter):
+            outputs = []
+            for question, hints, answer, candidates in pending:
+                if self._api_key is None:
+                    outputs.append(await self._run_blocking(limiter, score_locally, question, hints, answer, candidates))
+                    continue
+                if candidates is None:
+                    candidates = await self._run_blocking(limiter, self._candidate_generator.generate_candidate_answers,
+                                                          question, answer)
+                scores = await self._hint_evaluator.rate(hints, candidates, limiter)
+                outputs.append((self._metrics.compute_metrics(scores), scores, candidates))
+            return outputs
+
+        outputs = await self._arun_pending(pairs, score_batch, self._batch_size,
+                                           f'Evaluating convergence metric using {self._model_name}', limiter)
+        return self._store_metrics(instances, outputs)
+
+    def _collect_pairs(self, instances):
         pairs = []
         for idx, instance in enumerate(instances):
             q = instance.question.question
@@ -613,45 +705,19 @@ class LlmBased(Convergence):
             cands = instance.question.metadata[
                 f'candidate_answers-{self._model_name}'] if f'candidate_answers-{self._model_name}' in instance.question.metadata else None
             pairs.append((q, hs, a, cands))
+        return pairs
 
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        scores_lst = [] if checkpoint_content is None else checkpoint_content['scores_lst']
-        candidate_answers = [] if checkpoint_content is None else checkpoint_content['candidate_answers']
-        item_counter = itertools.count(1)
-
-        question_answer_pairs_stream = tqdm(pairs, total=len(pairs),
-                                            desc=f'Evaluating convergence metric using {self._model_name}') if self.enable_tqdm else pairs
-        for question, hints, answer, candidates in question_answer_pairs_stream:
-            _idx = next(item_counter)
-            final_step = len(candidate_answers) // self._batch_size
-            if _idx <= final_step:
-                continue
-            if candidates is None:
-                candidates = self._candidate_generator.generate_candidate_answers(question, answer)
-            if self._api_key is None:
-                scores = self._hint_evaluator.rate(hints, candidates)
-            else:
-                scores = asyncio.run(self._hint_evaluator.rate(hints, candidates))
-            convergences = self._metrics.compute_metrics(scores)
-            scores_lst.extend(scores)
+    def _store_metrics(self, instances, outputs):
+        view = self._hint_view(instances)
+        results, scores_lst, candidate_answers = [], [], []
+        for convergences, scores, candidates in outputs:
             results.extend(convergences)
+            scores_lst.extend(scores)
             candidate_answers.append(candidates)
 
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    question_answer_pairs_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint(
-                    {'results': results, 'scores_lst': scores_lst, 'candidate_answers': candidate_answers})
-
-        hints = []
-        [hints.extend(instance.hints) for instance in instances]
-        for idx, h in enumerate(hints):
+        for idx, h in enumerate(view.hints):
             h.metrics[f'convergence-llm-{self._model_name}'] = Metric('convergence', results[idx])
             h.metrics[f'convergence-llm-{self._model_name}'].metadata['scores'] = scores_lst[idx]
         for idx, instance in enumerate(instances):
             instance.question.metadata[f'candidate_answers-{self._model_name}'] = candidate_answers[idx]
-        final_results = []
-        for instance in instances:
-            num_of_hint = len(instance.hints)
-            final_results.append([results.pop(0) for _ in range(num_of_hint)])
-        return final_results
+        return view.scatter(results)
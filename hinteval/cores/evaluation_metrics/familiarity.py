@@ -1,15 +1,13 @@
 import os
 import re
-import itertools
-import spacy
 import json
+import spacy
 from hinteval.cores.evaluation_core import Familiarity
 from hinteval.cores.dataset_core import Question, Hint, Answer, Metric
 from hinteval.utils.familiarity.popularity import Popularity
 from hinteval.utils.familiarity.metrics import Metrics
 from hinteval.utils.functions.download_manager import SpacyDownloader, FamiliarityFrequencyDownloader
 from typing import List, Union, Literal
-from tqdm import tqdm
 from tok import word_tokenize
 
 
@@ -25,6 +23,8 @@ class WordFrequency(Familiarity):
         Step interval for checkpointing.
     enable_tqdm : bool
         Whether the tqdm progress bar is enabled.
+    num_workers : int
+        Number of worker processes that score the inputs.
 
     See Also
     --------
@@ -32,10 +32,17 @@ class WordFrequency(Familiarity):
 
     """
 
+    _key_params = ('_method', '_spacy_pipeline')
+
+    @property
+    def _process_safe(self):
+        # The transformer pipeline runs a neural model, so it is not forked into worker processes.
+        return self._spacy_pipeline != 'en_core_web_trf'
+
     def __init__(self, method: Literal['include_stop_words', 'exclude_stop_words'] = 'include_stop_words',
                  spacy_pipeline: Literal[
                      'en_core_web_sm', 'en_core_web_lg', 'en_core_web_md', 'en_core_web_trf'] = 'en_core_web_sm',
-                 checkpoint: bool = False, checkpoint_step: int = 1, force_download=False, enable_tqdm=False):
+                 checkpoint: bool = False, checkpoint_step: int = 1, force_download=False, enable_tqdm=False, num_workers: int = 1):
         """
         Initializes the WordFrequency class with the specified method and spaCy pipeline.
 
@@ -53,11 +60,17 @@ class WordFrequency(Familiarity):
             Whether to force download of necessary resources.
         enable_tqdm : bool, default False
             Whether to enable tqdm progress bar.
+        num_workers : int, default 1
+            Number of worker processes that score the inputs in parallel. The inputs are split into shards that are
+            checkpointed one by one. It must be 1 with the `en_core_web_trf` pipeline, which runs a neural model.
+            The workers are only forked from the main thread of a process without CUDA; otherwise, the inputs are
+            scored in the calling thread and a warning is issued.
 
         Raises
         ------
         ValueError
-            If the provided method name is not valid.
+            If the provided method name is not valid, the number of workers is not positive, or there are several
+            workers with the `en_core_web_trf` pipeline.
         Exception
             If downloading of resources fails.
 
@@ -79,7 +92,8 @@ class WordFrequency(Familiarity):
                 '- include_stop_words: Includes common stop words (e.g., "the", "and", "in") in the analysis. This method is useful when you want to preserve these words for certain text processing tasks.\n'
                 '- exclude_stop_words: Removes common stop words from the analysis. This method is useful for focusing on the more meaningful content of the text by eliminating less significant words.'
             )
-        super().__init__(checkpoint, checkpoint_step, enable_tqdm)
+        self._spacy_pipeline = spacy_pipeline
+        super().__init__(checkpoint, checkpoint_step, enable_tqdm, num_workers)
         self._file_name = f'familiarity_{method}.pickle'
         self._batch_size = 1
         self._method = method
@@ -88,9 +102,8 @@ class WordFrequency(Familiarity):
                   mode='r',
                   encoding='utf-8') as f:
             self._word_frequency = json.load(f)
-        self._spacy_pipeline = spacy_pipeline
         SpacyDownloader.download(spacy_pipeline)
-        self._stop_words = spacy.load(self._spacy_pipeline).Defaults.stop_words
+        self._stop_words = self._acquire(('spacy', spacy_pipeline), lambda: spacy.load(spacy_pipeline)).Defaults.stop_words
 
     def evaluate(self, sentences: List[Union[Question, Hint, Answer]], **kwargs) -> List[float]:
         """
@@ -136,43 +149,28 @@ class WordFrequency(Familiarity):
 
         self._validate_input(sentences)
 
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        sentence_stream = tqdm(sentences, total=len(sentences),
-                               desc=f'Evaluating familiarity metric based on the word frequency{" without " if self._method == "exclude_stop_words" else " "}considering stop words') if self.enable_tqdm else sentences
-        for _sentence in sentence_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self._batch_size
-            if _idx <= final_step:
-                continue
-
-            if isinstance(_sentence, Question):
-                doc = _sentence.question
-            elif isinstance(_sentence, Hint):
-                doc = _sentence.hint
-            else:
-                doc = _sentence.answer
-            sent = doc.lower().strip()
-            tokens = word_tokenize(sent)
-            sent_weights = []
-            for token in tokens:
-                if self._method == 'include_stop_words' and token in self._stop_words:
-                    continue
-                weight = 0
-                if token in self._word_frequency:
-                    weight = self._word_frequency[token]
-                sent_weights.append(weight)
-            if len(sent_weights) > 0:
-                sent_weight = sum(sent_weights) / len(sent_weights)
-            else:
-                sent_weight = 0.0
-            results.append(sent_weight)
-
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    sentence_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
+        def score_batches(pending):
+            for doc, in pending:
+                sent = doc.lower().strip()
+                tokens = word_tokenize(sent)
+                sent_weights = []
+                for token in tokens:
+                    if self._method == 'include_stop_words' and token in self._stop_words:
+                        continue
+                    weight = 0
+                    if token in self._word_frequency:
+                        weight = self._word_frequency[token]
+                    sent_weights.append(weight)
+                if len(sent_weights) > 0:
+                    sent_weight = sum(sent_weights) / len(sent_weights)
+                else:
+                    sent_weight = 0.0
+                yield [sent_weight]
+
+        results = self._run_pending([(self._sentence_text(_sentence),) for _sentence in sentences], score_batches,
+                                    self._batch_size,
+                                    f'Evaluating familiarity metric based on the word frequency{" without " if self._method == "exclude_stop_words" else " "}considering stop words',
+                                    resume=kwargs.get('_resume'))
 
         results = [round(res, 3) for res in results]
         for idx, s in enumerate(sentences):
@@ -208,6 +206,8 @@ class Wikipedia(Familiarity):
 
     """
 
+    _key_params = ('_spacy_pipeline',)
+
     def __init__(self, spacy_pipeline: Literal[
         'en_core_web_sm', 'en_core_web_lg', 'en_core_web_md', 'en_core_web_trf'] = 'en_core_web_sm',
                  checkpoint: bool = False, checkpoint_step: int = 1, enable_tqdm=False):
@@ -252,7 +252,8 @@ class Wikipedia(Familiarity):
         self._batch_size = 1
         self._spacy_pipeline = spacy_pipeline
         SpacyDownloader.download(spacy_pipeline)
-        self._spacy_model = spacy.load(self._spacy_pipeline)
+        # Kept loaded for the popularity, which parses sentences through the document cache.
+        self._spacy_model = self._acquire(('spacy', spacy_pipeline), lambda: spacy.load(spacy_pipeline))
         self._popularity = Popularity(spacy_pipeline)
         self._metrics = Metrics()
 
@@ -313,35 +314,16 @@ class Wikipedia(Familiarity):
 
         self._validate_input(sentences)
 
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        sentence_stream = tqdm(sentences, total=len(sentences),
-                               desc=f'Evaluating familiarity metric using Wikipedia') if self.enable_tqdm else sentences
-        for _sentence in sentence_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self._batch_size
-            if _idx <= final_step:
-                continue
-
-            if isinstance(_sentence, Question):
-                doc = _sentence.question
-                is_word = False
-            elif isinstance(_sentence, Hint):
-                doc = _sentence.hint
-                is_word = False
-            else:
-                doc = _sentence.answer
-                is_word = True
-            sent = doc.lower().strip()
-            sent_entities, sent_pops_normalized = self._popularity.popularity(sent, is_word)
-            familiarity = self._metrics.compute_metrics(sent_pops_normalized)
-            results.append((sent_entities, familiarity))
-
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    sentence_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
+        def score_batches(pending):
+            for doc, is_word in pending:
+                sent = doc.lower().strip()
+                sent_entities, sent_pops_normalized = self._popularity.popularity(sent, is_word)
+                familiarity = self._metrics.compute_metrics(sent_pops_normalized)
+                yield [(sent_entities, familiarity)]
+
+        results = self._run_pending([(self._sentence_text(_sentence), isinstance(_sentence, Answer)) for _sentence in
+                                     sentences], score_batches, self._batch_size,
+                                    f'Evaluating familiarity metric using Wikipedia', resume=kwargs.get('_resume'))
 
         for idx, s in enumerate(sentences):
             spacy_pipeline = re.search(r'web_(\w+)$', self._spacy_pipeline).group(1)
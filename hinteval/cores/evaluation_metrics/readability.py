@@ -1,22 +1,22 @@
 import os
 import re
-import itertools
+import asyncio
 import joblib
-import spacy
 import lftk
+import spacy
 import torch
 import numpy as np
 import xgboost as xgb
 from hinteval.cores.evaluation_core import Readability
 from hinteval.cores.dataset_core import Question, Hint, Metric
 from hinteval.utils.functions.download_manager import SpacyDownloader, ReadabilityMLDownloader, ReadabilityNNDownloader
+from hinteval.utils.functions.spacy_docs import SpacyDocCache
+from hinteval.utils.functions.inference_backend import _SequenceClassifierMixin
 from hinteval.utils.readability.local import ReadmeReadability as RR_LOCAL
 from hinteval.utils.readability.api_based import ReadmeReadability as RR_API
-from typing import Literal, List, Union
-from tqdm import tqdm
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, AutoConfig
+from typing import Literal, List, Union, Optional
+from transformers import AutoTokenizer
 from torch.utils.data import DataLoader
-from datasets import Dataset
 from datasets.utils.logging import disable_progress_bar
 
 disable_progress_bar()
@@ -38,6 +38,8 @@ class TraditionalIndexes(Readability):
         Step interval for checkpointing.
     enable_tqdm : bool
         Whether the tqdm progress bar is enabled.
+    num_workers : int
+        Number of worker processes that score the inputs.
 
     References
     ----------
@@ -51,11 +53,18 @@ class TraditionalIndexes(Readability):
 
     """
 
+    _key_params = ('_method', '_spacy_pipeline')
+
+    @property
+    def _process_safe(self):
+        # The transformer pipeline runs a neural model, so it is not forked into worker processes.
+        return self._spacy_pipeline != 'en_core_web_trf'
+
     def __init__(self, method: Literal[
         'flesch_kincaid_reading_ease', 'gunning_fog_index', 'smog_index', 'coleman_liau_index', 'automated_readability_index'] = 'flesch_kincaid_reading_ease',
                  spacy_pipeline: Literal[
                      'en_core_web_sm', 'en_core_web_lg', 'en_core_web_md', 'en_core_web_trf'] = 'en_core_web_sm',
-                 checkpoint: bool = False, checkpoint_step: int = 1, enable_tqdm=False):
+                 checkpoint: bool = False, checkpoint_step: int = 1, enable_tqdm=False, num_workers: int = 1):
         """
         Initializes the TraditionalIndexes class with the specified readability method and spaCy pipeline `[16]`_.
 
@@ -73,11 +82,17 @@ class TraditionalIndexes(Readability):
             Step interval for checkpointing. Note that each step corresponds to one batch.
         enable_tqdm : bool, default False
             Whether to enable tqdm progress bar.
+        num_workers : int, default 1
+            Number of worker processes that score the inputs in parallel. The inputs are split into shards that are
+            checkpointed one by one. It must be 1 with the `en_core_web_trf` pipeline, which runs a neural model.
+            The workers are only forked from the main thread of a process without CUDA; otherwise, the inputs are
+            scored in the calling thread and a warning is issued.
 
         Raises
         ------
         ValueError
-            If the provided method name is not valid.
+            If the provided method name is not valid, the number of workers is not positive, or there are several
+            workers with the `en_core_web_trf` pipeline.
         Exception
             If downloading of spaCy models fails.
 
@@ -102,7 +117,8 @@ class TraditionalIndexes(Readability):
 
         """
 
-        super().__init__(checkpoint, checkpoint_step, enable_tqdm)
+        self._spacy_pipeline = spacy_pipeline
+        super().__init__(checkpoint, checkpoint_step, enable_tqdm, num_workers)
         if method not in ['flesch_kincaid_reading_ease', 'gunning_fog_index', 'smog_index', 'coleman_liau_index',
                           'automated_readability_index']:
             raise ValueError(
@@ -119,9 +135,8 @@ class TraditionalIndexes(Readability):
         self._method = method
         self._method_dict = {'flesch_kincaid_reading_ease': 'fkre', 'gunning_fog_index': 'fogi', 'smog_index': 'smog',
                              'coleman_liau_index': 'cole', 'automated_readability_index': 'auto'}
-        self._spacy_pipeline = spacy_pipeline
         SpacyDownloader.download(spacy_pipeline)
-        self._spacy_model = spacy.load(spacy_pipeline)
+        self._spacy_model = self._acquire(('spacy', spacy_pipeline), lambda: spacy.load(spacy_pipeline))
 
     def evaluate(self, sentences: List[Union[Question, Hint]], **kwargs) -> List[float]:
         """
@@ -176,29 +191,17 @@ class TraditionalIndexes(Readability):
 
         self._validate_input(sentences)
 
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        sentence_stream = tqdm(sentences, total=len(sentences),
-                               desc=f'Evaluating readability metric using {self._method}') if self.enable_tqdm else sentences
-        for _sentence in sentence_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self._batch_size
-            if _idx <= final_step:
-                continue
-
-            if isinstance(_sentence, Question):
-                doc = self._spacy_model(_sentence.question)
-            else:
-                doc = self._spacy_model(_sentence.hint)
-            LFTK = lftk.Extractor(docs=doc)
-            LFTK.customize(stop_words=True, punctuations=False, round_decimal=3)
-            extracted_feature = LFTK.extract(features=[self._method_dict[self._method]])
-            results.append(extracted_feature[self._method_dict[self._method]])
-
-            if (_idx % self.checkpoint_step == 0 or _idx == len(sentence_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
+        def score_batches(pending):
+            for _sentence, in pending:
+                doc = SpacyDocCache.parse(self._spacy_pipeline, [_sentence])[0]
+                LFTK = lftk.Extractor(docs=doc)
+                LFTK.customize(stop_words=True, punctuations=False, round_decimal=3)
+                extracted_feature = LFTK.extract(features=[self._method_dict[self._method]])
+                yield [extracted_feature[self._method_dict[self._method]]]
+
+        results = self._run_pending([(self._sentence_text(_sentence),) for _sentence in sentences], score_batches,
+                                    self._batch_size, f'Evaluating readability metric using {self._method}',
+                                    resume=kwargs.get('_resume'))
 
         results = [round(res, 3) for res in results]
         for idx, s in enumerate(sentences):
@@ -236,6 +239,8 @@ class MachineLearningBased(Readability):
 
     """
 
+    _key_params = ('_method', '_spacy_pipeline')
+
     def __init__(self, method: Literal['xgboost', 'random_forest'] = 'xgboost',
                  spacy_pipeline: Literal[
                      'en_core_web_sm', 'en_core_web_lg', 'en_core_web_md', 'en_core_web_trf'] = 'en_core_web_sm',
@@ -292,7 +297,7 @@ class MachineLearningBased(Readability):
         self._method = method
         self._spacy_pipeline = spacy_pipeline
         SpacyDownloader.download(spacy_pipeline)
-        self._spacy_model = spacy.load(spacy_pipeline)
+        self._spacy_model = self._acquire(('spacy', spacy_pipeline), lambda: spacy.load(spacy_pipeline))
         ReadabilityMLDownloader.download(method, force_download)
         if method == 'xgboost':
             self._ml = xgb.Booster()
@@ -366,33 +371,20 @@ class MachineLearningBased(Readability):
         """
 
         self._validate_input(sentences)
-        _sentences = []
-
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        sentence_stream = tqdm(sentences, total=len(sentences),
-                               desc=f'Evaluating readability metric using {self._method}') if self.enable_tqdm else sentences
-        for _sentence in sentence_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self._batch_size
-            if _idx <= final_step:
-                continue
-
-            if isinstance(_sentence, Question):
-                doc = self._spacy_model(_sentence.question)
-            else:
-                doc = self._spacy_model(_sentence.hint)
-            LFTK = lftk.Extractor(docs=doc)
-            LFTK.customize(stop_words=True, punctuations=False, round_decimal=3)
-            extracted_features = [list(LFTK.extract(self._selected_features).values())]
-            if self._method == 'xgboost':
-                extracted_features = xgb.DMatrix(extracted_features)
-            results.append(self._ml.predict(extracted_features).astype(int).tolist()[0])
-
-            if (_idx % self.checkpoint_step == 0 or _idx == len(sentence_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
+
+        def score_batches(pending):
+            for _sentence, in pending:
+                doc = SpacyDocCache.parse(self._spacy_pipeline, [_sentence])[0]
+                LFTK = lftk.Extractor(docs=doc)
+                LFTK.customize(stop_words=True, punctuations=False, round_decimal=3)
+                extracted_features = [list(LFTK.extract(self._selected_features).values())]
+                if self._method == 'xgboost':
+                    extracted_features = xgb.DMatrix(extracted_features)
+                yield [self._ml.predict(extracted_features).astype(int).tolist()[0]]
+
+        results = self._run_pending([(self._sentence_text(_sentence),) for _sentence in sentences], score_batches,
+                                    self._batch_size, f'Evaluating readability metric using {self._method}',
+                                    resume=kwargs.get('_resume'))
 
         for idx, s in enumerate(sentences):
             spacy_pipeline = re.search(r'web_(\w+)$', self._spacy_pipeline).group(1)
@@ -404,7 +396,7 @@ class MachineLearningBased(Readability):
         return results
 
 
-class NeuralNetworkBased(Readability):
+class NeuralNetworkBased(_SequenceClassifierMixin, Readability):
     """
     Class for evaluating readability of :class:`Question` or :class:`Hint` using neural network models such as BERT and RoBERTa `[21]`_.
 
@@ -418,6 +410,12 @@ class NeuralNetworkBased(Readability):
         Step interval for checkpointing.
     enable_tqdm : bool
         Whether the tqdm progress bar is enabled.
+    max_tokens_per_batch : int
+        Maximum number of tokens in a padded batch, or None if batches hold `batch_size` inputs.
+    backend : str
+        Inference backend of the classifier.
+    quantize : str
+        Quantization of the linear layers of the classifier, or None if its fp32 weights are used.
 
     References
     ----------
@@ -431,8 +429,13 @@ class NeuralNetworkBased(Readability):
 
     """
 
+    _key_params = ('_model_name', 'quantize')
+
     def __init__(self, model_name: Literal['bert-base', 'roberta-large'] = 'bert-base', batch_size: int = 256,
-                 checkpoint: bool = False, checkpoint_step: int = 1, force_download=False, enable_tqdm=False):
+                 checkpoint: bool = False, checkpoint_step: int = 1, force_download=False, enable_tqdm=False,
+                 max_tokens_per_batch: Optional[int] = None,
+                 backend: Literal['pytorch', 'torchscript', 'onnx'] = 'pytorch',
+                 quantize: Optional[Literal['int8']] = None):
         """
         Initializes the NeuralNetworkBased class with the specified neural network model `[22]`_.
 
@@ -452,11 +455,29 @@ class NeuralNetworkBased(Readability):
             Whether to force download of models.
         enable_tqdm : bool, default False
             Whether to enable tqdm progress bar.
+        max_tokens_per_batch : int, optional
+            Maximum number of tokens in a padded batch, i.e., its number of inputs times the length of its longest
+            input. If given, inputs of similar length are packed into batches up to this budget instead of
+            `batch_size` inputs, so one setting fits both short hints and long inputs; `batch_size` then only sets how
+            often scores are checkpointed. Batches that run out of memory are split and retried in any case.
+        backend : {'pytorch', 'torchscript', 'onnx'}, default 'pytorch'
+            The inference backend. 'torchscript' and 'onnx' export the downloaded checkpoint once into a graph that
+            is stored next to it and run the graph on the CPU with TorchScript or ONNX Runtime, which is usually faster
+            than PyTorch on machines without a GPU. The scores match those of 'pytorch' up to floating-point error.
+            'onnx' requires the `onnxruntime` package.
+        quantize : {'int8'}, optional
+            If 'int8', the weights of the linear layers are quantized dynamically to int8 when the model is loaded,
+            which makes the model several times smaller and usually about twice as fast on the CPU, at a small cost in
+            accuracy. The quantized weights are stored next to the checkpoint, and the model runs on the CPU. Use
+            :meth:`quantization_report` to compare the quantized model with the fp32 one on your data. With the 'onnx'
+            backend, quantization requires the `onnx` package.
 
         Raises
         ------
         ValueError
-            If the provided model name is not valid.
+            If the provided model name, backend, or quantization is not valid.
+        ImportError
+            If the 'onnx' backend is used and ONNX Runtime is not installed.
         Exception
             If downloading of models fails.
 
@@ -481,15 +502,22 @@ class NeuralNetworkBased(Readability):
         super().__init__(checkpoint, checkpoint_step, enable_tqdm)
         self._file_name = f'readability_{model_name}.pickle'
         self._model_name = model_name
-        self._device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self._set_backend(backend, quantize)
         self.batch_size = batch_size
+        if max_tokens_per_batch is not None and max_tokens_per_batch < 1:
+            raise ValueError(
+                f'Invalid maximum number of tokens per batch: "{max_tokens_per_batch}". It must be a positive integer.')
+        self.max_tokens_per_batch = max_tokens_per_batch
+        if model_name == 'bert-base':
+            self._columns = ['input_ids', 'token_type_ids', 'attention_mask']
+        else:
+            self._columns = ['input_ids', 'attention_mask']
         ReadabilityNNDownloader.download(model_name, force_download)
         model_dir = os.path.join(os.environ['HINTEVAL_CACHE_DIR'], 'readability-nn', self._model_name)
-        self._config = AutoConfig.from_pretrained(model_dir, num_labels=3)
-        self._model = AutoModelForSequenceClassification.from_pretrained(model_dir, config=self._config)
+        self._load_classifier(model_dir, 3)
         _tokenizer_type = 'bert-base-uncased' if model_name == 'bert-base' else 'roberta-large'
-        self._tokenizer = AutoTokenizer.from_pretrained(_tokenizer_type, do_lower_case=True)
-        self._model.to(self._device)
+        self._tokenizer = self._acquire(('tokenizer', _tokenizer_type),
+                                        lambda: AutoTokenizer.from_pretrained(_tokenizer_type, do_lower_case=True))
         self._result_dict = {0: 'beginner', 1: 'intermediate', 2: 'advanced'}
 
     @staticmethod
@@ -498,8 +526,9 @@ class NeuralNetworkBased(Readability):
         logits_sum = np.sum(exp_logits, axis=1)
         return exp_logits / logits_sum[:, np.newaxis]
 
-    def _tokenize_function(self, sentence):
-        return self._tokenizer(sentence['sent'], padding='max_length', max_length=128, truncation=True)
+    def _report_inputs(self, sentences):
+        self._validate_input(sentences)
+        return [(self._sentence_text(_sentence),) for _sentence in sentences]
 
     def evaluate(self, sentences: List[Union[Question, Hint]], **kwargs) -> List[float]:
         """
@@ -556,47 +585,23 @@ class NeuralNetworkBased(Readability):
         """
 
         self._validate_input(sentences)
-        _sentences = []
-        for _sentence in sentences:
-            if isinstance(_sentence, Question):
-                _sentences.append({'sent': _sentence.question})
-            else:
-                _sentences.append({'sent': _sentence.hint})
-        _dataset = Dataset.from_list(_sentences)
-        tokenized_dataset = _dataset.map(self._tokenize_function, batched=True)
-        if self._model_name == 'bert-base':
-            columns = ['input_ids', 'token_type_ids', 'attention_mask']
-        else:
-            columns = ['input_ids', 'attention_mask']
-
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        tokenized_dataset.set_format(type='torch', columns=columns)
-        data_loader = torch.utils.data.DataLoader(tokenized_dataset, batch_size=self.batch_size)
-        data_loader_stream = tqdm(data_loader, total=len(data_loader),
-                                  desc=f'Evaluating readability metric using {self._model_name}') if self.enable_tqdm else data_loader
 
-        for batch in data_loader_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self.batch_size
-            if _idx <= final_step:
-                continue
-
-            self._model.eval()
+        def predict(batch):
             batch = {k: v.to(self._device) for k, v in batch.items()}
             with torch.no_grad():
                 outputs = self._model(**batch)
                 logits = outputs.logits
                 preds = logits.detach().cpu().numpy()
                 probabilities = self._softmax(preds)
-                score_array = np.argmax(probabilities, axis=1).tolist()
-                results.extend(score_array)
+                return np.argmax(probabilities, axis=1).tolist()
+
+        def score_batches(pending):
+            self._model.eval()
+            yield from self._padded_batches(pending, predict)
 
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    data_loader_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
+        results = self._run_pending([(self._sentence_text(_sentence),) for _sentence in sentences], score_batches,
+                                    self.batch_size, f'Evaluating readability metric using {self._model_name}',
+                                    resume=kwargs.get('_resume'))
 
         for idx, s in enumerate(sentences):
             s.metrics[f'readability-nn-{self._model_name}'] = Metric('readability', results[idx])
@@ -634,6 +639,8 @@ class LlmBased(Readability):
 
     """
 
+    _key_params = ('_model_name', '_base_url', '_temperature', '_top_p', '_max_tokens')
+
     def __init__(self, model_name: str,
                  api_key: str = None,
                  base_url: str = 'https://api.together.xyz/v1',
@@ -780,32 +787,78 @@ class LlmBased(Readability):
         """
 
         self._validate_input(sentences)
-        _sentences = []
-        for _sentence in sentences:
-            if isinstance(_sentence, Question):
-                _sentences.append(_sentence.question)
-            else:
-                _sentences.append(_sentence.hint)
-        _sentences = [_sentences[i:i + self.batch_size] for i in range(0, len(_sentences), self.batch_size)]
-
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        sentences_stream = tqdm(_sentences, total=len(_sentences),
-                                desc=f'Evaluating readability metric using {self._model_name.replace("/", "_")}') if self.enable_tqdm else _sentences
-        for sentence in sentences_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self.batch_size
-            if _idx <= final_step:
-                continue
-            scores = self._evaluator.compute_readability(sentence)
-            results.extend(scores)
-
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    sentences_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
 
+        def score_batches(pending):
+            _sentences = [_sentence for _sentence, in pending]
+            for i in range(0, len(_sentences), self.batch_size):
+                yield self._evaluator.compute_readability(_sentences[i:i + self.batch_size])
+
+        results = self._run_pending([(self._sentence_text(_sentence),) for _sentence in sentences], score_batches,
+                                    self.batch_size,
+                                    f'Evaluating readability metric using {self._model_name.replace("/", "_")}',
+                                    resume=kwargs.get('_resume'))
+
+        return self._store_metrics(sentences, results)
+
+    async def aevaluate(self, sentences: List[Union[Question, Hint]], limiter: Optional[asyncio.Semaphore] = None,
+                        **kwargs) -> List[float]:
+        """
+        Evaluates the readability of the given sentences on the running event loop, without blocking it.
+
+        Parameters
+        ----------
+        sentences : List[Union[Question, Hint]]
+            List of sentences to evaluate.
+        limiter : asyncio.Semaphore, optional
+            A semaphore shared by the evaluators and models that run on the same event loop. Every API request, or
+            every batch of a local model, holds it while it runs, so it bounds the concurrency of all of them together.
+            If given, all batches are started at once; if None, the batches are evaluated one after another.
+        **kwargs
+            Additional keyword arguments.
+
+        Returns
+        -------
+        List[float]
+            List of readability scores for each sentence.
+
+        Notes
+        -----
+        This function stores the scores exactly as :meth:`evaluate` does, and uses the same checkpoints and cached
+        scores. Local models run in a separate thread.
+
+        Examples
+        --------
+        >>> import asyncio
+        >>> from hinteval.cores import Question, Hint
+        >>> from hinteval.evaluation.readability import LlmBased
+        >>>
+        >>> llm = LlmBased(model_name='meta-llama/Meta-Llama-3.1-70B-Instruct-Turbo', api_key='your_api_key')
+        >>> sentences = [Question('What is the capital of Austria?'),
+        ...              Hint('This city, once home to Mozart and Beethoven, is the capital of Austria.')]
+        >>> results = asyncio.run(llm.aevaluate(sentences, limiter=asyncio.Semaphore(8)))
+        >>> print(results)
+        # [0, 0]
+
+        See Also
+        --------
+        :meth:`evaluate` : Evaluates the readability of the given sentences.
+        """
+
+        self._validate_input(sentences)
+
+        async def score_batch(pending, limiter):
+            _sentences = [_sentence for _sentence, in pending]
+            if self._api_key is None:
+                return await self._run_blocking(limiter, self._evaluator.compute_readability, _sentences)
+            return await self._evaluator.acompute_readability(_sentences, limiter)
+
+        results = await self._arun_pending([(self._sentence_text(_sentence),) for _sentence in sentences],
+                                           score_batch, self.batch_size,
+                                           f'Evaluating readability metric using {self._model_name.replace("/", "_")}',
+                                           limiter)
+        return self._store_metrics(sentences, results)
+
+    def _store_metrics(self, sentences, results):
         for idx, s in enumerate(sentences):
             s.metrics[f'readability-llm-{self._model_name.replace("/", "_")}'] = Metric('readability', results[idx])
             s.metrics[f'readability-llm-{self._model_name.replace("/", "_")}'].metadata[f'description'] = \
@@ -1,23 +1,22 @@
 import spacy
 import os
+import asyncio
 import re
 import torch
-import itertools
 import numpy as np
 import torch.nn as nn
-from typing import List, Literal
-from tqdm import tqdm
+from typing import List, Literal, Optional
 from hinteval.cores.evaluation_core import Relevance
 from hinteval.cores.dataset_core import Metric, Instance
 from hinteval.utils.functions.download_manager import SpacyDownloader, RelevanceNonContextualDownloader, \
     RelevanceContextualDownloader
 from hinteval.utils.relevance.relevance_fixed import Batch, UnknownWordVecCache
+from hinteval.utils.functions.inference_backend import _SequenceClassifierMixin
 from hinteval.utils.relevance.LiteModel import PairwiseConv, MPCNNLite
 from hinteval.utils.relevance.answer_relevancy.api_based import AnswerRelevancy as AR_API
 from hinteval.utils.relevance.answer_relevancy.local import AnswerRelevancy as AR_LOCAL
 from torch.utils.data import DataLoader
-from datasets import Dataset
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, AutoConfig
+from transformers import AutoTokenizer
 from rouge_score import rouge_scorer
 from datasets.utils.logging import disable_progress_bar
 
@@ -39,6 +38,8 @@ class Rouge(Relevance):
         Step interval for checkpointing.
     enable_tqdm : bool
         Whether the tqdm progress bar is enabled.
+    num_workers : int
+        Number of worker processes that score the inputs.
 
     References
     ----------
@@ -52,8 +53,12 @@ class Rouge(Relevance):
 
     """
 
+    _key_params = ('_model',)
+
+    _process_safe = True
+
     def __init__(self, model: Literal['rouge1', 'rouge2', 'rougeL'] = 'rouge1', checkpoint: bool = False,
-                 checkpoint_step: int = 1, enable_tqdm: bool = False):
+                 checkpoint_step: int = 1, enable_tqdm: bool = False, num_workers: int = 1):
         """
         Initializes the Rouge class with the specified ROUGE model `[4]`_ .
 
@@ -69,6 +74,10 @@ class Rouge(Relevance):
             Step interval for checkpointing. Note that each step corresponds to one batch.
         enable_tqdm : bool, default False
             Whether to enable tqdm progress bar.
+        num_workers : int, default 1
+            Number of worker processes that score the inputs in parallel. The inputs are split into shards that are
+            checkpointed one by one. The workers are only forked from the main thread of a process without CUDA;
+            otherwise, the inputs are scored in the calling thread and a warning is issued.
 
         Examples
         --------
@@ -79,7 +88,7 @@ class Rouge(Relevance):
         Raises
         ------
         ValueError
-            If the provided model name is not valid.
+            If the provided model name is not valid, or the number of workers is not positive.
 
         References
         ----------
@@ -93,7 +102,7 @@ class Rouge(Relevance):
 
         """
 
-        super().__init__(checkpoint, checkpoint_step, enable_tqdm)
+        super().__init__(checkpoint, checkpoint_step, enable_tqdm, num_workers)
         if model not in ['rouge1', 'rouge2', 'rougeL']:
             raise ValueError(
                 f'Invalid model name: "{model}".\n'
@@ -171,41 +180,20 @@ class Rouge(Relevance):
         """
 
         self._validate_input(instances)
+        view = self._hint_view(instances)
 
-        questions = []
-        hints = []
-        for instance in instances:
-            questions.extend([instance.question] * len(instance.hints))
-            hints.extend(instance.hints)
-        question_hint = list(zip(questions, hints))
+        def score_batches(pending):
+            for question, hint in pending:
+                scores = self._scorer.score(question, hint)
+                yield [scores[self._model].fmeasure]
 
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        question_hint_stream = tqdm(question_hint, total=len(question_hint),
-                                    desc=f'Evaluating relevance metric using {self._model}') if self.enable_tqdm else question_hint
-        for question, hint in question_hint_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self._batch_size
-            if _idx <= final_step:
-                continue
-
-            scores = self._scorer.score(question.question, hint.hint)
-            results.append(scores[self._model].fmeasure)
-
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    question_hint_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
+        results = self._run_pending(view.question_hint_pairs(), score_batches, self._batch_size,
+                                    f'Evaluating relevance metric using {self._model}', resume=kwargs.get('_resume'))
 
         results = [round(res, 3) for res in results]
-        for idx, qh in enumerate(question_hint):
-            qh[1].metrics[f'relevance-{self._model}'] = Metric('relevance', results[idx])
-        final_results = []
-        for instance in instances:
-            num_of_hint = len(instance.hints)
-            final_results.append([results.pop(0) for _ in range(num_of_hint)])
-        return final_results
+        for idx, h in enumerate(view.hints):
+            h.metrics[f'relevance-{self._model}'] = Metric('relevance', results[idx])
+        return view.scatter(results)
 
 
 class NonContextualEmbeddings(Relevance):
@@ -239,6 +227,8 @@ class NonContextualEmbeddings(Relevance):
 
     """
 
+    _key_params = ('_glove_version', '_spacy_pipeline')
+
     def __init__(self, glove_version: Literal['glove.6B', 'glove.42B'] = 'glove.6B', spacy_pipeline: Literal[
         'en_core_web_sm', 'en_core_web_lg', 'en_core_web_md', 'en_core_web_trf'] = 'en_core_web_sm',
                  batch_size: int = 256, checkpoint: bool = False, checkpoint_step: int = 1, force_download=False,
@@ -303,7 +293,7 @@ class NonContextualEmbeddings(Relevance):
         self._sigmoid = nn.Sigmoid()
 
         SpacyDownloader.download(spacy_pipeline)
-        self._stop_words = spacy.load(spacy_pipeline).Defaults.stop_words
+        self._stop_words = self._acquire(('spacy', spacy_pipeline), lambda: spacy.load(spacy_pipeline)).Defaults.stop_words
         self._batch = Batch(self._stop_words, self._device, glove_version, force_download, UnknownWordVecCache.unk)
         RelevanceNonContextualDownloader.download(force_download)
         embedding = nn.Embedding(59253, 300)
@@ -378,54 +368,34 @@ class NonContextualEmbeddings(Relevance):
         """
 
         self._validate_input(instances)
-        questions = []
-        hints = []
-        for instance in instances:
-            questions.extend([instance.question] * len(instance.hints))
-            hints.extend(instance.hints)
-
-        sentences_1 = [question.question for question in questions]
-        sentences_2 = [hint.hint for hint in hints]
-
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        data_loader = self._batch.get_iterator(sentences_1, sentences_2, batch_size=self.batch_size)
-        data_loader_stream = tqdm(data_loader, total=len(data_loader),
-                                  desc=f'Evaluating relevance metric using {self._glove_version}') if self.enable_tqdm else data_loader
-        for batch in data_loader_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self.batch_size
-            if _idx <= final_step:
-                continue
-
-            scores = self._model.convModel(batch.sentence_1, batch.sentence_2, batch.ext_feats)
-            scores = self._model.linearLayer(scores)
-            scores = self._sigmoid(scores)
-            score_array = scores.cpu().data.numpy().reshape(-1).tolist()
-            results.extend(score_array)
-            del scores
-
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    data_loader_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
+        view = self._hint_view(instances)
+
+        def score_batches(pending):
+            pending_1, pending_2 = zip(*pending)
+            data_loader = self._batch.get_iterator(list(pending_1), list(pending_2), batch_size=self.batch_size)
+            for batch in data_loader:
+                scores = self._model.convModel(batch.sentence_1, batch.sentence_2, batch.ext_feats)
+                scores = self._model.linearLayer(scores)
+                scores = self._sigmoid(scores)
+                score_array = scores.cpu().data.numpy().reshape(-1).tolist()
+                del scores
+                yield score_array
+
+        results = self._run_pending(view.question_hint_pairs(), score_batches, self.batch_size,
+                                    f'Evaluating relevance metric using {self._glove_version}',
+                                    resume=kwargs.get('_resume'))
 
         results = [round(res, 3) for res in results]
-        for idx, h in enumerate(hints):
+        for idx, h in enumerate(view.hints):
             glove_version = re.search(r'\d+B', self._glove_version).group()
             spacy_pipeline = re.search(r'web_(\w+)$', self._spacy_pipeline).group(1)
             metadata = {'glove_version': f'{self._glove_version}.300d', 'spacy_pipeline': self._spacy_pipeline}
             h.metrics[f'relevance-non-contextual-{glove_version}-{spacy_pipeline}'] = Metric('relevance', results[idx],
                                                                                              metadata=metadata)
-        final_results = []
-        for instance in instances:
-            num_of_hint = len(instance.hints)
-            final_results.append([results.pop(0) for _ in range(num_of_hint)])
-        return final_results
+        return view.scatter(results)
 
 
-class ContextualEmbeddings(Relevance):
+class ContextualEmbeddings(_SequenceClassifierMixin, Relevance):
     """
     Class for evaluating relevance between question and hints using contextual embeddings such as BERT and RoBERTa models `[9]`_.
 
@@ -441,6 +411,12 @@ class ContextualEmbeddings(Relevance):
         Step interval for checkpointing.
     enable_tqdm : bool
         Whether the tqdm progress bar is enabled.
+    max_tokens_per_batch : int
+        Maximum number of tokens in a padded batch, or None if batches hold `batch_size` inputs.
+    backend : str
+        Inference backend of the classifier.
+    quantize : str
+        Quantization of the linear layers of the classifier, or None if its fp32 weights are used.
 
     References
     ----------
@@ -454,8 +430,16 @@ class ContextualEmbeddings(Relevance):
 
     """
 
+    _key_params = ('_model_name', 'quantize')
+
+    # Pairs are truncated to the 512 tokens of the model, not to 128 tokens.
+    _max_length = None
+
     def __init__(self, model_name: Literal['bert-base', 'roberta-large'] = 'bert-base', batch_size: int = 256,
-                 checkpoint: bool = False, checkpoint_step: int = 1, force_download=False, enable_tqdm=False):
+                 checkpoint: bool = False, checkpoint_step: int = 1, force_download=False, enable_tqdm=False,
+                 max_tokens_per_batch: Optional[int] = None,
+                 backend: Literal['pytorch', 'torchscript', 'onnx'] = 'pytorch',
+                 quantize: Optional[Literal['int8']] = None):
         """
         Initializes the ContextualEmbeddings class with the specified model name `[10]`_.
 
@@ -475,11 +459,29 @@ class ContextualEmbeddings(Relevance):
             Whether to force download of models.
         enable_tqdm : bool, default False
             Whether to enable tqdm progress bar.
+        max_tokens_per_batch : int, optional
+            Maximum number of tokens in a padded batch, i.e., its number of inputs times the length of its longest
+            input. If given, inputs of similar length are packed into batches up to this budget instead of
+            `batch_size` inputs, so one setting fits both short hints and long inputs; `batch_size` then only sets how
+            often scores are checkpointed. Batches that run out of memory are split and retried in any case.
+        backend : {'pytorch', 'torchscript', 'onnx'}, default 'pytorch'
+            The inference backend. 'torchscript' and 'onnx' export the downloaded checkpoint once into a graph that
+            is stored next to it and run the graph on the CPU with TorchScript or ONNX Runtime, which is usually faster
+            than PyTorch on machines without a GPU. The scores match those of 'pytorch' up to floating-point error.
+            'onnx' requires the `onnxruntime` package.
+        quantize : {'int8'}, optional
+            If 'int8', the weights of the linear layers are quantized dynamically to int8 when the model is loaded,
+            which makes the model several times smaller and usually about twice as fast on the CPU, at a small cost in
+            accuracy. The quantized weights are stored next to the checkpoint, and the model runs on the CPU. Use
+            :meth:`quantization_report` to compare the quantized model with the fp32 one on your data. With the 'onnx'
+            backend, quantization requires the `onnx` package.
 
         Raises
         ------
         ValueError
-            If the provided model name is not valid.
+            If the provided model name, backend, or quantization is not valid.
+        ImportError
+            If the 'onnx' backend is used and ONNX Runtime is not installed.
         Exception
             If downloading of models fails.
 
@@ -504,15 +506,22 @@ class ContextualEmbeddings(Relevance):
 
         super().__init__(checkpoint, checkpoint_step, enable_tqdm)
         self._model_name = model_name
-        self._device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self._set_backend(backend, quantize)
         self.batch_size = batch_size
+        if max_tokens_per_batch is not None and max_tokens_per_batch < 1:
+            raise ValueError(
+                f'Invalid maximum number of tokens per batch: "{max_tokens_per_batch}". It must be a positive integer.')
+        self.max_tokens_per_batch = max_tokens_per_batch
+        if model_name == 'bert-base':
+            self._columns = ['input_ids', 'token_type_ids', 'attention_mask']
+        else:
+            self._columns = ['input_ids', 'attention_mask']
         self._file_name = f'relevance_contextual_{model_name}.pickle'
         RelevanceContextualDownloader.download(model_name, force_download)
         model_dir = os.path.join(os.environ['HINTEVAL_CACHE_DIR'], 'relevance-contextual', self._model_name)
-        self._config = AutoConfig.from_pretrained(model_dir, num_labels=2)
-        self._model = AutoModelForSequenceClassification.from_pretrained(model_dir, config=self._config)
-        self._tokenizer = AutoTokenizer.from_pretrained(model_dir, do_lower_case=True)
-        self._model.to(self._device)
+        self._load_classifier(model_dir, 2)
+        self._tokenizer = self._acquire(('tokenizer', model_dir),
+                                        lambda: AutoTokenizer.from_pretrained(model_dir, do_lower_case=True))
 
     @staticmethod
     def _softmax(logits):
@@ -520,9 +529,6 @@ class ContextualEmbeddings(Relevance):
         logits_sum = np.sum(exp_logits, axis=1)
         return exp_logits / logits_sum[:, np.newaxis]
 
-    def _tokenize_function(self, examples):
-        return self._tokenizer(examples['question'], examples['answer'], padding='max_length', truncation=True)
-
     def evaluate(self, instances: List[Instance], **kwargs) -> List[List[float]]:
         """
         Evaluates the relevance of the question and hints of the given instances using large language models `[11]`_.
@@ -585,61 +591,29 @@ class ContextualEmbeddings(Relevance):
         """
 
         self._validate_input(instances)
-        questions = []
-        hints = []
-        for instance in instances:
-            questions.extend([instance.question] * len(instance.hints))
-            hints.extend(instance.hints)
-
-        data = {
-            'question': [question.question for question in questions],
-            'answer': [hint.hint for hint in hints]
-        }
-
-        _dataset = Dataset.from_dict(data)
-        tokenized_dataset = _dataset.map(self._tokenize_function, batched=True)
-        if self._model_name == 'bert-base':
-            columns = ['input_ids', 'token_type_ids', 'attention_mask']
-        else:
-            columns = ['input_ids', 'attention_mask']
-
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        tokenized_dataset.set_format(type='torch', columns=columns)
-        data_loader = torch.utils.data.DataLoader(tokenized_dataset, batch_size=self.batch_size)
-        data_loader_stream = tqdm(data_loader, total=len(data_loader),
-                                  desc=f'Evaluating relevance metric using {self._model_name}') if self.enable_tqdm else data_loader
-
-        for batch in data_loader_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self.batch_size
-            if _idx <= final_step:
-                continue
+        view = self._hint_view(instances)
 
-            self._model.eval()
+        def predict(batch):
             batch = {k: v.to(self._device) for k, v in batch.items()}
             with torch.no_grad():
                 outputs = self._model(**batch)
                 logits = outputs.logits
                 preds = logits.detach().cpu().numpy()
                 probabilities = self._softmax(preds)
-                score_array = probabilities[:, 0].reshape(-1).tolist()
-                results.extend(score_array)
+                return probabilities[:, 0].reshape(-1).tolist()
+
+        def score_batches(pending):
+            self._model.eval()
+            yield from self._padded_batches(pending, predict)
 
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    data_loader_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
+        results = self._run_pending(view.question_hint_pairs(), score_batches, self.batch_size,
+                                    f'Evaluating relevance metric using {self._model_name}',
+                                    resume=kwargs.get('_resume'))
 
         results = [round(res, 3) for res in results]
-        for idx, h in enumerate(hints):
+        for idx, h in enumerate(view.hints):
             h.metrics[f'relevance-contextual-{self._model_name}'] = Metric('relevance', results[idx])
-        final_results = []
-        for instance in instances:
-            num_of_hint = len(instance.hints)
-            final_results.append([results.pop(0) for _ in range(num_of_hint)])
-        return final_results
+        return view.scatter(results)
 
 
 class LlmBased(Relevance):
@@ -670,6 +644,8 @@ class LlmBased(Relevance):
     :class:`ContextualEmbeddings` : Class for evaluating relevance between question and hints using contextual embeddings such as BERT and RoBERTa models.
     """
 
+    _key_params = ('_model_name', '_base_url')
+
     def __init__(self, model_name: str,
                  api_key: str = None,
                  base_url: str = 'https://api.together.xyz/v1',
@@ -807,33 +783,80 @@ class LlmBased(Relevance):
             hs = [h.hint for h in instance.hints]
             pairs.append((q, hs))
 
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        question_answer_pairs_stream = tqdm(pairs, total=len(pairs),
-                                            desc=f'Evaluating relevance metric using {self._model_name.replace("/", "_")}') if self.enable_tqdm else pairs
-        for question, hints in question_answer_pairs_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self._batch_size
-            if _idx <= final_step:
-                continue
-            scores = self._evaluator.compute_relevancy(question, hints)
-            results.append(scores)
-
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    question_answer_pairs_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
-
-        results = [result for result in results]
-        new_results = []
-        [new_results.extend(result) for result in results]
-        hints = []
-        [hints.extend(instance.hints) for instance in instances]
-        for idx, h in enumerate(hints):
+        def score_batches(pending):
+            for question, hints in pending:
+                yield [self._evaluator.compute_relevancy(question, hints)]
+
+        results = self._run_pending(pairs, score_batches, self._batch_size,
+                                    f'Evaluating relevance metric using {self._model_name.replace("/", "_")}',
+                                    resume=kwargs.get('_resume'))
+        return self._store_metrics(instances, results)
+
+    async def aevaluate(self, instances: List[Instance], limiter: Optional[asyncio.Semaphore] = None,
+                        **kwargs) -> List[List[float]]:
+        """
+        Evaluates the relevance of the question and hints of the given instances on the running event loop, without
+        blocking it.
+
+        Parameters
+        ----------
+        instances : List[Instance]
+            List of instances to evaluate.
+        limiter : asyncio.Semaphore, optional
+            A semaphore shared by the evaluators and models that run on the same event loop. Every instance holds it
+            while its hints are scored, so it bounds the concurrency of all of them together. If given, all
+            instances are started at once; if None, the instances are evaluated one after another.
+        **kwargs
+            Additional keyword arguments.
+
+        Returns
+        -------
+        List[List[float]]
+            List of relevance scores for each instance.
+
+        Notes
+        -----
+        This function stores the scores exactly as :meth:`evaluate` does, and uses the same checkpoints and cached
+        scores. The scoring of each instance runs in a separate thread.
+
+        Examples
+        --------
+        >>> import asyncio
+        >>> from hinteval.cores import Instance, Question, Hint, Answer
+        >>> from hinteval.evaluation.relevance import LlmBased
+        >>>
+        >>> llm = LlmBased(model_name='meta-llama/Meta-Llama-3.1-70B-Instruct-Turbo', api_key='your_api_key')
+        >>> instance = Instance(
+        ...    question=Question('What is the capital of Austria?'),
+        ...    answers=[Answer('Vienna')],
+        ...    hints=[Hint('This city, once home to Mozart and Beethoven.'),
+        ...           Hint('This city is the best city for life in 2024.')])
+        >>> results = asyncio.run(llm.aevaluate([instance], limiter=asyncio.Semaphore(8)))
+        >>> print(results)
+        # [[1.00, 0.81]]
+
+        See Also
+        --------
+        :meth:`evaluate` : Evaluates the relevance of the question and hints of the given instances.
+        """
+
+        self._validate_input(instances)
+        pairs = [(instance.question.question, [h.hint for h in instance.hints]) for instance in instances]
+
+        async def score_batch(pending, limiter):
+            # The answer relevancy metric only has a blocking interface, with and without an API.
+            return [await self._run_blocking(limiter, self._evaluator.compute_relevancy, question, hints)
+                    for question, hints in pending]
+
+        results = await self._arun_pending(pairs, score_batch, self._batch_size,
+                                           f'Evaluating relevance metric using {self._model_name.replace("/", "_")}',
+                                           limiter)
+        return self._store_metrics(instances, results)
+
+    def _store_metrics(self, instances, results):
+        # Every result already holds the scores of the hints of one instance.
+        view = self._hint_view(instances)
+        new_results = [score for result in results for score in result]
+        for idx, h in enumerate(view.hints):
             h.metrics[f'relevance-llm-{self._model_name.replace("/", "_")}'] = Metric('relevance', new_results[idx])
-        final_results = []
-        for instance in instances:
-            num_of_hint = len(instance.hints)
-            final_results.append([new_results.pop(0) for _ in range(num_of_hint)])
-        return final_results
+        return view.scatter(new_results)
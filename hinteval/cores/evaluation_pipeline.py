@@ -0,0 +1,185 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Literal, Union
+from hinteval.cores.evaluation_core import _Evaluation, _ValidatedInputs, Readability, Familiarity, _run_token_cache
+from hinteval.utils.functions.spacy_docs import SpacyDocCache
+from hinteval.cores.dataset_core import Instance, FlatHintView
+
+
+class EvaluationPipeline:
+    """
+    Class for evaluating instances with several evaluators in one pass.
+
+    The pipeline validates and flattens the instances once and passes the same inputs to all the evaluators. While it
+    runs, the evaluators also share the spaCy documents they parse and the inputs they tokenize, so that a text is
+    parsed or tokenized once per run, even when the on-disk and document caches are disabled. With
+    `num_threads` above 1, it runs the evaluators concurrently, so that evaluators bound by models or APIs overlap with
+    evaluators bound by the CPU.
+
+    Attributes
+    ----------
+    evaluators : List[_Evaluation]
+        The evaluators of the pipeline.
+    sentences : List[Literal['question', 'hint', 'answer']]
+        The sentences of the instances that are evaluated by sentence-level evaluators.
+    num_threads : int
+        The maximum number of evaluators that run at the same time.
+
+    See Also
+    --------
+    :class:`hinteval.cores.evaluation_metrics.relevance.Rouge` : Class for evaluating relevance between question and hints using ROUGE metrics.
+    :class:`hinteval.cores.evaluation_metrics.readability.TraditionalIndexes` : Class for evaluating readability of questions and hints using traditional indexes.
+    """
+
+    def __init__(self, evaluators: List[_Evaluation],
+                 sentences: List[Literal['question', 'hint', 'answer']] = None,
+                 num_threads: int = 1):
+        """
+        Initializes the EvaluationPipeline class with the specified evaluators.
+
+        Parameters
+        ----------
+        evaluators : List[_Evaluation]
+            The evaluators to run, such as :class:`Rouge`, :class:`ContextualEmbeddings`, :class:`Specificity`,
+            :class:`TraditionalIndexes`, or :class:`Lexical`.
+        sentences : List[Literal['question', 'hint', 'answer']], optional
+            The sentences of the instances that are evaluated by readability and familiarity evaluators. Answers are
+            only evaluated by familiarity evaluators. If None, questions and hints are evaluated.
+        num_threads : int, default 1
+            The maximum number of evaluators that run at the same time. By default, they run one after another; with
+            more threads, evaluators bound by models or APIs overlap with evaluators bound by the CPU. Evaluators that
+            score in several processes, i.e., with `num_workers` above 1, can only run one after another.
+
+        Examples
+        --------
+        >>> from hinteval.evaluation.pipeline import EvaluationPipeline
+        >>> from hinteval.evaluation.relevance import Rouge
+        >>> from hinteval.evaluation.readability import TraditionalIndexes
+        >>>
+        >>> pipeline = EvaluationPipeline([Rouge(model='rouge1'), TraditionalIndexes(method='flesch_kincaid_reading_ease')],
+        ...                               sentences=['question', 'hint'], num_threads=2)
+
+        Raises
+        ------
+        ValueError
+            If no evaluator is given, an evaluator is not an evaluation metric, a sentence type is not valid, the
+            number of threads is not positive, or an evaluator with several workers would run in a thread.
+        """
+
+        if len(evaluators) == 0:
+            raise ValueError('At least one evaluator is required to build an evaluation pipeline.')
+        for evaluator in evaluators:
+            if not isinstance(evaluator, _Evaluation):
+                raise ValueError(f'Invalid evaluator: "{evaluator}". Evaluators must be evaluation metrics such as '
+                                 f'Rouge, TraditionalIndexes, or Lexical.')
+        if sentences is None:
+            sentences = ['question', 'hint']
+        for sentence in sentences:
+            if sentence not in ['question', 'hint', 'answer']:
+                raise ValueError(f'Invalid sentence: "{sentence}". Valid sentences are: question, hint, answer.')
+        if num_threads < 1:
+            raise ValueError(f'Invalid number of threads: "{num_threads}". It must be a positive integer.')
+        if num_threads > 1:
+            for evaluator in evaluators:
+                # Worker processes must not be started from a thread of a process with loaded models.
+                if evaluator.num_workers > 1:
+                    raise ValueError(f'Invalid number of threads: "{num_threads}". It must be 1 when an evaluator '
+                                     f'has several workers, such as {type(evaluator).__name__} with '
+                                     f'{evaluator.num_workers} workers.')
+        self.evaluators = list(evaluators)
+        self.sentences = list(sentences)
+        self.num_threads = num_threads
+
+    def _flatten(self, instances, with_answers):
+        sentences = []
+        for instance in instances:
+            if 'question' in self.sentences:
+                sentences.append(instance.question)
+            if 'hint' in self.sentences:
+                sentences.extend(instance.hints)
+            if 'answer' in self.sentences and with_answers:
+                sentences.extend(instance.answers)
+        return _ValidatedInputs(sentences)
+
+    def evaluate(self, instances: Union[List[Instance], FlatHintView], **kwargs) -> List[list]:
+        """
+        Evaluates the given instances with all the evaluators of the pipeline.
+
+        Parameters
+        ----------
+        instances : Union[List[Instance], FlatHintView]
+            List of instances to evaluate, or a :class:`FlatHintView` of them that was built before.
+        **kwargs
+            Additional keyword arguments, passed to the `evaluate` method of every evaluator.
+
+        Returns
+        -------
+        List[list]
+            The results of the evaluators, in the order of the evaluators. Instance-level evaluators return a list of
+            scores per instance and sentence-level evaluators return a score per evaluated sentence.
+
+        Raises
+        ------
+        ValueError
+            If the instances are not valid for one of the evaluators. The inputs are validated for all the evaluators
+            before any of them starts.
+
+        Notes
+        ----------
+        Every evaluator stores its scores as :class:`Metric` objects within the `metrics` attribute of the evaluated
+        questions, hints, and answers, exactly as when its own `evaluate` method is called.
+
+        Examples
+        --------
+        >>> from hinteval.cores import Instance, Question, Hint, Answer
+        >>> from hinteval.evaluation.pipeline import EvaluationPipeline
+        >>> from hinteval.evaluation.relevance import Rouge
+        >>> from hinteval.evaluation.readability import TraditionalIndexes
+        >>>
+        >>> pipeline = EvaluationPipeline([Rouge(model='rouge1'), TraditionalIndexes(method='flesch_kincaid_reading_ease')])
+        >>> instance = Instance(
+        ...     question=Question('What is the capital of Austria?'),
+        ...     answers=[Answer('Vienna')],
+        ...     hints=[Hint('This city, once home to Mozart and Beethoven.'),
+        ...            Hint('This city is the best city for life in 2024.')])
+        >>> rouge_results, readability_results = pipeline.evaluate([instance])
+        >>> print(rouge_results)
+        # [[0.0, 0.25]]
+        >>> print(sorted(instance.hints[0].metrics.keys()))
+        # ['readability-flesch_kincaid_reading_ease-sm', 'relevance-rouge1']
+        """
+
+        view = instances if isinstance(instances, FlatHintView) else None
+        instances = _ValidatedInputs(instances)
+        if not all(isinstance(instance, Instance) for instance in instances):
+            raise ValueError('All items for evaluating with a pipeline must be instances of the Instance class.')
+        # Instance-level evaluators share one flat view of the hints instead of flattening them one by one.
+        instances.hint_view = FlatHintView(instances) if view is None else view
+        sentences = self._flatten(instances, with_answers=True)
+        sentences_without_answers = self._flatten(instances, with_answers=False)
+
+        inputs = []
+        validated = set()
+        for evaluator in self.evaluators:
+            if isinstance(evaluator, Readability):
+                evaluator_inputs = sentences_without_answers
+            elif isinstance(evaluator, Familiarity):
+                evaluator_inputs = sentences
+            else:
+                evaluator_inputs = instances
+            # Evaluators with the same configuration share the same requirements, e.g., the same model twice.
+            params = evaluator._params_key()
+            if params not in validated:
+                evaluator._validate_input(list(evaluator_inputs))
+                validated.add(params)
+            inputs.append(evaluator_inputs)
+
+        with SpacyDocCache.run_scope(), _run_token_cache():
+            if self.num_threads == 1:
+                return [evaluator.evaluate(evaluator_inputs, **kwargs) for evaluator, evaluator_inputs in
+                        zip(self.evaluators, inputs)]
+            with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+                # Every thread runs in a copy of this context, which holds the documents and tokens of the run.
+                futures = [executor.submit(contextvars.copy_context().run, evaluator.evaluate, evaluator_inputs,
+                                           **kwargs) for evaluator, evaluator_inputs in zip(self.evaluators, inputs)]
+                return [future.result() for future in futures]
@@ -1,6 +1,4 @@
-import itertools
 import asyncio
-import transformers
 from hinteval.cores.model_core import Model
 from hinteval.cores.dataset_core import Instance
 from hinteval.utils.model.answer_aware.api_based import Hint_Generation as Hint_Generation_Aware_API
@@ -8,8 +6,8 @@ from hinteval.utils.model.answer_aware.local import Hint_Generation as Hint_Gene
 from hinteval.utils.model.answer_agnostic.api_based import Hint_Generation as Hint_Generation_Agnostic_API
 from hinteval.utils.model.answer_agnostic.local import Hint_Generation as Hint_Generation_Agnostic_Local
 from hinteval.utils.model.hint_filtering import Hint_Filtering
-from typing import List, Callable
-from tqdm import tqdm
+from hinteval.utils.functions.text_generation import load_text_generation_pipeline
+from typing import List, Callable, Optional
 from datasets.utils.logging import disable_progress_bar
 
 disable_progress_bar()
@@ -39,6 +37,9 @@ class AnswerAware(Model):
     :class:`AnswerAgnostic` : Class for automatically generating hints for questions that are unaware of their answers.
     """
 
+    _key_params = ('_model_name', '_base_url', '_num_of_hints', '_parse_llm_response', '_temperature', '_top_p',
+                   '_max_tokens')
+
     def __init__(self, model_name: str,
                  api_key: str = None,
                  base_url: str = 'https://api.together.xyz/v1',
@@ -131,13 +132,8 @@ class AnswerAware(Model):
         self._hint_filtering = Hint_Filtering()
 
         if self._api_key is None:
-            self._pipeline = transformers.pipeline(
-                "text-generation",
-                model=self._model_name,
-                device_map="auto"
-            )
-            self._pipeline.tokenizer.pad_token = self._pipeline.tokenizer.eos_token
-            self._pipeline.tokenizer.pad_token_id = self._pipeline.tokenizer.eos_token_id
+            self._pipeline = self._acquire(('text-generation', self._model_name),
+                                           lambda: load_text_generation_pipeline(self._model_name))
 
             self._hint_generator = Hint_Generation_Aware_Local(self._pipeline, self._num_of_hints, self._parse_llm_response,
                                                          self._temperature, self._top_p, self._max_tokens)
@@ -211,31 +207,82 @@ class AnswerAware(Model):
             q = instance.question.question
             a = instance.answers[0].answer
             pairs.append((q, a))
-        pairs_batches = [pairs[i:i + self.batch_size] for i in range(0, len(pairs), self.batch_size)]
-
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        question_answer_pairs_stream = tqdm(pairs_batches, total=len(pairs_batches),
-                                            desc=f'Generating hints using {self._model_name}') if self.enable_tqdm else pairs_batches
-        for pairs_batch in question_answer_pairs_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self.batch_size
-            if _idx <= final_step:
-                continue
+
+        def generate_batches(pending):
+            for i in range(0, len(pending), self.batch_size):
+                pairs_batch = pending[i:i + self.batch_size]
+                if self._api_key is None:
+                    generated_hints = self._hint_generator.generate(pairs_batch)
+                else:
+                    generated_hints = asyncio.run(self._hint_generator.generate(pairs_batch))
+                yield [self._hint_filtering.filtering(generated_hints[pair_idx]) for pair_idx in range(len(pairs_batch))]
+
+        results = self._run_pending(pairs, generate_batches, self.batch_size, f'Generating hints using {self._model_name}')
+
+        for idx, instance in enumerate(instances):
+            instance.hints_from_strings(results[idx])
+        return results
+
+    async def agenerate(self, instances: List[Instance], limiter: Optional[asyncio.Semaphore] = None,
+                        **kwargs) -> List[List[str]]:
+        """
+        Generates hints for a list of instances on the running event loop, without blocking it.
+
+        Parameters
+        ----------
+        instances : List[Instance]
+            A list of instances, where each instance contains a question and its corresponding answer.
+        limiter : asyncio.Semaphore, optional
+            A semaphore shared by the evaluators and models that run on the same event loop. Every API request, or
+            every batch of a local model, holds it while it runs, so it bounds the concurrency of all of them together.
+            If given, all batches are started at once; if None, the batches are generated one after another.
+        **kwargs
+            Additional keyword arguments.
+
+        Returns
+        -------
+        List[List[str]]
+            A list of lists containing generated hints for each instance.
+
+        Notes
+        -----
+        This function stores the generated hints exactly as :meth:`generate` does, and uses the same checkpoints.
+        Local models run in a separate thread.
+
+        Examples
+        --------
+        >>> import asyncio
+        >>> from hinteval.cores import Instance, Question, Answer
+        >>> from hinteval.model import AnswerAware
+        >>>
+        >>> answer_aware = AnswerAware(model_name='meta-llama/Meta-Llama-3.1-70B-Instruct-Turbo',
+        ...                           api_key='your_api_key',
+        ...                           base_url='base_url',
+        ...                           num_of_hints=2)
+        >>> instances = [Instance(question=Question('What is the capital of Austria?'),
+        ...                       answers=[Answer('Vienna')], hints=[])]
+        >>> results = asyncio.run(answer_aware.agenerate(instances, limiter=asyncio.Semaphore(8)))
+        >>> print(results)
+        # [['The city is celebrated for its cultural landmarks like palaces and museums.',
+        #   'It is historically significant, located near the Danube River.']]
+
+        See Also
+        --------
+        :meth:`generate` : Generates hints for a list of instances.
+        """
+
+        self._validate_input(instances)
+        pairs = [(instance.question.question, instance.answers[0].answer) for instance in instances]
+
+        async def generate_batch(pairs_batch, limiter):
             if self._api_key is None:
-                generated_hints = self._hint_generator.generate(pairs_batch)
+                generated_hints = await self._run_blocking(limiter, self._hint_generator.generate, pairs_batch)
             else:
-                generated_hints = asyncio.run(self._hint_generator.generate(pairs_batch))
-            for pair_idx, pair in enumerate(pairs_batch):
-                hints = generated_hints[pair_idx]
-                cleared_hints = self._hint_filtering.filtering(hints)
-                results.append(cleared_hints)
+                generated_hints = await self._hint_generator.generate(pairs_batch, limiter)
+            return [self._hint_filtering.filtering(generated_hints[pair_idx]) for pair_idx in range(len(pairs_batch))]
 
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    question_answer_pairs_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
+        results = await self._arun_pending(pairs, generate_batch, self.batch_size,
+                                           f'Generating hints using {self._model_name}', limiter)
 
         for idx, instance in enumerate(instances):
             instance.hints_from_strings(results[idx])
@@ -266,6 +313,9 @@ class AnswerAgnostic(Model):
     :class:`AnswerAware` : Class for automatically generating hints for questions that are aware of their answers.
     """
 
+    _key_params = ('_model_name', '_base_url', '_num_of_hints', '_parse_llm_response', '_temperature', '_top_p',
+                   '_max_tokens')
+
     def __init__(self, model_name: str,
                  api_key: str = None,
                  base_url: str = 'https://api.together.xyz/v1',
@@ -358,13 +408,8 @@ class AnswerAgnostic(Model):
         self._hint_filtering = Hint_Filtering()
 
         if self._api_key is None:
-            self._pipeline = transformers.pipeline(
-                "text-generation",
-                model=self._model_name,
-                device_map="auto"
-            )
-            self._pipeline.tokenizer.pad_token = self._pipeline.tokenizer.eos_token
-            self._pipeline.tokenizer.pad_token_id = self._pipeline.tokenizer.eos_token_id
+            self._pipeline = self._acquire(('text-generation', self._model_name),
+                                           lambda: load_text_generation_pipeline(self._model_name))
 
             self._hint_generator = Hint_Generation_Agnostic_Local(self._pipeline, self._num_of_hints, self._parse_llm_response,
                                                          self._temperature, self._top_p, self._max_tokens)
@@ -433,32 +478,83 @@ class AnswerAgnostic(Model):
         pairs = []
         for idx, instance in enumerate(instances):
             q = instance.question.question
-            pairs.append(q)
-        pairs_batches = [pairs[i:i + self.batch_size] for i in range(0, len(pairs), self.batch_size)]
-
-        checkpoint_content = self._load_content_checkpoint()
-        results = [] if checkpoint_content is None else checkpoint_content['results']
-        item_counter = itertools.count(1)
-
-        question_answer_pairs_stream = tqdm(pairs_batches, total=len(pairs_batches),
-                                            desc=f'Generating hints using {self._model_name}') if self.enable_tqdm else pairs_batches
-        for pairs_batch in question_answer_pairs_stream:
-            _idx = next(item_counter)
-            final_step = len(results) // self.batch_size
-            if _idx <= final_step:
-                continue
+            pairs.append((q,))
+
+        def generate_batches(pending):
+            for i in range(0, len(pending), self.batch_size):
+                pairs_batch = [q for q, in pending[i:i + self.batch_size]]
+                if self._api_key is None:
+                    generated_hints = self._hint_generator.generate(pairs_batch)
+                else:
+                    generated_hints = asyncio.run(self._hint_generator.generate(pairs_batch))
+                yield [self._hint_filtering.filtering(generated_hints[pair_idx]) for pair_idx in range(len(pairs_batch))]
+
+        results = self._run_pending(pairs, generate_batches, self.batch_size, f'Generating hints using {self._model_name}')
+
+        for idx, instance in enumerate(instances):
+            instance.hints_from_strings(results[idx])
+        return results
+
+    async def agenerate(self, instances: List[Instance], limiter: Optional[asyncio.Semaphore] = None,
+                        **kwargs) -> List[List[str]]:
+        """
+        Generates hints for a list of instances on the running event loop, without blocking it.
+
+        Parameters
+        ----------
+        instances : List[Instance]
+            A list of instances, where each instance contains a question.
+        limiter : asyncio.Semaphore, optional
+            A semaphore shared by the evaluators and models that run on the same event loop. Every API request, or
+            every batch of a local model, holds it while it runs, so it bounds the concurrency of all of them together.
+            If given, all batches are started at once; if None, the batches are generated one after another.
+        **kwargs
+            Additional keyword arguments.
+
+        Returns
+        -------
+        List[List[str]]
+            A list of lists containing generated hints for each instance.
+
+        Notes
+        -----
+        This function stores the generated hints exactly as :meth:`generate` does, and uses the same checkpoints.
+        Local models run in a separate thread.
+
+        Examples
+        --------
+        >>> import asyncio
+        >>> from hinteval.cores import Instance, Question
+        >>> from hinteval.model import AnswerAgnostic
+        >>>
+        >>> answer_agnostic = AnswerAgnostic(model_name='meta-llama/Meta-Llama-3.1-70B-Instruct-Turbo',
+        ...                                 api_key='your_api_key',
+        ...                                 base_url='base_url',
+        ...                                 num_of_hints=2)
+        >>> instances = [Instance(question=Question('What is the capital of Austria?'), answers=[], hints=[])]
+        >>> results = asyncio.run(answer_agnostic.agenerate(instances, limiter=asyncio.Semaphore(8)))
+        >>> print(results)
+        # [['This city is famous for its classical music heritage.',
+        #   'It is located along the Danube River.']]
+
+        See Also
+        --------
+        :meth:`generate` : Generates hints for a list of instances.
+        """
+
+        self._validate_input(instances)
+        pairs = [(instance.question.question,) for instance in instances]
+
+        async def generate_batch(pairs_batch, limiter):
+            pairs_batch = [q for q, in pairs_batch]
             if self._api_key is None:
-                generated_hints = self._hint_generator.generate(pairs_batch)
+                generated_hints = await self._run_blocking(limiter, self._hint_generator.generate, pairs_batch)
             else:
-                generated_hints = asyncio.run(self._hint_generator.generate(pairs_batch))
-            for pair_idx, pair in enumerate(pairs_batch):
-                hints = generated_hints[pair_idx]
-                cleared_hints = self._hint_filtering.filtering(hints)
-                results.append(cleared_hints)
-
-            if (_idx % self.checkpoint_step == 0 or _idx == len(
-                    question_answer_pairs_stream)) and self.checkpoint_path is not None:
-                self._store_checkpoint({'results': results})
+                generated_hints = await self._hint_generator.generate(pairs_batch, limiter)
+            return [self._hint_filtering.filtering(generated_hints[pair_idx]) for pair_idx in range(len(pairs_batch))]
+
+        results = await self._arun_pending(pairs, generate_batch, self.batch_size,
+                                           f'Generating hints using {self._model_name}', limiter)
 
         for idx, instance in enumerate(instances):
             instance.hints_from_strings(results[idx])
@@ -1,17 +1,32 @@
 import gc
 import os
+import asyncio
+import math
 import torch
-import pickle
 from abc import ABC, abstractmethod
-from typing import List
-from hinteval.cores.dataset_core import Instance, Question, Answer
-
+from contextlib import nullcontext
+from tqdm import tqdm
+from typing import List, Callable, Optional
+from hinteval.utils.functions.checkpoint_log import CheckpointLog
+from hinteval.utils.functions.model_registry import ModelRegistry, _release_on_failure
+from hinteval.cores.dataset_core import Instance, Question, Answer, _content_hash
 
 class _Model(ABC):
+    # The attributes that identify the configuration in the keys of the outputs, e.g., the model name or the
+    # temperature. Options that do not change the outputs, such as the batch size, are not among them.
+    _key_params = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if '__init__' in cls.__dict__:
+            cls.__init__ = _release_on_failure(cls.__init__)
+
     def __init__(self, checkpoint, checkpoint_step, enable_tqdm):
         self.enable_tqdm = enable_tqdm
         self.checkpoint_step = checkpoint_step
         self.checkpoint_path = None
+        self._checkpoint_log = None
+        self._registry_keys = []
         if checkpoint:
             if os.environ['HINTEVAL_CHECKPOINT_DIR'] == '':
                 raise ValueError(
@@ -23,6 +38,17 @@ class _Model(ABC):
                 )
             self.checkpoint_path = os.path.abspath(os.environ['HINTEVAL_CHECKPOINT_DIR'])
 
+    def _acquire(self, key, loader):
+        # Models are shared through the registry and released by release_memory.
+        model = ModelRegistry.acquire(key, loader)
+        self._registry_keys.append(key)
+        return model
+
+    def _get_checkpoint_log(self, path):
+        if self._checkpoint_log is None or self._checkpoint_log.path != path:
+            self._checkpoint_log = CheckpointLog(path)
+        return self._checkpoint_log
+
     def _reload_checkpoint(self):
         _CHECKPOINT_DIR = os.environ['HINTEVAL_CHECKPOINT_DIR']
         if os.path.isfile(_CHECKPOINT_DIR):
@@ -35,9 +61,7 @@ class _Model(ABC):
         if not os.path.exists(new_path):
             return dict()
         try:
-            with open(new_path, 'rb') as file:
-                data = pickle.load(file)
-                return data
+            return self._get_checkpoint_log(new_path).read()
         except Exception as e:
             metric_name = self.__class__.__bases__[0].__name__
             raise Exception(
@@ -48,8 +72,7 @@ class _Model(ABC):
         os.makedirs(_CHECKPOINT_DIR, exist_ok=True)
         try:
             new_path = os.path.join(_CHECKPOINT_DIR, self._file_name)
-            with open(new_path, 'wb') as file:
-                pickle.dump(output, file)
+            self._get_checkpoint_log(new_path).append(output)
         except Exception as e:
             metric_name = self.__class__.__bases__[0].__name__
             raise Exception(
@@ -70,11 +93,93 @@ class _Model(ABC):
                 return None
         return None
 
+    def _params_key(self):
+        # Unset options are left out, so an option added later keeps the keys of the outputs computed without it.
+        params = [f'{name}={getattr(self, name)!r}' for name in sorted(self._key_params) if
+                  getattr(self, name) is not None]
+        return _content_hash(type(self).__module__, type(self).__qualname__, *params)
+
+    def _collect_pending(self, inputs):
+        params = self._params_key()
+        keys = [_content_hash(params, *item) for item in inputs]
+        checkpoint_content = self._load_content_checkpoint()
+        outputs = dict() if checkpoint_content is None else checkpoint_content.get('outputs', dict())
+        pending = dict()
+        for key, item in zip(keys, inputs):
+            if key not in outputs:
+                pending.setdefault(key, item)
+        return keys, outputs, pending
+
+    def _run_pending(self, inputs: List[tuple], run_batches: Callable, batch_size: int, desc: str) -> list:
+        keys, outputs, pending = self._collect_pending(inputs)
+        if len(pending) > 0:
+            pending_keys = list(pending.keys())
+            batches = run_batches(list(pending.values()))
+            if self.enable_tqdm:
+                batches = tqdm(batches, total=math.ceil(len(pending_keys) / batch_size), desc=desc)
+            done = 0
+            for step, batch_outputs in enumerate(batches, 1):
+                outputs.update(zip(pending_keys[done:done + len(batch_outputs)], batch_outputs))
+                done += len(batch_outputs)
+                if (step % self.checkpoint_step == 0 or done == len(pending_keys)) and self.checkpoint_path is not None:
+                    self._store_checkpoint({'outputs': outputs})
+        return [outputs[key] for key in keys]
+
+    @staticmethod
+    async def _run_blocking(limiter, function, *args):
+        # Local models block the event loop, so they run in a thread and hold the limiter for the whole batch.
+        async with nullcontext() if limiter is None else limiter:
+            return await asyncio.to_thread(function, *args)
+
+    async def _arun_pending(self, inputs: List[tuple], run_batch: Callable, batch_size: int, desc: str,
+                            limiter: Optional[asyncio.Semaphore] = None) -> list:
+        keys, outputs, pending = self._collect_pending(inputs)
+        if len(pending) > 0:
+            pending_keys = list(pending.keys())
+            pending_items = list(pending.values())
+            starts = range(0, len(pending_items), batch_size)
+
+            async def run(start):
+                return start, await run_batch(pending_items[start:start + batch_size], limiter)
+
+            tasks = []
+            if limiter is None:
+                # Without a shared limiter, batches are generated one after another, as in generate.
+                async def completed():
+                    for start in starts:
+                        yield await run(start)
+            else:
+                # The limiter bounds the requests, so all batches are started at once and overlap.
+                tasks = [asyncio.ensure_future(run(start)) for start in starts]
+
+                async def completed():
+                    for task in asyncio.as_completed(tasks):
+                        yield await task
+            progress = tqdm(total=len(starts), desc=desc) if self.enable_tqdm else None
+            try:
+                step, done = 0, 0
+                async for start, batch_outputs in completed():
+                    step += 1
+                    outputs.update(zip(pending_keys[start:start + len(batch_outputs)], batch_outputs))
+                    done += len(batch_outputs)
+                    if progress is not None:
+                        progress.update(1)
+                    if (step % self.checkpoint_step == 0 or done == len(pending_keys)) and self.checkpoint_path is not None:
+                        self._store_checkpoint({'outputs': outputs})
+            finally:
+                if progress is not None:
+                    progress.close()
+                # A failed batch stops the generation, so the batches still running are not left behind.
+                for task in tasks:
+                    task.cancel()
+        return [outputs[key] for key in keys]
+
     def release_memory(self):
         """
         Releases the memory used by the class instance.
 
-        This method deletes the instance of the class and triggers garbage collection to free up memory.
+        This method deletes the instance of the class and triggers garbage collection to free up memory. Models that
+        are shared with other instances are only unloaded once the last of them releases its memory.
 
         Examples
         --------
@@ -87,7 +192,10 @@ class _Model(ABC):
         >>> answer_aware.release_memory()
         """
 
-        del self
+        for key in getattr(self, '_registry_keys', []):
+            ModelRegistry.release(key)
+        for attr in list(self.__dict__.keys()):
+            delattr(self, attr)
         gc.collect()
         torch.cuda.empty_cache()
 
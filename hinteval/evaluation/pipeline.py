@@ -0,0 +1 @@
+from hinteval.cores.evaluation_pipeline import EvaluationPipeline
\ No newline at end of file
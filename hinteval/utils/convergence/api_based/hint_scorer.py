@@ -1,4 +1,5 @@
 import asyncio
+from contextlib import nullcontext
 from openai import AsyncOpenAI
 
 
@@ -16,33 +17,34 @@ class HintScorer:
             hint = hint[:idx] + '.'
         return hint
 
-    async def _execute_prompt(self, messages):
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0,
-            top_p=1,
-            max_tokens=512
-        )
+    async def _execute_prompt(self, messages, limiter=None):
+        async with nullcontext() if limiter is None else limiter:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0,
+                top_p=1,
+                max_tokens=512
+            )
         return response
 
-    async def _hint_thread(self, info):
+    async def _hint_thread(self, info, limiter=None):
         try:
             hint, can = info
             hint_prompt = f'Does the hint "{hint}" refer to "{can}"? Write ONLY between "Yes" or "No"'
             hint_prompt_messages = [{"role": "user", "content": hint_prompt}]
-            hint_prompt_executed = await self._execute_prompt(hint_prompt_messages)
+            hint_prompt_executed = await self._execute_prompt(hint_prompt_messages, limiter)
             inclusion = hint_prompt_executed.choices[0].message.content.strip().lower()
             inclusion = 1 if inclusion.lower().startswith('yes') else 0
             return can, inclusion
         except:
             return can, -1
 
-    async def _hint_prompt(self, hint, candidate_answers):
+    async def _hint_prompt(self, hint, candidate_answers, limiter=None):
         hint_candidate_list = list(zip([hint] * len(candidate_answers), candidate_answers))
         tasks = []
         for hint_candidate in hint_candidate_list:
-            tasks.append(asyncio.create_task(self._hint_thread(hint_candidate)))
+            tasks.append(asyncio.create_task(self._hint_thread(hint_candidate, limiter)))
         results = dict()
         for task in asyncio.as_completed(tasks):
             task = await task
@@ -51,11 +53,11 @@ class HintScorer:
                                        range(len(candidate_answers))}
         return hint_candidate_answers_dict
 
-    async def rate(self, hints, candidate_answers):
+    async def rate(self, hints, candidate_answers, limiter=None):
         scores = []
         for hint_idx, hint in enumerate(hints, start=1):
             hint = self._clear_hint(hint)
-            hint_prompt = await self._hint_prompt(hint, candidate_answers)
+            hint_prompt = await self._hint_prompt(hint, candidate_answers, limiter)
             if -1 in hint_prompt.values():
                 raise Exception()
             scores.append(hint_prompt)
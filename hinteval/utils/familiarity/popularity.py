@@ -1,15 +1,15 @@
-import spacy
 import requests
 import numpy as np
 from faker import Faker
 from hinteval.utils.familiarity.pageviews import PageviewsClient
 from hinteval.cores.dataset_core import Entity
+from hinteval.utils.functions.spacy_docs import SpacyDocCache
 from datetime import datetime
 
 
 class Popularity:
     def __init__(self, spacy_pipeline):
-        self.nlp = spacy.load(spacy_pipeline)
+        self.spacy_pipeline = spacy_pipeline
         self.faker = Faker()
         self.id_counter = 0
 
@@ -23,7 +23,7 @@ class Popularity:
     def _sent_entities(self, sentence: str):
         valid_entities = ['PERSON', 'NORP', 'FAC', 'ORG', 'GPE', 'LOC', 'PRODUCT', 'EVENT', 'WORK_OF_ART', 'LAW',
                           'LANGUAGE']
-        doc = self.nlp(sentence)
+        doc = SpacyDocCache.parse(self.spacy_pipeline, [sentence])[0]
         entities = []
         for ent in doc.ents:
             if ent.label_ in valid_entities:
@@ -0,0 +1,149 @@
+import os
+import pickle
+import struct
+import itertools
+
+_MAGIC = b'HEVCKP01'
+_HEADER = struct.Struct('<Q')
+
+
+class CheckpointLog:
+    """
+    An append-only checkpoint file for the results accumulated by evaluators and models.
+
+    The checkpoint content is a dictionary whose list and dictionary values only grow while a run is in progress.
+    Every call to :meth:`append` writes just the items added to each of them since the previous call, as one
+    length-prefixed record that is flushed and synced to disk, so the checkpoint I/O of a run is proportional to its
+    results instead of quadratic in them. :meth:`read` replays the records and drops a record that was torn by a crash.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lengths = dict()
+
+    @staticmethod
+    def _measure(content):
+        return {key: len(value) for key, value in content.items() if isinstance(value, (list, dict))}
+
+    @staticmethod
+    def _apply(content, record):
+        for key, values in record['extend'].items():
+            content.setdefault(key, []).extend(values)
+        for key, values in record.get('update', {}).items():
+            content.setdefault(key, dict()).update(values)
+        content.update(record['set'])
+
+    def read(self):
+        """
+        Replays the checkpoint file.
+
+        Returns
+        -------
+        dict
+            The checkpoint content, or an empty dictionary if the file does not exist.
+        """
+
+        if not os.path.exists(self.path):
+            self._lengths = dict()
+            return dict()
+        content = dict()
+        with open(self.path, 'rb') as file:
+            if file.read(len(_MAGIC)) != _MAGIC:
+                # A checkpoint written as a single pickle by older versions; it is rewritten on the next append.
+                file.seek(0)
+                content = pickle.load(file)
+                self._lengths = None
+                return content
+            end = file.tell()
+            while True:
+                header = file.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                size = _HEADER.unpack(header)[0]
+                payload = file.read(size)
+                if len(payload) < size:
+                    break
+                self._apply(content, pickle.loads(payload))
+                end = file.tell()
+        if end < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as file:
+                file.truncate(end)
+        self._lengths = self._measure(content)
+        return content
+
+    def append(self, content):
+        """
+        Appends the part of the checkpoint content that is not in the file yet.
+
+        Lists and dictionaries are expected to only grow between calls, and dictionaries to keep the values of their
+        existing keys; if one of them shrank, or the file is missing or in the old format, the whole content is
+        written again to a new file that atomically replaces the old one.
+
+        Parameters
+        ----------
+        content : dict
+            The whole checkpoint content, e.g., ``{'results': results}``.
+        """
+
+        lengths = self._lengths
+        rewrite = lengths is None or not os.path.exists(self.path) or any(
+            isinstance(value, (list, dict)) and len(value) < lengths.get(key, 0) for key, value in content.items())
+        if rewrite:
+            lengths = dict()
+        record = {'extend': dict(), 'update': dict(), 'set': dict()}
+        for key, value in content.items():
+            if isinstance(value, list):
+                record['extend'][key] = value[lengths.get(key, 0):]
+            elif isinstance(value, dict):
+                # Dictionaries keep their insertion order, so the new items are the last ones.
+                record['update'][key] = dict(itertools.islice(value.items(), lengths.get(key, 0), None))
+            else:
+                record['set'][key] = value
+        self._write(record, rewrite)
+        self._lengths = self._measure(content)
+
+    def update(self, key, values):
+        """
+        Appends new items to one dictionary of the checkpoint content, without the rest of the content.
+
+        Unlike :meth:`append`, the caller does not have to keep the whole content in memory; only the given items are
+        written. If the file is in the old format, it is read and written again in the new one first.
+
+        Parameters
+        ----------
+        key : str
+            The key of the dictionary in the checkpoint content, e.g., ``'outputs'``.
+        values : dict
+            The items to add to the dictionary.
+        """
+
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as file:
+                legacy = file.read(len(_MAGIC)) != _MAGIC
+            if legacy:
+                content = self.read()
+                content.setdefault(key, dict()).update(values)
+                self.append(content)
+                return
+        self._write({'extend': dict(), 'update': {key: dict(values)}, 'set': dict()},
+                    not os.path.exists(self.path))
+        # The lengths of the content are unknown now, so a later :meth:`append` writes the whole content again.
+        self._lengths = None
+
+    def _write(self, record, rewrite):
+        payload = pickle.dumps(record)
+        if rewrite:
+            temp_path = f'{self.path}.tmp'
+            with open(temp_path, 'wb') as file:
+                file.write(_MAGIC)
+                file.write(_HEADER.pack(len(payload)))
+                file.write(payload)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+        else:
+            with open(self.path, 'ab') as file:
+                file.write(_HEADER.pack(len(payload)))
+                file.write(payload)
+                file.flush()
+                os.fsync(file.fileno())
@@ -18,9 +18,7 @@ class SpacyDownloader:
                 '- en_core_web_md: Medium English model\n'
                 '- en_core_web_trf: Transformer-based English model'
             )
-        try:
-            spacy.load(model_name)
-        except Exception:
+        if not spacy.util.is_package(model_name):
             spacy.cli.download(model_name)
 
 
@@ -1,7 +1,7 @@
-import spacy
 from tqdm import tqdm
 from hinteval.cores.dataset_core import Entity
 from hinteval.utils.functions.download_manager import SpacyDownloader
+from hinteval.utils.functions.spacy_docs import SpacyDocCache
 
 
 class EntitySpacy:
@@ -9,7 +9,7 @@ class EntitySpacy:
     def __init__(self, batch_size, model_name, enable_tqdm):
 
         SpacyDownloader.download(model_name)
-        self._nlp = spacy.load(model_name)
+        self._model_name = model_name
         self._valid_entities = ['PERSON', 'NORP', 'FAC', 'ORG', 'GPE', 'LOC', 'PRODUCT', 'EVENT', 'WORK_OF_ART', 'LAW',
                                 'LANGUAGE']
         self.batch_size = batch_size
@@ -17,11 +17,11 @@ class EntitySpacy:
 
     def predict(self, texts, sentences):
 
+        docs = SpacyDocCache.parse(self._model_name, sentences, batch_size=self.batch_size, n_process=8)
         if self.enable_tqdm:
-            docs = tqdm(enumerate(self._nlp.pipe(sentences, n_process=8, batch_size=self.batch_size)),
-                        desc='Detecting entities', total=len(sentences))
+            docs = tqdm(enumerate(docs), desc='Detecting entities', total=len(sentences))
         else:
-            docs = enumerate(self._nlp.pipe(sentences, n_process=8, batch_size=self.batch_size))
+            docs = enumerate(docs)
         for idx, doc in docs:
             for ent in doc.ents:
                 if ent.label_ in self._valid_entities:
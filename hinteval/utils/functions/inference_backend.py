@@ -0,0 +1,356 @@
+import os
+import random
+import torch
+import numpy as np
+from transformers import AutoModelForSequenceClassification, AutoConfig
+from transformers.modeling_outputs import SequenceClassifierOutput
+from typing import Dict
+from hinteval.cores.evaluation_core import _get_token_cache
+from hinteval.utils.functions.length_batching import length_bucketed_batches
+from hinteval.utils.functions.model_registry import ModelRegistry
+
+BACKENDS = ('pytorch', 'torchscript', 'onnx')
+QUANTIZATIONS = (None, 'int8')
+_EXTENSIONS = {'torchscript': '.torchscript.pt', 'onnx': '.onnx'}
+_WEIGHT_FILES = ('config.json', 'model.safetensors', 'pytorch_model.bin')
+
+
+class _Logits(torch.nn.Module):
+    # Takes the inputs positionally in a fixed order and returns the logits alone, which both exporters expect.
+    def __init__(self, model, input_names):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *inputs):
+        return self.model(**dict(zip(self.input_names, inputs)))[0]
+
+
+class ExportedClassifier:
+    """
+    A sequence classifier that runs an exported graph of a fine-tuned checkpoint on the CPU.
+
+    It is called like the PyTorch model it was exported from, i.e., with the tokenized inputs as keyword arguments,
+    and returns a :class:`SequenceClassifierOutput` whose logits are a CPU tensor.
+    """
+
+    def __init__(self, run, input_names):
+        self._run = run
+        self.input_names = input_names
+
+    def eval(self):
+        return self
+
+    def __call__(self, **inputs):
+        logits = self._run([inputs[name].cpu() for name in self.input_names])
+        return SequenceClassifierOutput(logits=logits)
+
+
+def _exported_path(model_dir, backend, input_names, quantize=None):
+    suffix = '' if quantize is None else f'-{quantize}'
+    return os.path.join(model_dir, f'model-{"-".join(input_names)}{suffix}{_EXTENSIONS[backend]}')
+
+
+def _quantize_dynamic(model):
+    # The weights of the linear layers are stored as int8, and their inputs are quantized on the fly.
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_quantized(model_dir, config):
+    # Quantized weights are cached next to the checkpoint, so later loads do not read the fp32 weights at all.
+    path = os.path.join(model_dir, 'model-int8.pt')
+    if _is_stale(path, model_dir):
+        model = _quantize_dynamic(AutoModelForSequenceClassification.from_pretrained(model_dir, config=config).eval())
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        torch.save(model.state_dict(), temp_path)
+        os.replace(temp_path, path)
+        return model
+    model = _quantize_dynamic(AutoModelForSequenceClassification.from_config(config).eval())
+    model.load_state_dict(torch.load(path, map_location='cpu', weights_only=True))
+    return model
+
+
+def _is_stale(path, model_dir):
+    # A checkpoint downloaded again with force_download is exported again.
+    if not os.path.exists(path):
+        return True
+    weights = [os.path.join(model_dir, name) for name in _WEIGHT_FILES if os.path.exists(os.path.join(model_dir, name))]
+    return any(os.path.getmtime(weight) > os.path.getmtime(path) for weight in weights)
+
+
+def _example_inputs(input_names):
+    # Two padded inputs, so the traced graph keeps the attention mask instead of assuming a batch without padding.
+    example = {'input_ids': torch.full((2, 8), 2, dtype=torch.long),
+               'token_type_ids': torch.zeros((2, 8), dtype=torch.long),
+               'attention_mask': torch.ones((2, 8), dtype=torch.long)}
+    example['attention_mask'][1, 5:] = 0
+    return tuple(example[name] for name in input_names)
+
+
+def _export(model_dir, num_labels, backend, input_names, path, quantize=None):
+    config = AutoConfig.from_pretrained(model_dir, num_labels=num_labels, torchscript=True)
+    if quantize is None:
+        model = AutoModelForSequenceClassification.from_pretrained(model_dir, config=config).eval()
+    else:
+        model = _load_quantized(model_dir, config)
+    model = _Logits(model, input_names)
+    inputs = _example_inputs(input_names)
+    # Every process writes to a file of its own and moves it into place, so readers never see a partial graph.
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with torch.no_grad():
+        if backend == 'torchscript':
+            traced = torch.jit.freeze(torch.jit.trace(model, inputs, strict=False).eval())
+            torch.jit.save(traced, temp_path)
+        else:
+            dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+            dynamic_axes['logits'] = {0: 'batch'}
+            torch.onnx.export(model, inputs, temp_path, input_names=list(input_names), output_names=['logits'],
+                              dynamic_axes=dynamic_axes, opset_version=14, do_constant_folding=True)
+    os.replace(temp_path, path)
+
+
+def _load_torchscript(path):
+    module = torch.jit.load(path, map_location='cpu')
+
+    def run(inputs):
+        with torch.no_grad():
+            return module(*inputs)
+
+    return run
+
+
+def _import_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError(
+            'The "onnx" backend requires ONNX Runtime.\n'
+            'To install it, use the following command:\n'
+            '\n'
+            'pip install onnxruntime\n'
+        ) from e
+    return onnxruntime
+
+
+def _load_onnx(path):
+    onnxruntime = _import_onnxruntime()
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+    input_names = [node.name for node in session.get_inputs()]
+
+    def run(inputs):
+        feed = {name: tensor.numpy() for name, tensor in zip(input_names, inputs)}
+        return torch.from_numpy(session.run(['logits'], feed)[0])
+
+    return run
+
+
+def _quantize_onnx(path, quantized_path):
+    try:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+    except ImportError as e:
+        raise ImportError(
+            'Quantizing the "onnx" backend requires the ONNX package.\n'
+            'To install it, use the following command:\n'
+            '\n'
+            'pip install onnx\n'
+        ) from e
+    temp_path = f'{quantized_path}.{os.getpid()}.tmp'
+    quantize_dynamic(path, temp_path, weight_type=QuantType.QInt8)
+    os.replace(temp_path, quantized_path)
+
+
+def load_sequence_classifier(model_dir, num_labels, device, backend='pytorch', input_names=None, quantize=None):
+    """
+    Loads a fine-tuned sequence classifier from the cache directory with the given inference backend.
+
+    With the 'pytorch' backend, the checkpoint is loaded as a transformers model on the given device. With the
+    'torchscript' and 'onnx' backends, the checkpoint is exported once into a graph that is stored next to it, and the
+    graph is run on the CPU by TorchScript or ONNX Runtime; later loads read the stored graph.
+
+    With `quantize='int8'`, the weights of the linear layers are quantized dynamically to int8, which makes the model
+    smaller and faster on the CPU at a small cost in accuracy. The quantized model is stored next to the checkpoint as
+    well, and it always runs on the CPU.
+
+    Parameters
+    ----------
+    model_dir : str
+        The directory of the checkpoint.
+    num_labels : int
+        The number of labels of the classifier.
+    device : torch.device
+        The device of the 'pytorch' backend. Exported graphs and quantized models always run on the CPU.
+    backend : {'pytorch', 'torchscript', 'onnx'}, default 'pytorch'
+        The inference backend.
+    input_names : List[str], optional
+        The tokenizer outputs that the classifier receives, in the order they are exported. Required by exported
+        backends.
+    quantize : {None, 'int8'}, default None
+        The quantization of the linear layers, or None to keep the fp32 weights.
+
+    Returns
+    -------
+    Union[PreTrainedModel, ExportedClassifier]
+        A model that is called with the tokenized inputs as keyword arguments and returns an output with `logits`.
+
+    Raises
+    ------
+    ImportError
+        If the 'onnx' backend is used and ONNX Runtime is not installed, or if it is quantized and ONNX is not
+        installed.
+    """
+
+    if backend == 'pytorch':
+        config = AutoConfig.from_pretrained(model_dir, num_labels=num_labels)
+        if quantize is not None:
+            return _load_quantized(model_dir, config)
+        return AutoModelForSequenceClassification.from_pretrained(model_dir, config=config).to(device)
+    if backend == 'onnx':
+        # Fails before the checkpoint is exported, not after.
+        _import_onnxruntime()
+    input_names = tuple(input_names)
+    path = _exported_path(model_dir, backend, input_names, quantize)
+    if backend == 'onnx' and quantize is not None:
+        # ONNX Runtime quantizes the exported fp32 graph, which is exported first if needed.
+        fp32_path = _exported_path(model_dir, backend, input_names)
+        if _is_stale(fp32_path, model_dir):
+            _export(model_dir, num_labels, backend, input_names, fp32_path)
+        if _is_stale(path, model_dir):
+            _quantize_onnx(fp32_path, path)
+    elif _is_stale(path, model_dir):
+        _export(model_dir, num_labels, backend, input_names, path, quantize)
+    run = _load_torchscript(path) if backend == 'torchscript' else _load_onnx(path)
+    return ExportedClassifier(run, input_names)
+
+
+def agreement_report(model, reference, run_batches, inputs, sample_size=256, seed=0):
+    """
+    Compares the labels and probabilities of a classifier with those of a reference classifier on a sample of inputs.
+
+    Parameters
+    ----------
+    model : Callable
+        The classifier to check, e.g., a quantized one.
+    reference : Callable
+        The reference classifier, e.g., the fp32 one.
+    run_batches : Callable
+        A function that receives the inputs and a prediction function, and yields the outputs of the inputs in
+        batches, e.g., :func:`length_bucketed_batches` with the tokenizer of the classifiers bound.
+    inputs : List[tuple]
+        The inputs, each a tuple of one text or of a pair of texts.
+    sample_size : int, default 256
+        The number of inputs that are sampled. All inputs are used if there are not more of them.
+    seed : int, default 0
+        The seed of the sample.
+
+    Returns
+    -------
+    Dict[str, float]
+        The number of sampled inputs, the fraction of them on which the labels agree, and the maximum and mean
+        absolute difference of the probabilities.
+    """
+
+    if len(inputs) == 0:
+        raise ValueError('There are no inputs to compare the classifiers on.')
+    sample = list(inputs) if len(inputs) <= sample_size else random.Random(seed).sample(list(inputs), sample_size)
+
+    def probabilities(classifier):
+        def predict(batch):
+            return torch.softmax(classifier(**batch).logits.float(), dim=-1).cpu().numpy()
+
+        return np.concatenate([np.stack(outputs) for outputs in run_batches(sample, predict)])
+
+    with torch.no_grad():
+        model_probabilities = probabilities(model)
+        reference_probabilities = probabilities(reference)
+    difference = np.abs(model_probabilities - reference_probabilities)
+    return {'num_of_inputs': len(sample),
+            'label_agreement': float(np.mean(model_probabilities.argmax(axis=1) ==
+                                             reference_probabilities.argmax(axis=1))),
+            'max_probability_difference': float(difference.max()),
+            'mean_probability_difference': float(difference.mean())}
+
+
+class _SequenceClassifierMixin:
+    # The backend, quantization, and batching of the evaluators that score with a fine-tuned sequence classifier. The
+    # evaluators set `batch_size`, `max_tokens_per_batch`, `_columns`, and `_tokenizer` themselves.
+    _max_length = 128
+
+    def _set_backend(self, backend, quantize):
+        if backend not in BACKENDS:
+            raise ValueError(f'Invalid backend: "{backend}". It must be one of "pytorch", "torchscript", or "onnx".')
+        self.backend = backend
+        if quantize not in QUANTIZATIONS:
+            raise ValueError(f'Invalid quantization: "{quantize}". It must be None or "int8".')
+        self.quantize = quantize
+        # Exported graphs and quantized models run on the CPU.
+        use_cuda = torch.cuda.is_available() and backend == 'pytorch' and quantize is None
+        self._device = torch.device('cuda' if use_cuda else 'cpu')
+
+    def _load_classifier(self, model_dir, num_labels):
+        backend, quantize, device, columns = self.backend, self.quantize, self._device, self._columns
+        model_key = ('sequence-classification', model_dir, str(device), backend)
+        self._model = self._acquire(model_key + (quantize,),
+                                    lambda: load_sequence_classifier(model_dir, num_labels, device, backend, columns,
+                                                                     quantize))
+        # The fp32 model is only loaded by quantization_report, for the duration of the report.
+        self._reference = (model_key + (None,),
+                           lambda: load_sequence_classifier(model_dir, num_labels, device, backend, columns))
+
+    def _padded_batches(self, inputs, predict):
+        # Inputs are batched by length and every batch is padded to its longest input, not to the maximum length.
+        # Tokenized inputs are cached and shared with the other evaluators that use the same tokenizer.
+        return length_bucketed_batches(self._tokenizer, inputs, predict, self.batch_size, max_length=self._max_length,
+                                       columns=self._columns, max_tokens_per_batch=self.max_tokens_per_batch,
+                                       token_cache=_get_token_cache())
+
+    def _report_inputs(self, instances):
+        self._validate_input(instances)
+        return self._hint_view(instances).question_hint_pairs()
+
+    def quantization_report(self, inputs: list, sample_size: int = 256, seed: int = 0) -> Dict[str, float]:
+        """
+        Compares the quantized model with the fp32 model on a sample of the given inputs.
+
+        The report shows whether the quantized model can replace the fp32 one for the given data. The fp32 model is
+        loaded for the duration of the report, and no scores are stored in the inputs.
+
+        Parameters
+        ----------
+        inputs : Union[List[Instance], List[Union[Question, Hint]]]
+            The inputs the evaluator scores, i.e., the instances whose question and hint pairs are sampled, or, for
+            readability, the questions and hints that are sampled.
+        sample_size : int, default 256
+            The number of question and hint pairs, or of sentences, to compare.
+        seed : int, default 0
+            The seed of the sample.
+
+        Returns
+        -------
+        Dict[str, float]
+            The number of compared inputs (`num_of_inputs`), the fraction of them on which the predicted classes
+            agree (`label_agreement`), and the maximum and mean absolute difference of the class probabilities
+            (`max_probability_difference` and `mean_probability_difference`).
+
+        Raises
+        ------
+        ValueError
+            If quantization is not enabled, or if there are no inputs to compare.
+
+        Examples
+        --------
+        >>> from hinteval.evaluation.convergence import Specificity
+        >>>
+        >>> specificity = Specificity(model_name='roberta-large', quantize='int8')
+        >>> report = specificity.quantization_report(instances, sample_size=100)
+        >>> print(report)
+        # {'num_of_inputs': 100, 'label_agreement': 0.99, 'max_probability_difference': 0.052, 'mean_probability_difference': 0.006}
+        """
+
+        if self.quantize is None:
+            raise ValueError('Quantization is not enabled. Set `quantize` to compare the quantized model with the fp32 '
+                             'model.')
+        inputs = self._report_inputs(inputs)
+        with ModelRegistry.borrow(*self._reference) as reference:
+            return agreement_report(self._model, reference, self._padded_batches, inputs, sample_size, seed)
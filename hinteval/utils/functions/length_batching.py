@@ -0,0 +1,121 @@
+import gc
+import torch
+import numpy as np
+
+# The number of batches whose inputs are sorted together; a larger window groups lengths more tightly, while a
+# smaller one keeps the outputs of the first inputs, and thus the checkpoints, coming sooner.
+_WINDOW_BATCHES = 16
+
+
+def _is_out_of_memory(error):
+    # CUDA raises torch.cuda.OutOfMemoryError, a RuntimeError, and the CPU allocator raises a plain RuntimeError.
+    if isinstance(error, MemoryError):
+        return True
+    message = str(error)
+    return isinstance(error, RuntimeError) and ('out of memory' in message or "can't allocate memory" in message)
+
+
+def _release_memory():
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def _split_batches(order, lengths, limits):
+    # The limits are read for every input, so a limit lowered after an allocation failure applies to the next batch.
+    batch = []
+    for position in order:
+        if len(batch) > 0:
+            if limits['max_tokens'] is None:
+                is_full = len(batch) >= limits['batch_size']
+            else:
+                # Inputs are sorted by length, so the batch is padded to the length of the input being added.
+                is_full = (len(batch) + 1) * lengths[position] > limits['max_tokens']
+            if is_full:
+                yield batch
+                batch = []
+        batch.append(position)
+    if len(batch) > 0:
+        yield batch
+
+
+def length_bucketed_batches(tokenizer, inputs, predict, batch_size, max_length=None, columns=None,
+                            max_tokens_per_batch=None, window_batches=_WINDOW_BATCHES, token_cache=None):
+    """
+    Runs a model over tokenized inputs in batches of similar length, each padded only to its own longest sequence.
+
+    The inputs are taken in windows of `window_batches` batches. Every window is tokenized without padding, sorted by
+    token length, and split into batches that are padded dynamically, so short inputs do not pay for the padding of
+    long ones. The outputs are put back in the order of the inputs before they are yielded.
+
+    If a batch runs out of memory, it is split in half and retried, and the following batches are limited to the size
+    that fit; a single input that does not fit raises the error.
+
+    Parameters
+    ----------
+    tokenizer : PreTrainedTokenizerBase
+        The tokenizer of the model.
+    inputs : List[tuple]
+        The inputs, each a tuple of one text or of a pair of texts.
+    predict : Callable
+        A function that receives a padded batch as a dict of tensors and returns one output per input of the batch.
+    batch_size : int
+        The maximum number of inputs in a batch, and the number of outputs yielded at once.
+    max_length : int, optional
+        The length the inputs are truncated to. If None, the maximum length of the model is used.
+    columns : List[str], optional
+        The tokenizer outputs that are passed to the model. If None, all of them are passed.
+    max_tokens_per_batch : int, optional
+        The maximum number of tokens in a padded batch, i.e., its number of inputs times its padded length. If given,
+        batches are packed up to this budget instead of `batch_size` inputs.
+    window_batches : int, default 16
+        The number of batches that are sorted together.
+    token_cache : TokenCache, optional
+        The cache the tokenized inputs are read from and stored in. If None, all inputs are tokenized.
+
+    Yields
+    ------
+    list
+        The outputs of `batch_size` consecutive inputs, in the order of the inputs.
+    """
+
+    limits = {'batch_size': batch_size, 'max_tokens': max_tokens_per_batch}
+
+    def run(positions, encodings, lengths):
+        features = [{column: values[position] for column, values in encodings.items()} for position in positions]
+        batch = tokenizer.pad(features, return_tensors='pt')
+        try:
+            return list(zip(positions, predict(batch)))
+        except (RuntimeError, MemoryError) as error:
+            if not _is_out_of_memory(error) or len(positions) == 1:
+                raise
+        # The batch is released outside the except block, where the traceback no longer holds on to it.
+        del batch, features
+        _release_memory()
+        half = len(positions) // 2
+        if limits['max_tokens'] is None:
+            limits['batch_size'] = max(1, min(limits['batch_size'], half))
+        else:
+            limits['max_tokens'] = max(1, min(limits['max_tokens'], half * int(lengths[positions[-1]])))
+        return run(positions[:half], encodings, lengths) + run(positions[half:], encodings, lengths)
+
+    window = batch_size * window_batches
+    for window_start in range(0, len(inputs), window):
+        window_inputs = inputs[window_start:window_start + window]
+        if token_cache is not None:
+            encodings = token_cache.encode(tokenizer, window_inputs, max_length)
+        else:
+            texts = [item[0] for item in window_inputs]
+            text_pairs = [item[1] for item in window_inputs] if len(window_inputs[0]) > 1 else None
+            encodings = tokenizer(texts, text_pairs, truncation=True, max_length=max_length)
+        if columns is not None:
+            encodings = {column: encodings[column] for column in columns}
+        lengths = np.fromiter((len(ids) for ids in encodings['input_ids']), dtype=np.int64, count=len(window_inputs))
+        # A stable sort keeps inputs of equal length in their order, so the batches are deterministic.
+        order = np.argsort(lengths, kind='stable').tolist()
+        outputs = [None] * len(window_inputs)
+        for positions in _split_batches(order, lengths, limits):
+            for position, output in run(positions, encodings, lengths):
+                outputs[position] = output
+        for start in range(0, len(outputs), batch_size):
+            yield outputs[start:start + batch_size]
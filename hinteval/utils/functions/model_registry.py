@@ -0,0 +1,130 @@
+import gc
+import os
+import functools
+import threading
+from contextlib import contextmanager
+
+
+class ModelRegistry:
+    """
+    A process-wide, reference-counted registry of loaded models.
+
+    spaCy pipelines, tokenizers, transformer models, sentence transformers, and text-generation pipelines are
+    registered under a key that describes how they were loaded, e.g., ``('tokenizer', 'bert-base-uncased')``. Every
+    evaluator or model that acquires the same key receives the same object, which is unloaded once the last of them
+    releases it.
+    """
+
+    _entries = dict()
+    _lock = threading.RLock()
+
+    @classmethod
+    def acquire(cls, key, loader):
+        """
+        Returns the object registered under the given key, loading it first if no one holds it.
+
+        Parameters
+        ----------
+        key : tuple
+            The key that describes the object and how it is loaded.
+        loader : Callable
+            A function without arguments that loads the object.
+
+        Returns
+        -------
+        Any
+            The shared object. Every call must be matched by a call to :meth:`release`.
+        """
+
+        with cls._lock:
+            if key not in cls._entries:
+                cls._entries[key] = [loader(), 0]
+            entry = cls._entries[key]
+            entry[1] += 1
+            return entry[0]
+
+    @classmethod
+    def release(cls, key):
+        """
+        Releases one reference to the object registered under the given key, and unloads it after the last one.
+
+        Parameters
+        ----------
+        key : tuple
+            The key the object was acquired with.
+        """
+
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del cls._entries[key]
+        del entry
+        gc.collect()
+
+    @classmethod
+    def get(cls, key):
+        """
+        Returns the object registered under the given key without acquiring it.
+
+        Parameters
+        ----------
+        key : tuple
+            The key the object was acquired with.
+
+        Returns
+        -------
+        Any
+            The registered object, or None if no one holds it.
+        """
+
+        with cls._lock:
+            entry = cls._entries.get(key)
+            return None if entry is None else entry[0]
+
+    @classmethod
+    @contextmanager
+    def borrow(cls, key, loader):
+        """
+        Holds the object registered under the given key for the duration of a ``with`` block.
+
+        Parameters
+        ----------
+        key : tuple
+            The key that describes the object and how it is loaded.
+        loader : Callable
+            A function without arguments that loads the object.
+        """
+
+        obj = cls.acquire(key, loader)
+        try:
+            yield obj
+        finally:
+            cls.release(key)
+
+
+def _release_on_failure(init):
+    # Wraps the constructor of an evaluator or model. A constructor that fails after acquiring models, e.g., on a
+    # later ValueError or a failed download, releases them, since release_memory is never called on the object.
+    @functools.wraps(init)
+    def wrapper(self, *args, **kwargs):
+        try:
+            init(self, *args, **kwargs)
+        except BaseException:
+            for key in self.__dict__.pop('_registry_keys', []):
+                ModelRegistry.release(key)
+            raise
+
+    return wrapper
+
+
+def _reset_lock_after_fork():
+    # A worker forked while another thread held the lock would otherwise wait for it forever.
+    ModelRegistry._lock = threading.RLock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
@@ -1,4 +1,5 @@
 import os.path
+import math
 import torch
 import random
 import numpy as np
@@ -7,8 +8,8 @@ import pickle
 import logging
 from transformers import logging as tr_logging
 from transformers import AutoModel, AutoTokenizer, AutoConfig
-from torch.utils.data import TensorDataset, DataLoader
 from hinteval.utils.functions.download_manager import QC_Downloader
+from hinteval.utils.functions.length_batching import length_bucketed_batches
 from tqdm import tqdm
 
 logging.disable(logging.WARNING)
@@ -33,7 +34,7 @@ class Classifier(nn.Module):
 
 
 class QC:
-    def __init__(self, batch_size, force_download, enable_tqdm):
+    def __init__(self, batch_size, force_download, enable_tqdm, max_tokens_per_batch=None):
 
         seed_val = 213
         random.seed(seed_val)
@@ -44,6 +45,7 @@ class QC:
         self._device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self._max_seq_length = 64
         self.batch_size = batch_size
+        self.max_tokens_per_batch = max_tokens_per_batch
         self.enable_tqdm = enable_tqdm
         self._out_dropout_rate = 0.1
         qc_path = os.path.join(os.environ['HINTEVAL_CACHE_DIR'], 'question-classification')
@@ -58,51 +60,33 @@ class QC:
         with open(os.path.join(qc_path, 'labels_dict.pickle'), mode='rb') as f:
             self._labels = pickle.load(f)
 
-    def _generate_data_loader(self, questions, label_map, tokenizer):
-        input_ids = []
-        input_mask_array = []
-        label_id_array = []
-
-        for (text, label) in questions:
-            encoded_sent = tokenizer.encode_plus(text, add_special_tokens=True, max_length=self._max_seq_length,
-                                                 padding='max_length', truncation=True)
-            input_ids.append(encoded_sent['input_ids'])
-            input_mask_array.append(encoded_sent['attention_mask'])
-
-            id = -1
-            if label in label_map:
-                id = label_map[label]
-            label_id_array.append(id)
-
-        input_ids = torch.tensor(input_ids)
-        input_mask_array = torch.tensor(input_mask_array)
-        label_id_array = torch.tensor(label_id_array, dtype=torch.long)
-
-        dataset = TensorDataset(input_ids, input_mask_array, label_id_array)
-        return DataLoader(dataset, batch_size=self.batch_size)
-
     def predict(self, texts, questions):
         import __main__
         setattr(__main__, "Classifier", Classifier)
         best_model: Classifier = torch.load(self._output_model_name)
 
-        my_list = [(question, '_') for question in questions]
-        if self.enable_tqdm:
-            my_data_loader = tqdm(self._generate_data_loader(my_list, self._label_to_id_map, self._tokenizer),
-                                  desc='Detecting question types')
-        else:
-            my_data_loader = self._generate_data_loader(my_list, self._label_to_id_map, self._tokenizer)
-        for batch_idx, batch in enumerate(my_data_loader):
-            b_input_ids = batch[0].to(self._device)
-            b_input_mask = batch[1].to(self._device)
+        def predict_batch(batch):
+            b_input_ids = batch['input_ids'].to(self._device)
+            b_input_mask = batch['attention_mask'].to(self._device)
 
             with torch.no_grad():
                 logits, _ = best_model(b_input_ids, b_input_mask)
 
             _, preds = torch.max(logits, 1)
-            for ex_id in range(len(b_input_mask)):
-                predicted_label = self._id_to_label_map[preds[ex_id].item()]
+            return preds.tolist()
+
+        # Questions are batched by length and every batch is padded to its longest question, not to 64 tokens.
+        batches = length_bucketed_batches(self._tokenizer, [(question,) for question in questions], predict_batch,
+                                          self.batch_size, max_length=self._max_seq_length,
+                                          columns=['input_ids', 'attention_mask'],
+                                          max_tokens_per_batch=self.max_tokens_per_batch)
+        if self.enable_tqdm:
+            batches = tqdm(batches, total=math.ceil(len(questions) / self.batch_size), desc='Detecting question types')
+        idx = 0
+        for preds in batches:
+            for pred in preds:
+                predicted_label = self._id_to_label_map[pred]
                 coarse_lbl, fine_lbl = tuple(predicted_label.split(':'))
-                idx = batch_idx * self.batch_size + ex_id
                 texts[idx].question_type['major'] = f'{coarse_lbl}:{self._labels["short_to_desc"][coarse_lbl]}'
                 texts[idx].question_type['minor'] = f'{fine_lbl}:{self._labels["labels"][coarse_lbl][fine_lbl]}'
+                idx += 1
@@ -0,0 +1,151 @@
+import os
+import time
+import pickle
+import sqlite3
+import threading
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS scores (key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,
+                                   used INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS scores_used ON scores (used);
+CREATE TABLE IF NOT EXISTS usage (size INTEGER NOT NULL);
+INSERT INTO usage (size) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM usage);
+CREATE TRIGGER IF NOT EXISTS scores_insert AFTER INSERT ON scores BEGIN
+    UPDATE usage SET size = size + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS scores_update AFTER UPDATE OF size ON scores BEGIN
+    UPDATE usage SET size = size + NEW.size - OLD.size;
+END;
+CREATE TRIGGER IF NOT EXISTS scores_delete AFTER DELETE ON scores BEGIN
+    UPDATE usage SET size = size - OLD.size;
+END;
+'''
+# SQLite limits the number of host parameters of a statement to 999 in older builds.
+_CHUNK = 900
+
+
+def _cache_size(env_var):
+    # The caches are opt-in: each stays disabled until its variable is set to a positive number of bytes.
+    return max(int(os.environ.get(env_var) or 0), 0)
+
+
+class ScoreCache:
+    """
+    An on-disk cache of the scores computed by evaluators, shared by all runs that use the same cache directory.
+
+    Scores are pickled into a SQLite database and looked up by a key that identifies the evaluator, its
+    configuration, and the scored texts. Once the pickled scores outgrow ``max_size`` bytes, the least recently used
+    ones are evicted.
+    """
+
+    def __init__(self, path, max_size):
+        self.path = path
+        self.max_size = max_size
+        self._connection = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # A connection must not be shared with the worker processes forked from this one.
+        if self._connection is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=60, check_same_thread=False, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    @staticmethod
+    def _dumps(value):
+        return pickle.dumps(value)
+
+    @staticmethod
+    def _loads(value):
+        return pickle.loads(value)
+
+    def get_many(self, keys):
+        """
+        Looks up the cached scores of the given keys and marks them as recently used.
+
+        Parameters
+        ----------
+        keys : List[str]
+            The keys to look up.
+
+        Returns
+        -------
+        dict
+            The cached scores by key; keys that are not in the cache are left out.
+        """
+
+        keys = list(keys)
+        found = dict()
+        with self._lock:
+            connection = self._connect()
+            for i in range(0, len(keys), _CHUNK):
+                chunk = keys[i:i + _CHUNK]
+                placeholders = ', '.join('?' * len(chunk))
+                rows = connection.execute(f'SELECT key, value FROM scores WHERE key IN ({placeholders})', chunk)
+                found.update((key, self._loads(value)) for key, value in rows)
+            if len(found) > 0:
+                used = time.time_ns()
+                with connection:
+                    connection.execute('BEGIN')
+                    connection.executemany('UPDATE scores SET used = ? WHERE key = ?',
+                                           [(used, key) for key in found])
+        return found
+
+    def put_many(self, items):
+        """
+        Stores the given scores and evicts the least recently used ones if the cache outgrows its size.
+
+        Parameters
+        ----------
+        items : dict
+            The scores to store by key.
+        """
+
+        used = time.time_ns()
+        rows = []
+        for key, value in items.items():
+            value = self._dumps(value)
+            rows.append((key, value, len(key) + len(value), used))
+        if len(rows) == 0:
+            return
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.executemany('INSERT INTO scores (key, value, size, used) VALUES (?, ?, ?, ?) '
+                                       'ON CONFLICT (key) DO UPDATE SET value = excluded.value, '
+                                       'size = excluded.size, used = excluded.used', rows)
+                size = connection.execute('SELECT size FROM usage').fetchone()[0]
+                if size > self.max_size:
+                    connection.execute('DELETE FROM scores WHERE key IN (SELECT key FROM (SELECT key, SUM(size) OVER '
+                                       '(ORDER BY used DESC, key) AS kept FROM scores) WHERE kept > ?)',
+                                       (self.max_size,))
+
+    def size(self):
+        """
+        Returns the total size of the cached scores in bytes.
+
+        Returns
+        -------
+        int
+            The size of the pickled scores and their keys.
+        """
+
+        with self._lock:
+            return self._connect().execute('SELECT size FROM usage').fetchone()[0]
+
+    def clear(self):
+        """
+        Removes all the cached scores.
+        """
+
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.execute('DELETE FROM scores')
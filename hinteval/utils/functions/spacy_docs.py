@@ -0,0 +1,246 @@
+import os
+import spacy
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from spacy.tokens import DocBin
+from hinteval.utils.functions.model_registry import ModelRegistry
+from hinteval.utils.functions.score_cache import _cache_size
+
+_RUN_DOCS = contextvars.ContextVar('hinteval_run_docs', default=None)
+
+
+class _RunDocs:
+    # The documents of one run scope, which are kept until the scope ends.
+
+    def __init__(self):
+        self.docs = dict()
+        self.parsing = dict()
+        self.lock = threading.Lock()
+
+    def parse(self, pipeline, texts, parse):
+        # Like the cache, a text that another thread of the scope is parsing is waited for instead of parsed again.
+        docs, own, waiting = dict(), [], []
+        with self.lock:
+            for text in texts:
+                key = (pipeline, text)
+                if key in self.docs:
+                    docs[text] = self.docs[key]
+                elif key in self.parsing:
+                    waiting.append((text, self.parsing[key]))
+                else:
+                    self.parsing[key] = threading.Event()
+                    own.append(text)
+        try:
+            if len(own) > 0:
+                parsed = dict(zip(own, parse(own)))
+                docs.update(parsed)
+                with self.lock:
+                    self.docs.update(((pipeline, text), doc) for text, doc in parsed.items())
+        finally:
+            with self.lock:
+                for text in own:
+                    self.parsing.pop((pipeline, text)).set()
+        for text, event in waiting:
+            event.wait()
+            with self.lock:
+                if (pipeline, text) in self.docs:
+                    docs[text] = self.docs[(pipeline, text)]
+        # The other thread failed to parse them.
+        remaining = [text for text, _ in waiting if text not in docs]
+        if len(remaining) > 0:
+            docs.update(zip(remaining, parse(remaining)))
+        return docs
+
+
+class SpacyDocCache:
+    """
+    A process-wide cache of the documents parsed by spaCy pipelines.
+
+    The cache is disabled unless `HINTEVAL_DOC_CACHE_SIZE` is set to a positive number of bytes; until then, every
+    call parses its texts. Once enabled, documents are keyed by the pipeline and the text, so each text is parsed once
+    per pipeline. The most recently used documents are kept as live :class:`Doc` objects and returned as they are;
+    older ones are serialized as :class:`DocBin` objects, and once those outgrow `HINTEVAL_DOC_CACHE_SIZE` bytes, the
+    least recently used ones are evicted. Within :meth:`run_scope`, the documents parsed are also kept in memory for
+    the rest of the scope, whether or not the cache is enabled. The pipelines themselves are taken from
+    :class:`ModelRegistry`, so an evaluator that holds a pipeline shares it with the cache.
+    """
+
+    _hot_size = 1024
+    _hot = OrderedDict()
+    _cold = OrderedDict()
+    _size = 0
+    _lock = threading.Lock()
+    _parsing = dict()
+
+    @classmethod
+    def _lookup(cls, pipeline, texts, vocab):
+        found, restored = dict(), dict()
+        with cls._lock:
+            for text in texts:
+                key = (pipeline, text)
+                if text in found or text in restored:
+                    continue
+                if key in cls._hot:
+                    cls._hot.move_to_end(key)
+                    found[text] = cls._hot[key]
+                elif key in cls._cold:
+                    data = cls._cold.pop(key)
+                    cls._size -= len(data)
+                    restored[text] = data
+        if len(restored) > 0:
+            # Serialized documents are restored outside the lock and kept live again.
+            restored = {text: next(DocBin().from_bytes(data).get_docs(vocab)) for text, data in restored.items()}
+            cls._store(pipeline, restored)
+            found.update(restored)
+        return found
+
+    @classmethod
+    def _store(cls, pipeline, docs):
+        demoted = []
+        with cls._lock:
+            for text, doc in docs.items():
+                key = (pipeline, text)
+                if key in cls._cold:
+                    cls._size -= len(cls._cold.pop(key))
+                cls._hot[key] = doc
+                cls._hot.move_to_end(key)
+            while len(cls._hot) > cls._hot_size:
+                demoted.append(cls._hot.popitem(last=False))
+        serialized = []
+        for key, doc in demoted:
+            doc_bin = DocBin(store_user_data=False)
+            doc_bin.add(doc)
+            serialized.append((key, doc_bin.to_bytes()))
+        max_size = _cache_size('HINTEVAL_DOC_CACHE_SIZE')
+        with cls._lock:
+            for key, data in serialized:
+                if key in cls._hot or key in cls._cold:
+                    continue
+                cls._cold[key] = data
+                cls._size += len(data)
+            while cls._size > max_size and len(cls._cold) > 0:
+                _, data = cls._cold.popitem(last=False)
+                cls._size -= len(data)
+
+    @classmethod
+    def _parse_missing(cls, pipeline, nlp, texts, batch_size, n_process):
+        # A text that another thread is parsing is waited for instead of parsed again; the other texts are parsed
+        # right away, so threads that need different texts parse them concurrently.
+        own, waiting = [], []
+        with cls._lock:
+            for text in texts:
+                key = (pipeline, text)
+                if key in cls._parsing:
+                    waiting.append((text, cls._parsing[key]))
+                else:
+                    cls._parsing[key] = threading.Event()
+                    own.append(text)
+        docs = dict()
+        try:
+            if len(own) > 0:
+                docs.update(zip(own, nlp.pipe(own, batch_size=batch_size, n_process=n_process)))
+                cls._store(pipeline, docs)
+        finally:
+            with cls._lock:
+                for text in own:
+                    cls._parsing.pop((pipeline, text)).set()
+        if len(waiting) > 0:
+            for _, event in waiting:
+                event.wait()
+            docs.update(cls._lookup(pipeline, [text for text, _ in waiting], nlp.vocab))
+            # The other thread failed, or its documents were evicted in the meantime.
+            remaining = [text for text, _ in waiting if text not in docs]
+            if len(remaining) > 0:
+                docs.update(zip(remaining, nlp.pipe(remaining, batch_size=batch_size, n_process=n_process)))
+        return docs
+
+    @classmethod
+    def parse(cls, pipeline, texts, batch_size=64, n_process=1):
+        """
+        Parses the given texts with a spaCy pipeline, reusing the documents parsed before.
+
+        Parameters
+        ----------
+        pipeline : str
+            The name of the spaCy pipeline, e.g., `en_core_web_sm`.
+        texts : List[str]
+            The texts to parse.
+        batch_size : int, default 64
+            The number of texts that spaCy parses at once.
+        n_process : int, default 1
+            The number of processes that spaCy uses to parse the texts.
+
+        Returns
+        -------
+        List[Doc]
+            The documents of the texts, in the same order. Cached documents are shared by all callers, so they must
+            not be modified.
+        """
+
+        texts = list(texts)
+        run_docs = _RUN_DOCS.get()
+        if run_docs is None:
+            return cls._parse(pipeline, texts, batch_size, n_process)
+        docs = run_docs.parse(pipeline, dict.fromkeys(texts),
+                              lambda missing: cls._parse(pipeline, missing, batch_size, n_process))
+        return [docs[text] for text in texts]
+
+    @classmethod
+    def _parse(cls, pipeline, texts, batch_size, n_process):
+        with ModelRegistry.borrow(('spacy', pipeline), lambda: spacy.load(pipeline)) as nlp:
+            if _cache_size('HINTEVAL_DOC_CACHE_SIZE') == 0:
+                return list(nlp.pipe(texts, batch_size=batch_size, n_process=n_process))
+            docs = cls._lookup(pipeline, texts, nlp.vocab)
+            missing = [text for text in dict.fromkeys(texts) if text not in docs]
+            if len(missing) > 0:
+                docs.update(cls._parse_missing(pipeline, nlp, missing, batch_size, n_process))
+            return [docs[text] for text in texts]
+
+    @classmethod
+    @contextmanager
+    def run_scope(cls):
+        """
+        Keeps the documents parsed within the scope in memory until it ends, so that the callers within it, e.g., the
+        evaluators of one :class:`EvaluationPipeline` run, parse each text once per pipeline even while the cache is
+        disabled. A scope within another one shares the documents of the outer scope.
+
+        Examples
+        --------
+        >>> with SpacyDocCache.run_scope():
+        ...     first = SpacyDocCache.parse('en_core_web_sm', ['This city, once home to Mozart and Beethoven.'])
+        ...     second = SpacyDocCache.parse('en_core_web_sm', ['This city, once home to Mozart and Beethoven.'])
+        >>> print(first[0] is second[0])
+        # True
+        """
+
+        if _RUN_DOCS.get() is not None:
+            yield
+            return
+        reset = _RUN_DOCS.set(_RunDocs())
+        try:
+            yield
+        finally:
+            _RUN_DOCS.reset(reset)
+
+    @classmethod
+    def clear(cls):
+        """
+        Removes the cached documents.
+        """
+
+        with cls._lock:
+            cls._hot.clear()
+            cls._cold.clear()
+            cls._size = 0
+
+
+def _reset_locks_after_fork():
+    # A worker forked while another thread held the lock, or was parsing, would otherwise wait for it forever.
+    SpacyDocCache._lock = threading.Lock()
+    SpacyDocCache._parsing = dict()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
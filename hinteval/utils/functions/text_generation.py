@@ -0,0 +1,26 @@
+import transformers
+
+
+def load_text_generation_pipeline(model_name):
+    """
+    Loads a text-generation pipeline whose tokenizer pads with the end-of-sequence token.
+
+    The evaluators and models that run an LLM locally share its pipeline through :class:`ModelRegistry` under the key
+    ``('text-generation', model_name)``, and all of them load it with this function, so the shared pipeline is set up
+    the same way whichever of them loads it first.
+
+    Parameters
+    ----------
+    model_name : str
+        The name of the model on the Hugging Face Hub, e.g., `meta-llama/Meta-Llama-3-8B-Instruct`.
+
+    Returns
+    -------
+    TextGenerationPipeline
+        The pipeline, with its model placed on the available devices.
+    """
+
+    pipeline = transformers.pipeline("text-generation", model=model_name, device_map="auto")
+    # Llama models have no padding token; setting the token also sets its id.
+    pipeline.tokenizer.pad_token = pipeline.tokenizer.eos_token
+    return pipeline
@@ -0,0 +1,98 @@
+import hashlib
+import numpy as np
+from hinteval.utils.functions.score_cache import ScoreCache
+
+
+class TokenCache(ScoreCache):
+    """
+    An on-disk cache of tokenized texts, shared by all evaluators that use the same tokenizer.
+
+    The tokenizer outputs of every input, i.e., of one text or of a pair of texts, are stored as one int32 array with
+    a row per output, keyed by the tokenizer, the maximum length, and the texts; the attention mask of an input that
+    is not padded is all ones, so it is rebuilt instead of stored. Evaluators that tokenize the same texts with the
+    same tokenizer, e.g., :class:`Specificity` and :class:`NeuralNetworkBased` of convergence, tokenize each of them
+    only once. Once the arrays outgrow ``max_size`` bytes, the least recently used ones are evicted.
+    """
+
+    @staticmethod
+    def _dumps(value):
+        # The number of rows is stored in front of the token ids, so an array takes 4 bytes per token and output.
+        return np.int32(value.shape[0]).tobytes() + value.astype(np.int32, copy=False).tobytes()
+
+    @staticmethod
+    def _loads(value):
+        rows = int(np.frombuffer(value, dtype=np.int32, count=1)[0])
+        return np.frombuffer(value, dtype=np.int32, offset=4).reshape(rows, -1)
+
+    @staticmethod
+    def _key(tokenizer_name, max_length, texts):
+        digest = hashlib.blake2b(digest_size=16)
+        for text in (tokenizer_name, max_length, *texts):
+            digest.update(str(text).encode('utf-8'))
+            digest.update(b'\x1f')
+        return digest.hexdigest()
+
+    def encode(self, tokenizer, inputs, max_length=None):
+        """
+        Tokenizes the given inputs with truncation and without padding, reusing the tokenized inputs in the cache.
+
+        Parameters
+        ----------
+        tokenizer : PreTrainedTokenizerBase
+            The tokenizer. Its name, e.g., `bert-base-uncased`, is part of the key of the cached inputs.
+        inputs : List[tuple]
+            The inputs, each a tuple of one text or of a pair of texts.
+        max_length : int, optional
+            The length the inputs are truncated to. If None, the maximum length of the model is used.
+
+        Returns
+        -------
+        Dict[str, List[List[int]]]
+            The outputs of the tokenizer, such as `input_ids` and `attention_mask`, with one list per input.
+        """
+
+        names = list(tokenizer.model_input_names)
+        stored_names = [name for name in names if name != 'attention_mask']
+        keys = [self._key(tokenizer.name_or_path, max_length, item) for item in inputs]
+        arrays = self.get_many(set(keys))
+        missing = dict()
+        for key, item in zip(keys, inputs):
+            if key not in arrays:
+                missing.setdefault(key, item)
+        if len(missing) > 0:
+            items = list(missing.values())
+            texts = [item[0] for item in items]
+            text_pairs = [item[1] for item in items] if len(items[0]) > 1 else None
+            encodings = tokenizer(texts, text_pairs, truncation=True, max_length=max_length)
+            new_arrays = {key: np.array([encodings[name][i] for name in stored_names], dtype=np.int32) for i, key in
+                          enumerate(missing)}
+            self.put_many(new_arrays)
+            arrays.update(new_arrays)
+        outputs = {name: [arrays[key][row].tolist() for key in keys] for row, name in enumerate(stored_names)}
+        if 'attention_mask' in names:
+            outputs['attention_mask'] = [[1] * len(input_ids) for input_ids in outputs['input_ids']]
+        return outputs
+
+
+class _RunTokenCache(TokenCache):
+    # Keeps the tokenized inputs of one pipeline run in memory, without a size limit, for as long as the run lasts.
+
+    def __init__(self):
+        super().__init__(None, None)
+        self._arrays = dict()
+
+    def get_many(self, keys):
+        with self._lock:
+            return {key: self._arrays[key] for key in keys if key in self._arrays}
+
+    def put_many(self, items):
+        with self._lock:
+            self._arrays.update(items)
+
+    def size(self):
+        with self._lock:
+            return sum(len(key) + value.nbytes for key, value in self._arrays.items())
+
+    def clear(self):
+        with self._lock:
+            self._arrays.clear()
@@ -1,4 +1,4 @@
-from typing import Union, List, Literal
+from typing import Union, List, Literal, Optional
 from hinteval.cores.dataset_core import Question, Answer, Hint, Instance
 from hinteval.utils.functions.ent_spacy import EntitySpacy
 from hinteval.utils.functions.question_classification import QC
@@ -76,7 +76,8 @@ def identify_entities(texts: List[Union[Instance, Question, Answer, Hint]], batc
     ent_spacy.predict(refs, sentences)
 
 
-def identify_question_type(texts: List[Question], batch_size, force_download, enable_tqdm):
+def identify_question_type(texts: List[Question], batch_size, force_download, enable_tqdm,
+                           max_tokens_per_batch: Optional[int] = None):
     """
     Identifies question types for the given questions using a pre-trained classifier `[2]`_.
 
@@ -92,11 +93,15 @@ def identify_question_type(texts: List[Question], batch_size, force_download, en
         Whether to force download the question classification model files.
     enable_tqdm : bool
         Whether to enable tqdm progress bar.
+    max_tokens_per_batch : int, optional
+        The maximum number of tokens in a padded batch. If given, questions of similar length are packed into batches
+        up to this budget instead of `batch_size` questions.
 
     Raises
     ------
     ValueError
-        If any item in texts is not an instance of the :class:`Question` class.
+        If any item in texts is not an instance of the :class:`Question` class, or the maximum number of tokens per
+        batch is not positive.
 
     Examples
     --------
@@ -122,5 +127,8 @@ def identify_question_type(texts: List[Question], batch_size, force_download, en
                 raise ValueError(f'All items for detecting question type must be instances of the Question classes.')
     else:
         raise ValueError(f'All items for detecting question type must be instances of the Question classes.')
-    qc = QC(batch_size, force_download, enable_tqdm)
+    if max_tokens_per_batch is not None and max_tokens_per_batch < 1:
+        raise ValueError(
+            f'Invalid maximum number of tokens per batch: "{max_tokens_per_batch}". It must be a positive integer.')
+    qc = QC(batch_size, force_download, enable_tqdm, max_tokens_per_batch)
     qc.predict(texts, sentences)
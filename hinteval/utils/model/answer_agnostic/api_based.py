@@ -1,4 +1,5 @@
 import asyncio
+from contextlib import nullcontext
 from openai import AsyncOpenAI
 
 
@@ -38,31 +39,32 @@ class Hint_Generation:
             cleared_candidate[i] = can
         return cleared_candidate
 
-    async def _execute_prompt(self, messages):
-        result = await self.client.chat.completions.create(
-            model=self.model_name,
-            messages=messages,
-            temperature=self.temperature,
-            top_p=self.top_p,
-            max_tokens=self.max_tokens
-        )
+    async def _execute_prompt(self, messages, limiter=None):
+        async with nullcontext() if limiter is None else limiter:
+            result = await self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                temperature=self.temperature,
+                top_p=self.top_p,
+                max_tokens=self.max_tokens
+            )
         return result
 
-    async def _hint_thread(self, question):
+    async def _hint_thread(self, question, limiter=None):
         messages = [{"role": "system",
                      "content": "You are a helpful assistant that generates hints for user questions. You are given the question, and your goal is to generate hints for the question."},
                     {"role": "user",
                      "content": "Generate {} hints for the following question without revealing the answer in the hints. Question: {}".format(
                          self.num_of_hints, question)}]
 
-        hint_prompt_executed = await self._execute_prompt(messages)
+        hint_prompt_executed = await self._execute_prompt(messages, limiter)
         hints = hint_prompt_executed.choices[0].message.content.strip()
         return question, hints
 
-    async def _hint_prompt(self, questions):
+    async def _hint_prompt(self, questions, limiter=None):
         tasks = []
         for question in questions:
-            tasks.append(asyncio.create_task(self._hint_thread(question)))
+            tasks.append(asyncio.create_task(self._hint_thread(question, limiter)))
         results = dict()
         for task in asyncio.as_completed(tasks):
             task = await task
@@ -70,8 +72,8 @@ class Hint_Generation:
         question_hints_dict = {questions[idx]: results[questions[idx]] for idx in range(len(questions))}
         return question_hints_dict
 
-    async def generate(self, questions):
-        question_hints_dict = await self._hint_prompt(questions)
+    async def generate(self, questions, limiter=None):
+        question_hints_dict = await self._hint_prompt(questions, limiter)
         for q in question_hints_dict.keys():
             question_hints_dict[q] = self.parse_llm_response(question_hints_dict[q])
         return list(question_hints_dict.values())
@@ -1,4 +1,5 @@
 import asyncio
+from contextlib import nullcontext
 from openai import AsyncOpenAI
 
 
@@ -38,17 +39,18 @@ class Hint_Generation:
             cleared_candidate[i] = can
         return cleared_candidate
 
-    async def _execute_prompt(self, messages):
-        result = await self.client.chat.completions.create(
-            model=self.model_name,
-            messages=messages,
-            temperature=self.temperature,
-            top_p=self.top_p,
-            max_tokens=self.max_tokens
-        )
+    async def _execute_prompt(self, messages, limiter=None):
+        async with nullcontext() if limiter is None else limiter:
+            result = await self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                temperature=self.temperature,
+                top_p=self.top_p,
+                max_tokens=self.max_tokens
+            )
         return result
 
-    async def _hint_thread(self, pair):
+    async def _hint_thread(self, pair, limiter=None):
         question, exact_answer = pair
         messages = [{"role": "system",
                      "content": "You are a helpful assistant that generates hints for user questions. You are given the question, and your goal is to generate hints for the question."},
@@ -56,14 +58,14 @@ class Hint_Generation:
                      "content": "Generate {} hints for the following question without using \"{}\" word in the hints. Question: {}".format(
                          self.num_of_hints, exact_answer, question)}]
 
-        hint_prompt_executed = await self._execute_prompt(messages)
+        hint_prompt_executed = await self._execute_prompt(messages, limiter)
         hints = hint_prompt_executed.choices[0].message.content.strip()
         return question, hints
 
-    async def _hint_prompt(self, pairs):
+    async def _hint_prompt(self, pairs, limiter=None):
         tasks = []
         for question_answer in pairs:
-            tasks.append(asyncio.create_task(self._hint_thread(question_answer)))
+            tasks.append(asyncio.create_task(self._hint_thread(question_answer, limiter)))
         results = dict()
         for task in asyncio.as_completed(tasks):
             task = await task
@@ -71,8 +73,8 @@ class Hint_Generation:
         question_hints_dict = {pairs[idx][0]: results[pairs[idx][0]] for idx in range(len(pairs))}
         return question_hints_dict
 
-    async def generate(self, pairs):
-        question_hints_dict = await self._hint_prompt(pairs)
+    async def generate(self, pairs, limiter=None):
+        question_hints_dict = await self._hint_prompt(pairs, limiter)
         for q in question_hints_dict.keys():
             question_hints_dict[q] = self.parse_llm_response(question_hints_dict[q])
         return list(question_hints_dict.values())
@@ -1,4 +1,5 @@
 import asyncio
+from contextlib import nullcontext
 from openai import AsyncOpenAI
 import re
 
@@ -53,27 +54,28 @@ class ReadmeReadability:
                 '6')
         ]
 
-    async def _prompt(self, idx, sentence):
+    async def _prompt(self, idx, sentence, limiter=None):
         messages = [{"role": "system", "content": self.system_prompt}]
         for example in self.examples:
             messages.append({"role": "user", "content": example[0]})
             messages.append({"role": "assistant", "content": example[1]})
         messages.append({"role": "user",
                          "content": f'Sentence: "{sentence}"\nGiven the above key, the readability of the sentence is (scale=1-6): '})
-        outputs = await self.pipeline.chat.completions.create(
-            model=self.model_name,
-            messages=messages,
-            temperature=0,
-            top_p=1,
-            max_tokens=512
-        )
+        async with nullcontext() if limiter is None else limiter:
+            outputs = await self.pipeline.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                temperature=0,
+                top_p=1,
+                max_tokens=512
+            )
         response = outputs.choices[0].message.content.strip()
         return idx, response
 
-    async def _compute_by_prompting(self, sentences):
+    async def _compute_by_prompting(self, sentences, limiter=None):
         tasks = []
         for idx, sentence in enumerate(sentences):
-            tasks.append(asyncio.create_task(self._prompt(idx, sentence)))
+            tasks.append(asyncio.create_task(self._prompt(idx, sentence, limiter)))
         responses = dict()
         for task in asyncio.as_completed(tasks):
             task = await task
@@ -94,3 +96,6 @@ class ReadmeReadability:
 
     def compute_readability(self, sentences):
         return asyncio.run(self._compute_by_prompting(sentences))
+
+    async def acompute_readability(self, sentences, limiter=None):
+        return await self._compute_by_prompting(sentences, limiter)
@@ -0,0 +1,77 @@
+"""
+Checks that the TorchScript and ONNX Runtime backends of the fine-tuned classifiers give the logits of PyTorch within
+a tolerance, and compares their CPU throughput on (question, hint) pairs batched by length. The int8 quantized models
+of every backend are timed as well, and their agreement with the fp32 PyTorch model is reported.
+
+The checkpoint is exported into a temporary directory, as the evaluators export the checkpoints of HINTEVAL_CACHE_DIR.
+The script exits with an error if an fp32 backend differs from PyTorch by more than the tolerance.
+
+Usage: python tests/benchmark_backend.py [model_name] [num_of_pairs] [tolerance]
+"""
+import sys
+import time
+import random
+import tempfile
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from hinteval.utils.functions.inference_backend import BACKENDS, load_sequence_classifier, agreement_report
+from hinteval.utils.functions.length_batching import length_bucketed_batches
+
+model_name = sys.argv[1] if len(sys.argv) > 1 else 'bert-base-uncased'
+num_of_pairs = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+tolerance = float(sys.argv[3]) if len(sys.argv) > 3 else 1e-4
+batch_size = 64
+
+torch.set_grad_enabled(False)
+tokenizer = AutoTokenizer.from_pretrained(model_name)
+columns = ['input_ids', 'token_type_ids', 'attention_mask'] if 'token_type_ids' in tokenizer.model_input_names \
+    else ['input_ids', 'attention_mask']
+
+# Questions and hints of typical lengths, i.e., 8-20 and 10-40 words.
+random.seed(0)
+words = ['city', 'river', 'president', 'famous', 'capital', 'known', 'century', 'music', 'the', 'of', 'was', 'in']
+pairs = [(' '.join(random.choices(words, k=random.randint(8, 20))) + '?',
+          ' '.join(random.choices(words, k=random.randint(10, 40))) + '.') for _ in range(num_of_pairs)]
+
+
+def run_batches(inputs, predict):
+    return length_bucketed_batches(tokenizer, inputs, predict, batch_size, max_length=128, columns=columns)
+
+
+timings = dict()
+results = dict()
+reports = dict()
+with tempfile.TemporaryDirectory() as model_dir:
+    AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=2).save_pretrained(model_dir)
+    reference = load_sequence_classifier(model_dir, 2, torch.device('cpu'))
+    for backend in BACKENDS:
+        for quantize in [None, 'int8']:
+            name = backend if quantize is None else f'{backend} {quantize}'
+            start = time.perf_counter()
+            model = load_sequence_classifier(model_dir, 2, torch.device('cpu'), backend, columns, quantize).eval()
+            print(f'{name}: loaded in {time.perf_counter() - start:.2f} s')
+
+            def predict(batch):
+                return model(**batch).logits.numpy()
+
+            start = time.perf_counter()
+            results[name] = np.concatenate([np.stack(outputs) for outputs in run_batches(pairs, predict)])
+            timings[name] = time.perf_counter() - start
+            print(f'{name}: {timings[name]:.2f} s, {num_of_pairs / timings[name]:.1f} pairs/s')
+            if quantize is not None:
+                reports[name] = agreement_report(model, reference, run_batches, pairs, sample_size=num_of_pairs)
+
+failed = False
+for backend in BACKENDS[1:]:
+    difference = np.abs(results[backend] - results['pytorch']).max()
+    agreement = (results[backend].argmax(axis=1) == results['pytorch'].argmax(axis=1)).mean()
+    print(f'{backend}: speedup {timings["pytorch"] / timings[backend]:.2f}x, maximum difference of the logits '
+          f'{difference:.2e}, agreement of the labels {agreement:.2%}')
+    failed = failed or difference > tolerance
+for name, report in reports.items():
+    print(f'{name}: speedup {timings["pytorch"] / timings[name]:.2f}x, agreement of the labels '
+          f'{report["label_agreement"]:.2%}, maximum difference of the probabilities '
+          f'{report["max_probability_difference"]:.2e}')
+if failed:
+    sys.exit(f'An fp32 backend differs from PyTorch by more than {tolerance:.0e}.')
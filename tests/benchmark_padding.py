@@ -0,0 +1,61 @@
+"""
+Compares the CPU throughput of padding every (question, hint) pair to a fixed length with batching the pairs by length
+and padding every batch to its longest pair, as the transformer evaluators do.
+
+Usage: python tests/benchmark_padding.py [model_name] [num_of_pairs] [max_length]
+"""
+import sys
+import time
+import random
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from hinteval.utils.functions.length_batching import length_bucketed_batches
+
+model_name = sys.argv[1] if len(sys.argv) > 1 else 'bert-base-uncased'
+num_of_pairs = int(sys.argv[2]) if len(sys.argv) > 2 else 2048
+max_length = int(sys.argv[3]) if len(sys.argv) > 3 else 128
+batch_size = 64
+
+torch.set_grad_enabled(False)
+tokenizer = AutoTokenizer.from_pretrained(model_name)
+model = AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=2).eval()
+
+# Questions and hints of typical lengths, i.e., 8-20 and 10-40 words.
+random.seed(0)
+words = ['city', 'river', 'president', 'famous', 'capital', 'known', 'century', 'music', 'the', 'of', 'was', 'in']
+pairs = [(' '.join(random.choices(words, k=random.randint(8, 20))) + '?',
+          ' '.join(random.choices(words, k=random.randint(10, 40))) + '.') for _ in range(num_of_pairs)]
+
+
+def predict(batch):
+    return torch.softmax(model(**batch).logits, dim=-1)[:, 0].tolist()
+
+
+def fixed_padding():
+    outputs = []
+    for start in range(0, len(pairs), batch_size):
+        questions, hints = zip(*pairs[start:start + batch_size])
+        batch = tokenizer(list(questions), list(hints), padding='max_length', truncation=True, max_length=max_length,
+                          return_tensors='pt')
+        outputs.extend(predict(batch))
+    return outputs
+
+
+def dynamic_padding():
+    return [output for batch_outputs in
+            length_bucketed_batches(tokenizer, pairs, predict, batch_size, max_length=max_length) for output in
+            batch_outputs]
+
+
+timings = dict()
+results = dict()
+for name, run in [('fixed padding', fixed_padding), ('length-bucketed', dynamic_padding)]:
+    start = time.perf_counter()
+    results[name] = run()
+    timings[name] = time.perf_counter() - start
+    print(f'{name}: {timings[name]:.2f} s, {num_of_pairs / timings[name]:.1f} pairs/s')
+
+print(f'Speedup: {timings["fixed padding"] / timings["length-bucketed"]:.2f}x')
+difference = np.abs(np.array(results['fixed padding']) - np.array(results['length-bucketed'])).max()
+print(f'Maximum difference of the probabilities: {difference:.2e}')
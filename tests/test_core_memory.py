@@ -0,0 +1,59 @@
+"""
+Checks that the slotted record classes of the cores take clearly less memory than plain classes with the same fields.
+
+The plain classes below replicate the records before they were slotted: every instance has a ``__dict__`` and eager
+``entities``, ``metrics``, and ``metadata`` containers, even when they stay empty.
+
+Usage: python -m pytest tests/test_core_memory.py
+"""
+import tracemalloc
+from hinteval.cores import Hint, Metric
+
+num_of_hints = 20_000
+metric_names = ['relevance-rouge1', 'readability-flesch_kincaid_reading_ease-sm',
+                'relevance-llm-meta-llama_Meta-Llama-3.1-8B-Instruct-Turbo',
+                'convergence-llm-meta-llama_Meta-Llama-3.1-8B-Instruct-Turbo']
+
+
+class _PlainMetric:
+    def __init__(self, name, value, metadata=None):
+        self.name = name
+        self.value = value
+        self.metadata = metadata if metadata is not None else {}
+
+
+class _PlainHint:
+    def __init__(self, hint, source=None, entities=None, metrics=None, metadata=None):
+        self.hint = hint
+        self.source = source
+        self.entities = entities if entities is not None else []
+        self.metrics = metrics if metrics is not None else {}
+        self.metadata = metadata if metadata is not None else {}
+
+
+def _traced_memory(hint_class, metric_class):
+    # The texts are built before tracing starts, so only the records and their containers are measured.
+    texts = [f'Hint {idx}.' for idx in range(num_of_hints)]
+    # Keys are rebuilt for every hint, as happens when a dataset is unpickled or decoded from JSON.
+    keys = [[''.join(name) for name in metric_names] for _ in range(num_of_hints)]
+    tracemalloc.start()
+    hints = [hint_class(text, metrics={key: metric_class(key.split('-')[0], idx / 7) for key in hint_keys})
+             for idx, (text, hint_keys) in enumerate(zip(texts, keys))]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del hints
+    return memory
+
+
+def test_slotted_records_take_less_memory():
+    plain = _traced_memory(_PlainHint, _PlainMetric)
+    slotted = _traced_memory(Hint, Metric)
+    print(f'Plain records: {plain / 2 ** 20:.1f} MiB, slotted records: {slotted / 2 ** 20:.1f} MiB')
+    assert slotted < 0.8 * plain
+
+
+def test_metric_keys_are_interned():
+    hints = [Hint(f'Hint {idx}.', metrics={''.join(name): Metric(name, idx) for name in metric_names})
+             for idx in range(2)]
+    first, second = (list(hint.metrics) for hint in hints)
+    assert all(key_1 is key_2 for key_1, key_2 in zip(first, second))
@@ -0,0 +1,39 @@
+"""
+Checks that a dataset opened from a file written by :meth:`Dataset.store_arrow` finds its instances through the sorted
+id index of the file, without reading the whole id column.
+
+Usage: python -m pytest tests/test_dataset_arrow.py
+"""
+import pytest
+from hinteval import Dataset
+from hinteval.cores import Subset, Instance, Metric
+
+
+@pytest.fixture
+def path(tmp_path):
+    subset = Subset('train')
+    for idx in [5, 3, 9, 0, 7, 1]:
+        instance = Instance.from_strings(f'Question {idx}?', [f'Answer {idx}'], [f'Hint {idx}.'])
+        instance.hints[0].metrics['relevance'] = Metric('relevance', idx / 10)
+        subset.add_instance(instance, f'q{idx}')
+    dataset = Dataset('arrow')
+    dataset.add_subset(subset)
+    path = str(tmp_path / 'dataset.arrow')
+    dataset.store_arrow(path)
+    return path
+
+
+def test_open_finds_instances_without_reading_the_ids(path):
+    subset = Dataset.open(path)['train']
+    for idx in [0, 1, 3, 5, 7, 9]:
+        assert subset[f'q{idx}'].question.question == f'Question {idx}?'
+    assert subset._row_index is None
+    with pytest.raises(ValueError):
+        subset.get_instance('q2')
+
+
+def test_opened_subset_keeps_the_order_of_the_ids(path):
+    subset = Dataset.open(path)['train']
+    subset.add_instance(Instance.from_strings('Question 2?', ['Answer 2'], []), 'q2')
+    assert subset.get_instance_ids() == ['q5', 'q3', 'q9', 'q0', 'q7', 'q1', 'q2']
+    assert subset['q7'].hints[0].metrics['relevance'].value == 0.7
@@ -0,0 +1,112 @@
+"""
+Checks that :meth:`Dataset.commit` digests only the instances that changed since the previous commit, and that the
+commit log still loads back to the committed dataset.
+
+Usage: python -m pytest tests/test_dataset_commit.py
+"""
+import pickle
+from hinteval import Dataset
+from hinteval.cores import Subset, Instance, Hint, Metric, Entity
+from hinteval.cores.dataset import dataset as dataset_module
+
+
+def _dataset(num_of_instances=10):
+    subset = Subset('train')
+    for idx in range(num_of_instances):
+        subset.add_instance(Instance.from_strings(f'Question {idx}?', [f'Answer {idx}'], [f'Hint {idx}.']), f'q{idx}')
+    dataset = Dataset('commit')
+    dataset.add_subset(subset)
+    return dataset
+
+
+def _count_digests(monkeypatch):
+    calls = []
+    digest = dataset_module._digest
+
+    def counting_digest(data):
+        calls.append(data)
+        return digest(data)
+
+    monkeypatch.setattr(dataset_module, '_digest', counting_digest)
+    return calls
+
+
+def _last_segment(path):
+    return list(Dataset._read_log(path))[-1]
+
+
+def test_commit_digests_only_changed_instances(tmp_path, monkeypatch):
+    path = str(tmp_path / 'dataset.log')
+    dataset = _dataset()
+    dataset.commit(path)
+    calls = _count_digests(monkeypatch)
+    dataset['train'].get_instance('q3').hints[0].metrics['relevance'] = Metric('relevance', 0.5)
+    dataset['train'].add_instance(Instance.from_strings('Question 10?', ['Answer 10'], ['Hint 10.']), 'q10')
+    dataset['train'].remove_instance('q0')
+    dataset.commit(path)
+    instance_digests = [data for data in calls if isinstance(data, dict) and 'hints' in data]
+    assert len(instance_digests) == 2
+    changes = _last_segment(path)['subsets']['train']
+    assert set(changes['instances']) == {'q3', 'q10'}
+    assert changes['removed'] == ['q0']
+    assert Dataset.load(path) == dataset
+
+
+def test_commit_tracks_replaced_records_and_entities(tmp_path):
+    path = str(tmp_path / 'dataset.log')
+    dataset = _dataset()
+    dataset.commit(path)
+    dataset['train'].get_instance('q1').hints_from_strings(['Another hint.'])
+    dataset['train'].get_instance('q2').question.entities = [Entity('Question', 'MISC', 0, 8)]
+    dataset.commit(path)
+    assert set(_last_segment(path)['subsets']['train']['instances']) == {'q1', 'q2'}
+    assert Dataset.load(path) == dataset
+
+
+def test_commit_compares_all_after_unrecorded_changes(tmp_path):
+    path = str(tmp_path / 'dataset.log')
+    dataset = _dataset()
+    dataset['train'].get_instance('q4').hints[0].metrics['relevance'] = Metric('relevance', 0.5)
+    dataset.commit(path)
+    dataset['train'].get_instance('q4').hints[0].metrics['relevance'].value = 0.7
+    dataset.commit(path)
+    assert set(_last_segment(path)['subsets']['train']['instances']) == {'q4'}
+    dataset['train'].get_instance('q5').metadata['checked'] = True
+    dataset.commit(path, compare_all=True)
+    assert set(_last_segment(path)['subsets']['train']['instances']) == {'q5'}
+    assert Dataset.load(path) == dataset
+
+
+def test_commit_tracks_changes_made_in_place(tmp_path, monkeypatch):
+    path = str(tmp_path / 'dataset.log')
+    dataset = _dataset()
+    subset = dataset['train']
+    hints = subset.get_instance('q6').hints
+    dataset.commit(path)
+    calls = _count_digests(monkeypatch)
+    hints.append(Hint('Another hint.'))
+    subset.get_instance('q7').answers[0].entities.append(Entity('Answer', 'MISC', 0, 6))
+    subset.get_instance('q8').question.question_type['major'] = 'HUM:human'
+    dataset.commit(path)
+    assert len([data for data in calls if isinstance(data, dict) and 'hints' in data]) == 3
+    assert set(_last_segment(path)['subsets']['train']['instances']) == {'q6', 'q7', 'q8'}
+    assert Dataset.load(path) == dataset
+
+
+def test_changes_are_recorded_by_the_subset_of_the_instance():
+    train, test = Subset('train'), Subset('test')
+    train.add_instance(Instance.from_strings('Question 1?', ['Answer 1'], ['Hint 1.']), 'q1')
+    test.add_instance(Instance.from_strings('Question 2?', ['Answer 2'], ['Hint 2.']), 'q2')
+    train_version, test_version = train._version, test._version
+    test.get_instance('q2').hints[0].metrics['relevance'] = Metric('relevance', 0.5)
+    assert train._version == train_version
+    assert test._changed_since(test_version) == {'q2'}
+
+
+def test_unpickled_instances_are_tracked():
+    instance = pickle.loads(pickle.dumps(Instance.from_strings('Question?', ['Answer'], ['Hint.'])))
+    subset = Subset('train')
+    subset.add_instance(instance, 'q1')
+    version = subset._version
+    instance.hints[0].metrics['relevance'] = Metric('relevance', 0.5)
+    assert subset._changed_since(version) == {'q1'}
@@ -0,0 +1,97 @@
+"""
+Checks that :meth:`evaluate_iter` appends only the new outputs of every chunk to the checkpoint, and that a resumed run
+takes the checkpointed outputs instead of scoring them again.
+
+Usage: python -m pytest tests/test_evaluation_checkpoint.py
+"""
+import pickle
+import pytest
+from hinteval.cores import Hint
+from hinteval.cores.evaluation_core import Readability
+from hinteval.utils.functions.checkpoint_log import CheckpointLog
+
+
+class _LengthReadability(Readability):
+    _key_params = ('_unit',)
+
+    def __init__(self, unit='character', batch_size=1):
+        super().__init__(True, 1, False)
+        self._file_name = 'length.pickle'
+        self._unit = unit
+        self.batch_size = batch_size
+        self.scored = []
+
+    def evaluate(self, sentences, **kwargs):
+        def score_batches(pending):
+            for text, in pending:
+                self.scored.append(text)
+                yield [len(text) if self._unit == 'character' else len(text.split())]
+
+        return self._run_pending([(sentence.hint,) for sentence in sentences], score_batches, 1, 'Evaluating length',
+                                 resume=kwargs.get('_resume'))
+
+
+@pytest.fixture
+def checkpoint_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('HINTEVAL_CHECKPOINT_DIR', str(tmp_path))
+    return tmp_path
+
+
+def _hints(num_of_hints):
+    return (Hint('x' * (idx + 1)) for idx in range(num_of_hints))
+
+
+def test_chunks_append_only_their_outputs(checkpoint_dir, monkeypatch):
+    records = []
+    update = CheckpointLog.update
+
+    def recording_update(self, key, values):
+        records.append(dict(values))
+        return update(self, key, values)
+
+    monkeypatch.setattr(CheckpointLog, 'update', recording_update)
+    evaluator = _LengthReadability()
+    results = [scores for _, scores in evaluator.evaluate_iter(_hints(10), batch_size=4)]
+    assert results == list(range(1, 11))
+    assert [len(record) for record in records] == [1] * 10
+    assert len(CheckpointLog(str(checkpoint_dir / 'length.pickle')).read()['outputs']) == 10
+
+
+def test_resumed_run_takes_checkpointed_outputs(checkpoint_dir):
+    evaluator = _LengthReadability()
+    list(evaluator.evaluate_iter(_hints(6), batch_size=4))
+    resumed = _LengthReadability()
+    results = [scores for _, scores in resumed.evaluate_iter(_hints(10), batch_size=4)]
+    assert results == list(range(1, 11))
+    assert resumed.scored == ['x' * idx for idx in range(7, 11)]
+    assert len(CheckpointLog(str(checkpoint_dir / 'length.pickle')).read()['outputs']) == 10
+
+
+def test_other_calls_do_not_take_resumed_outputs(checkpoint_dir):
+    list(_LengthReadability().evaluate_iter(_hints(8), batch_size=4))
+    resumed = _LengthReadability()
+    results = []
+    for _, scores in resumed.evaluate_iter(_hints(8), batch_size=4):
+        results.append(scores)
+        if len(results) == 1:
+            assert resumed.evaluate(list(_hints(8))[4:]) == [5, 6, 7, 8]
+    assert results == list(range(1, 9))
+    assert resumed.scored == []
+
+
+def test_outputs_are_keyed_by_the_key_params(checkpoint_dir):
+    _LengthReadability().evaluate(list(_hints(3)))
+    evaluator = _LengthReadability(batch_size=8)
+    assert evaluator.evaluate(list(_hints(3))) == [1, 2, 3]
+    assert evaluator.scored == []
+    evaluator = _LengthReadability(unit='word')
+    assert evaluator.evaluate(list(_hints(3))) == [1, 1, 1]
+    assert len(evaluator.scored) == 3
+
+
+def test_update_converts_old_checkpoints(tmp_path):
+    path = str(tmp_path / 'old.pickle')
+    with open(path, 'wb') as file:
+        pickle.dump({'outputs': {'a': 1}}, file)
+    CheckpointLog(path).update('outputs', {'b': 2})
+    assert CheckpointLog(path).read() == {'outputs': {'a': 1, 'b': 2}}
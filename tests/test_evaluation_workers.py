@@ -0,0 +1,75 @@
+"""
+Checks that evaluators scoring in worker processes return the same outputs as scoring in the calling process, that
+evaluators that hold a model reject several workers, and that the workers are only forked from the main thread.
+
+Usage: python -m pytest tests/test_evaluation_workers.py
+"""
+import os
+import threading
+import warnings
+import pytest
+from hinteval.cores import Instance
+from hinteval.cores.evaluation_core import Relevance
+
+texts = [f'Text {idx}. ' * (idx % 7 + 1) for idx in range(100)]
+
+
+class _LengthRelevance(Relevance):
+    _process_safe = True
+
+    def __init__(self, num_workers=1):
+        super().__init__(False, 1, False, num_workers)
+
+    def evaluate(self, sentences, **kwargs):
+        def score_batches(pending):
+            for text, in pending:
+                yield [(len(text), os.getpid())]
+
+        return self._run_pending([(text,) for text in sentences], score_batches, 1, 'Evaluating length')
+
+
+class _ModelRelevance(_LengthRelevance):
+    _process_safe = False
+
+
+def test_workers_return_the_same_outputs():
+    serial = _LengthRelevance().evaluate(texts)
+    parallel = _LengthRelevance(num_workers=4).evaluate(texts)
+    assert [score for score, _ in parallel] == [score for score, _ in serial]
+    assert {pid for _, pid in serial} == {os.getpid()}
+    assert len({pid for _, pid in parallel} - {os.getpid()}) > 0
+
+
+def test_evaluators_with_models_reject_workers():
+    with pytest.raises(ValueError):
+        _ModelRelevance(num_workers=4)
+    outputs = _ModelRelevance().evaluate(texts)
+    assert {pid for _, pid in outputs} == {os.getpid()}
+
+
+def test_workers_are_not_forked_from_other_threads():
+    outputs, caught = [], []
+
+    def evaluate():
+        with warnings.catch_warnings(record=True) as records:
+            warnings.simplefilter('always')
+            outputs.extend(_LengthRelevance(num_workers=4).evaluate(texts))
+        caught.extend(records)
+
+    thread = threading.Thread(target=evaluate)
+    thread.start()
+    thread.join()
+    assert [str(record.message) for record in caught if record.category is RuntimeWarning] == [
+        '_LengthRelevance scores its inputs in the calling thread instead of 4 workers, because it is not called from '
+        'the main thread.']
+    assert [score for score, _ in outputs] == [len(text) for text in texts]
+    assert {pid for _, pid in outputs} == {os.getpid()}
+
+
+def test_rouge_workers_return_the_same_scores():
+    pytest.importorskip('rouge_score')
+    from hinteval.evaluation.relevance import Rouge
+    instances = [Instance.from_strings(f'What is question {idx}?', [f'Answer {idx}'],
+                                       [f'Question {idx} is about hint {idx}.', f'Hint {idx} is unrelated.'])
+                 for idx in range(40)]
+    assert Rouge(num_workers=4).evaluate(instances) == Rouge().evaluate(instances)
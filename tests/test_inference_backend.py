@@ -0,0 +1,48 @@
+"""
+Checks that the TorchScript and ONNX Runtime backends of :func:`load_sequence_classifier` give the logits of the eager
+PyTorch model within a tolerance, on a tiny random BERT classifier and on inputs longer than the exported examples.
+
+Usage: python -m pytest tests/test_inference_backend.py
+"""
+import numpy as np
+import pytest
+
+torch = pytest.importorskip('torch')
+transformers = pytest.importorskip('transformers')
+from hinteval.utils.functions.inference_backend import load_sequence_classifier
+
+input_names = ['input_ids', 'token_type_ids', 'attention_mask']
+tolerance = 1e-4
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    torch.manual_seed(0)
+    config = transformers.BertConfig(vocab_size=64, hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+                                     intermediate_size=64, max_position_embeddings=64, num_labels=2)
+    transformers.BertForSequenceClassification(config).eval().save_pretrained(str(tmp_path))
+    return str(tmp_path)
+
+
+@pytest.fixture
+def inputs():
+    generator = torch.Generator().manual_seed(0)
+    batch = {'input_ids': torch.randint(5, 64, (3, 12), generator=generator),
+             'token_type_ids': torch.zeros((3, 12), dtype=torch.long),
+             'attention_mask': torch.ones((3, 12), dtype=torch.long)}
+    batch['token_type_ids'][:, 6:] = 1
+    batch['attention_mask'][1, 9:] = 0
+    batch['attention_mask'][2, 4:] = 0
+    return batch
+
+
+@pytest.mark.parametrize('backend', ['torchscript', 'onnx'])
+def test_exported_logits_match_pytorch(model_dir, inputs, backend):
+    if backend == 'onnx':
+        pytest.importorskip('onnxruntime')
+    with torch.no_grad():
+        expected = load_sequence_classifier(model_dir, 2, torch.device('cpu')).eval()(**inputs).logits.numpy()
+        model = load_sequence_classifier(model_dir, 2, torch.device('cpu'), backend, input_names)
+        logits = model(**inputs).logits.numpy()
+    assert logits.shape == expected.shape
+    assert np.allclose(logits, expected, atol=tolerance)
@@ -0,0 +1,33 @@
+"""
+Checks that evaluators release the models they acquired when their constructor fails.
+
+Usage: python -m pytest tests/test_model_registry.py
+"""
+import pytest
+from hinteval.cores.evaluation_core import Relevance
+from hinteval.utils.functions.model_registry import ModelRegistry
+
+
+class _FailingEvaluator(Relevance):
+    def __init__(self, fail):
+        super().__init__(False, 1, False)
+        self._acquire(('test', 'model'), object)
+        self._acquire(('test', 'tokenizer'), object)
+        if fail:
+            raise ValueError(f'Invalid evaluator: "{fail}".')
+
+    def evaluate(self, instances, **kwargs):
+        return []
+
+
+def test_failed_constructor_releases_models():
+    kept = _FailingEvaluator(fail=None)
+    with pytest.raises(ValueError):
+        _FailingEvaluator(fail='failing')
+    assert ModelRegistry._entries[('test', 'model')][1] == 1
+    kept.release_memory()
+    assert ModelRegistry.get(('test', 'model')) is None
+    with pytest.raises(ValueError):
+        _FailingEvaluator(fail='failing')
+    assert ModelRegistry.get(('test', 'model')) is None
+    assert ModelRegistry.get(('test', 'tokenizer')) is None
@@ -0,0 +1,71 @@
+"""
+Checks that the indexes of :class:`Subset` queries follow metrics, question types and entities changed in place, and
+that only the instances that changed are updated in them.
+
+Usage: python -m pytest tests/test_subset_indexes.py
+"""
+from hinteval.cores import Subset, Instance, Metric, Entity
+
+
+def _subset(name='train', num_of_instances=8):
+    subset = Subset(name)
+    for idx in range(num_of_instances):
+        instance = Instance.from_strings(f'Question {idx}?', [f'Answer {idx}'], [f'Hint {idx}.'])
+        instance.hints[0].metrics['relevance'] = Metric('relevance', idx / 10)
+        subset.add_instance(instance, f'q{idx}')
+    return subset
+
+
+def _count_updates(monkeypatch, index):
+    q_ids = []
+    update = index.update
+
+    def counting_update(q_id, pairs):
+        q_ids.append(q_id)
+        return update(q_id, pairs)
+
+    monkeypatch.setattr(index, 'update', counting_update)
+    return q_ids
+
+
+def test_where_updates_only_changed_instances(monkeypatch):
+    subset = _subset()
+    assert subset.where('relevance', ge=0.5) == [('q5', 0), ('q6', 0), ('q7', 0)]
+    index = subset._indexes[('metric', 'hints', 'relevance')]
+    q_ids = _count_updates(monkeypatch, index)
+    subset.get_instance('q1').hints[0].metrics['relevance'].value = 0.9
+    subset.get_instance('q2').hints[0].metrics['other'] = Metric('other', 0.9)
+    _subset('test').get_instance('q3').hints[0].metrics['relevance'].value = 0.9
+    assert subset.where('relevance', ge=0.5) == [('q5', 0), ('q6', 0), ('q7', 0), ('q1', 0)]
+    assert subset._indexes[('metric', 'hints', 'relevance')] is index
+    assert q_ids == ['q1']
+
+
+def test_where_follows_added_and_removed_instances():
+    subset = _subset()
+    subset.where('relevance', ge=0.5)
+    subset.remove_instance('q6')
+    instance = Instance.from_strings('Question 8?', ['Answer 8'], ['Hint 8.'])
+    instance.hints[0].metrics['relevance'] = Metric('relevance', 0.55)
+    subset.add_instance(instance, 'q8')
+    assert subset.where('relevance', ge=0.5) == [('q5', 0), ('q8', 0), ('q7', 0)]
+
+
+def test_by_question_type_follows_changes_in_place():
+    subset = _subset()
+    subset.get_instance('q0').question.question_type = {'major': 'HUM:human', 'minor': 'ind:Individual'}
+    assert subset.by_question_type('HUM') == ['q0']
+    subset.get_instance('q1').question.question_type['major'] = 'HUM:human'
+    subset.get_instance('q0').question.question_type['major'] = 'LOC:location'
+    assert subset.by_question_type('HUM') == ['q1']
+    assert subset.by_question_type('LOC', 'ind') == ['q0']
+
+
+def test_by_entity_type_follows_changes_in_place():
+    subset = _subset()
+    assert subset.by_entity_type('PERSON') == []
+    subset.get_instance('q2').hints[0].entities.append(Entity('Hint', 'PERSON', 0, 4))
+    assert subset.by_entity_type('PERSON') == ['q2']
+    assert subset.by_entity_type('PERSON', level='answers') == []
+    subset.get_instance('q2').hints = []
+    assert subset.by_entity_type('PERSON') == []
@@ -0,0 +1,74 @@
+"""
+Checks that the cached metric matrix of a :class:`Subset` follows changes made in place to the hints of its instances.
+
+Usage: python -m pytest tests/test_subset_metric_matrix.py
+"""
+import numpy as np
+from hinteval.cores import Subset, Instance, Hint, Metric, Entity
+
+
+def _subset():
+    subset = Subset('train')
+    for idx in range(3):
+        instance = Instance.from_strings(f'Question {idx}?', [f'Answer {idx}'], [f'Hint {idx}.'])
+        instance.hints[0].metrics['relevance'] = Metric('relevance', idx / 10)
+        subset.add_instance(instance, f'q{idx}')
+    return subset
+
+
+def test_metric_matrix_follows_appended_hints():
+    subset = _subset()
+    matrix, _, _ = subset.metric_matrix(['relevance'])
+    assert matrix.shape == (3, 1)
+    subset.get_instance('q1').hints.append(Hint('Another hint.', metrics={'relevance': Metric('relevance', 0.9)}))
+    matrix, instance_index, hint_index = subset.metric_matrix(['relevance'])
+    assert matrix.shape == (4, 1)
+    assert instance_index.tolist() == [0, 1, 1, 2]
+    assert hint_index.tolist() == [0, 0, 1, 0]
+    assert matrix[2, 0] == 0.9
+
+
+def test_metric_matrix_follows_deleted_hints():
+    subset = _subset()
+    subset.metric_matrix(['relevance'])
+    del subset.get_instance('q0').hints[0]
+    matrix, instance_index, _ = subset.metric_matrix(['relevance'])
+    assert matrix.shape == (2, 1)
+    assert instance_index.tolist() == [1, 2]
+
+
+def test_metric_matrix_follows_metrics_of_appended_hints():
+    subset = _subset()
+    hint = Hint('Another hint.')
+    subset.get_instance('q2').hints.append(hint)
+    matrix, _, _ = subset.metric_matrix(['relevance'])
+    assert np.isnan(matrix[3, 0])
+    hint.metrics['relevance'] = Metric('relevance', 0.4)
+    matrix, _, _ = subset.metric_matrix(['relevance'])
+    assert matrix[3, 0] == 0.4
+
+
+def test_instances_keep_shared_hint_lists():
+    hints = [Hint('Shared hint.')]
+    first = Instance.from_strings('Question 1?', ['Answer 1'], [])
+    second = Instance.from_strings('Question 2?', ['Answer 2'], [])
+    first.hints, second.hints = hints, hints
+    subset = Subset('train')
+    subset.add_instance(first, 'q1')
+    subset.add_instance(second, 'q2')
+    assert first.hints is second.hints is hints
+    subset.metric_matrix(['relevance'])
+    first.hints.append(Hint('Another hint.'))
+    matrix, instance_index, _ = subset.metric_matrix(['relevance'])
+    assert instance_index.tolist() == [0, 0, 1, 1]
+
+
+def test_metric_matrix_is_kept_after_changes_elsewhere():
+    subset, other = _subset(), _subset()
+    cached = subset.metric_matrix(['relevance'])
+    other.get_instance('q0').hints[0].metrics['relevance'] = Metric('relevance', 0.7)
+    subset.get_instance('q1').question.metrics['relevance'] = Metric('relevance', 0.3)
+    subset.get_instance('q2').answers[0].entities.append(Entity('Answer', 'MISC', 0, 6))
+    assert subset.metric_matrix(['relevance']) is cached
+    subset.get_instance('q2').hints[0].metrics['relevance'].value = 0.8
+    assert subset.metric_matrix(['relevance'])[0][2, 0] == 0.8
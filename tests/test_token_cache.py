@@ -0,0 +1,39 @@
+"""
+Checks that the tokenized inputs returned from :class:`TokenCache`, and from the in-memory cache of a pipeline run, are
+the same as those of the tokenizer itself, for single texts and for pairs of texts that are truncated.
+
+Usage: python -m pytest tests/test_token_cache.py
+"""
+import pytest
+from hinteval.utils.functions.token_cache import TokenCache, _RunTokenCache
+
+transformers = pytest.importorskip('transformers')
+
+words = ['the', 'city', 'capital', 'of', 'austria', 'is', 'home', 'to', 'mozart', 'and', 'beethoven', 'what', '?', '.']
+questions = ['What is the capital of Austria?', 'What city is home to Mozart?']
+hints = ['The city is home to Mozart and Beethoven, and the city is the capital of Austria. ' * 4,
+         'Beethoven.']
+max_length = 16
+
+
+@pytest.fixture
+def tokenizer(tmp_path):
+    vocab_file = tmp_path / 'vocab.txt'
+    vocab_file.write_text('\n'.join(['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + words), encoding='utf-8')
+    return transformers.BertTokenizerFast(vocab_file=str(vocab_file))
+
+
+@pytest.mark.parametrize('in_memory', [False, True])
+@pytest.mark.parametrize('inputs', [list(zip(questions, hints)), [(hint,) for hint in hints]])
+def test_cache_hits_match_tokenizer(tmp_path, tokenizer, inputs, in_memory):
+    token_cache = _RunTokenCache() if in_memory else TokenCache(str(tmp_path / 'tokens.sqlite'), 2 ** 20)
+    texts = [item[0] for item in inputs]
+    text_pairs = [item[1] for item in inputs] if len(inputs[0]) > 1 else None
+    expected = tokenizer(texts, text_pairs, truncation=True, max_length=max_length)
+    assert max(len(input_ids) for input_ids in expected['input_ids']) == max_length
+    token_cache.encode(tokenizer, inputs, max_length)
+    keys = {TokenCache._key(tokenizer.name_or_path, max_length, item) for item in inputs}
+    assert set(token_cache.get_many(keys)) == keys
+    outputs = token_cache.encode(tokenizer, inputs, max_length)
+    for name in tokenizer.model_input_names:
+        assert outputs[name] == expected[name]